@@ -40,6 +40,7 @@ INSTALLED_APPS = [
 # MIDDLEWARE
 # =========================================================
 MIDDLEWARE = [
+    'inventario.metricas.MetricasMiddleware',
     'django.middleware.security.SecurityMiddleware',
     'django.contrib.sessions.middleware.SessionMiddleware',
     'django.middleware.common.CommonMiddleware',
@@ -82,12 +83,85 @@ TEMPLATES = [
 # =========================================================
 # BASE DE DATOS
 # =========================================================
-DATABASES = {
-    'default': {
-        'ENGINE': 'django.db.backends.sqlite3',
-        'NAME': BASE_DIR / 'db.sqlite3',
+# INVENTARIO_DB=sqlite (por defecto) | postgres
+INVENTARIO_DB = os.environ.get('INVENTARIO_DB', 'sqlite')
+
+if INVENTARIO_DB == 'postgres':
+    # Requiere psycopg 3 con pool (pip install "psycopg[binary,pool]").
+    # Con pool las conexiones las recicla el pool: CONN_MAX_AGE debe ser 0
+    DATABASES = {
+        'default': {
+            'ENGINE': 'django.db.backends.postgresql',
+            'NAME': os.environ.get('POSTGRES_DB', 'inventario'),
+            'USER': os.environ.get('POSTGRES_USER', 'inventario'),
+            'PASSWORD': os.environ.get('POSTGRES_PASSWORD', ''),
+            'HOST': os.environ.get('POSTGRES_HOST', 'localhost'),
+            'PORT': os.environ.get('POSTGRES_PORT', '5432'),
+            'CONN_MAX_AGE': 0,
+            'CONN_HEALTH_CHECKS': True,
+            'OPTIONS': {
+                'pool': {
+                    'min_size': int(os.environ.get('POSTGRES_POOL_MIN', 2)),
+                    'max_size': int(os.environ.get('POSTGRES_POOL_MAX', 10)),
+                    'timeout': int(os.environ.get('POSTGRES_POOL_TIMEOUT', 10)),
+                },
+            },
+        }
+    }
+else:
+    DATABASES = {
+        'default': {
+            'ENGINE': 'django.db.backends.sqlite3',
+            'NAME': os.environ.get('INVENTARIO_DB_NAME') or BASE_DIR / 'db.sqlite3',
+            # Conexiones persistentes (segundos); se verifican antes de reutilizarse
+            'CONN_MAX_AGE': int(os.environ.get('INVENTARIO_DB_CONN_MAX_AGE', 60)),
+            'CONN_HEALTH_CHECKS': True,
+            # Base de tests en disco (no en memoria): los tests de concurrencia
+            # abren una conexión por hilo
+            'TEST': {
+                'NAME': os.environ.get('INVENTARIO_DB_TEST_NAME') or BASE_DIR / 'test_db.sqlite3',
+            },
+        }
+    }
+
+    # INVENTARIO_SQLITE_PERFIL=optimizado (por defecto) | basico (valores de Django)
+    if os.environ.get('INVENTARIO_SQLITE_PERFIL', 'optimizado') == 'optimizado':
+        DATABASES['default']['OPTIONS'] = {
+            # BEGIN IMMEDIATE: el bloqueo de escritura se toma al inicio de la
+            # transacción y espera busy_timeout, en vez de fallar con
+            # "database is locked" al pasar de lectura a escritura
+            'transaction_mode': 'IMMEDIATE',
+            'init_command': ';'.join([
+                'PRAGMA journal_mode = WAL',
+                'PRAGMA synchronous = NORMAL',
+                f"PRAGMA busy_timeout = {int(os.environ.get('INVENTARIO_SQLITE_BUSY_MS', 20000))}",
+                f"PRAGMA mmap_size = {int(os.environ.get('INVENTARIO_SQLITE_MMAP_MB', 256)) * 1024 * 1024}",
+                f"PRAGMA cache_size = -{int(os.environ.get('INVENTARIO_SQLITE_CACHE_MB', 64)) * 1024}",
+                'PRAGMA temp_store = MEMORY',
+            ]),
+        }
+
+
+# =========================================================
+# CACHE
+# =========================================================
+# INVENTARIO_CACHE=locmem (por proceso) | file (compartida entre workers).
+# Con locmem una escritura invalida solo la cache del worker que la atendió:
+# las entradas versionadas viven como mucho INVENTARIO_CACHE_LOCAL_TTL
+if os.environ.get('INVENTARIO_CACHE', 'locmem') == 'file':
+    CACHES = {
+        'default': {
+            'BACKEND': 'django.core.cache.backends.filebased.FileBasedCache',
+            'LOCATION': os.environ.get('INVENTARIO_CACHE_DIR', BASE_DIR / '.cache'),
+        }
+    }
+else:
+    CACHES = {
+        'default': {
+            'BACKEND': 'django.core.cache.backends.locmem.LocMemCache',
+            'LOCATION': 'inventario',
+        }
     }
-}
 
 
 # =========================================================
@@ -124,7 +198,8 @@ REST_FRAMEWORK = {
     # ✔ Postman
     'DEFAULT_AUTHENTICATION_CLASSES': [
         'rest_framework.authentication.SessionAuthentication',
-        'rest_framework.authentication.TokenAuthentication',
+        # Token con cache LRU en proceso (sin consulta por request)
+        'inventario.autenticacion.CachedTokenAuthentication',
     ],
 
     'DEFAULT_PERMISSION_CLASSES': [
@@ -181,3 +256,80 @@ LOGOUT_REDIRECT_URL = '/login/'
 # DEFAULT
 # =========================================================
 DEFAULT_AUTO_FIELD = 'django.db.models.BigAutoField'
+
+
+# =========================================================
+# INVENTARIO
+# =========================================================
+# Máximo de movimientos aceptados por POST /api/movimientos/bulk/
+INVENTARIO_LOTE_MAXIMO = int(os.environ.get('INVENTARIO_LOTE_MAXIMO', 1000))
+
+# Paginación keyset de /api/movimientos/ (?page_size= hasta el máximo)
+INVENTARIO_MOVIMIENTOS_PAGE_SIZE = int(os.environ.get('INVENTARIO_MOVIMIENTOS_PAGE_SIZE', 50))
+INVENTARIO_MOVIMIENTOS_MAX_PAGE_SIZE = int(os.environ.get('INVENTARIO_MOVIMIENTOS_MAX_PAGE_SIZE', 500))
+
+# Segundos que se cachean los KPIs del dashboard (se invalidan al escribir)
+INVENTARIO_KPIS_TTL = int(os.environ.get('INVENTARIO_KPIS_TTL', 300))
+
+# Segundos que vive una respuesta cacheada de categorías / proveedores
+INVENTARIO_CACHE_REFERENCIAS_TTL = int(os.environ.get('INVENTARIO_CACHE_REFERENCIAS_TTL', 3600))
+
+# Tope (segundos) de vida de versiones y entradas cacheadas cuando la cache es
+# por proceso (locmem): lo que otro worker puede seguir sirviendo tras una escritura
+INVENTARIO_CACHE_LOCAL_TTL = int(os.environ.get('INVENTARIO_CACHE_LOCAL_TTL', 5))
+
+# Paginación de las vistas HTML (?por_pagina= hasta el máximo)
+INVENTARIO_HTML_POR_PAGINA = int(os.environ.get('INVENTARIO_HTML_POR_PAGINA', 25))
+INVENTARIO_HTML_MAX_POR_PAGINA = int(os.environ.get('INVENTARIO_HTML_MAX_POR_PAGINA', 100))
+
+# Consultas por request: aviso si una misma forma se repite N veces (N+1) y,
+# en modo estricto (tests / CI), error si una vista excede su presupuesto
+INVENTARIO_CONSULTAS_REPETIDAS = int(os.environ.get('INVENTARIO_CONSULTAS_REPETIDAS', 10))
+INVENTARIO_CONSULTAS_ESTRICTO = os.environ.get('INVENTARIO_CONSULTAS_ESTRICTO', '0') == '1'
+
+# Es diagnóstico (cabeceras X-Consultas con el costo SQL de cada endpoint y
+# un wrapper en cada consulta): solo en desarrollo o en modo estricto. Sin
+# él, MetricasMiddleware cuenta las consultas por su cuenta
+if DEBUG or INVENTARIO_CONSULTAS_ESTRICTO:
+    MIDDLEWARE.append('inventario.consultas.ConsultasMiddleware')
+
+# Métricas Prometheus en /metrics. Con varios workers, cada proceso vuelca
+# sus series en INVENTARIO_METRICAS_DIR (como mucho cada INTERVALO segundos)
+# y /metrics suma todos los archivos; sin directorio, solo el proceso actual
+INVENTARIO_METRICAS_DIR = os.environ.get('INVENTARIO_METRICAS_DIR') or None
+INVENTARIO_METRICAS_INTERVALO = float(os.environ.get('INVENTARIO_METRICAS_INTERVALO', 5))
+
+# Quién puede leer /metrics (rutas, volumen y latencias son información
+# interna): staff con sesión, un Bearer con este token o estas IPs
+INVENTARIO_METRICAS_TOKEN = os.environ.get('INVENTARIO_METRICAS_TOKEN') or None
+INVENTARIO_METRICAS_IPS = [
+    ip.strip() for ip in os.environ.get('INVENTARIO_METRICAS_IPS', '127.0.0.1,::1').split(',') if ip.strip()
+]
+
+# Antigüedad (días) a partir de la cual `archivar_movimientos` saca los
+# movimientos de la tabla caliente y los pasa a la de archivo
+INVENTARIO_ARCHIVO_DIAS = int(os.environ.get('INVENTARIO_ARCHIVO_DIAS', 365))
+
+# Pronóstico de reorden (`calcular_reorden`, GET /api/productos/reorden/):
+# días de historia leídos del resumen diario, ventana de la media móvil,
+# factor del suavizado exponencial, plazo de entrega y días a cubrir
+INVENTARIO_REORDEN_HISTORIA_DIAS = int(os.environ.get('INVENTARIO_REORDEN_HISTORIA_DIAS', 90))
+INVENTARIO_REORDEN_VENTANA_DIAS = int(os.environ.get('INVENTARIO_REORDEN_VENTANA_DIAS', 28))
+INVENTARIO_REORDEN_ALFA = float(os.environ.get('INVENTARIO_REORDEN_ALFA', 0.3))
+INVENTARIO_REORDEN_PLAZO_DIAS = int(os.environ.get('INVENTARIO_REORDEN_PLAZO_DIAS', 7))
+INVENTARIO_REORDEN_COBERTURA_DIAS = int(os.environ.get('INVENTARIO_REORDEN_COBERTURA_DIAS', 30))
+
+# Idempotency-Key en los POST de la API: horas que se guarda la primera respuesta
+INVENTARIO_IDEMPOTENCIA_TTL_HORAS = int(os.environ.get('INVENTARIO_IDEMPOTENCIA_TTL_HORAS', 24))
+
+# Cola de ingesta (POST /api/movimientos/ingesta/ + `procesar_ingesta`):
+# horas que se conservan los eventos ya procesados para consultar su estado
+INVENTARIO_INGESTA_RETENCION_HORAS = int(os.environ.get('INVENTARIO_INGESTA_RETENCION_HORAS', 72))
+
+# Cache de tokens de la API: entradas por proceso y segundos de vida; se
+# invalida al borrar/rotar un token o guardar/borrar un usuario. Con cache
+# local (locmem) el TTL se acota a INVENTARIO_CACHE_LOCAL_TTL. Un
+# User.objects.update(is_active=False) no envía señales: después, llamar a
+# inventario.autenticacion.invalidar_tokens()
+INVENTARIO_TOKEN_CACHE_MAX = int(os.environ.get('INVENTARIO_TOKEN_CACHE_MAX', 10000))
+INVENTARIO_TOKEN_CACHE_TTL = int(os.environ.get('INVENTARIO_TOKEN_CACHE_TTL', 60))
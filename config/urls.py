@@ -10,7 +10,7 @@ from drf_spectacular.views import (
     SpectacularRedocView,
 )
 
-from inventario.views import inicio_view, logout_view
+from inventario.views import inicio_view, logout_view, metricas_view
 
 urlpatterns = [
     # =========================
@@ -53,6 +53,11 @@ urlpatterns = [
     # =========================
     path('api/token/', token_views.obtain_auth_token, name='api_token_auth'),
 
+    # =========================
+    # MÉTRICAS (PROMETHEUS)
+    # =========================
+    path('metrics', metricas_view, name='metricas'),
+
     # =========================
     # API DOCUMENTATION
     # =========================
@@ -1,5 +1,5 @@
 from django.contrib import admin
-from .models import Categoria, Proveedor, Producto, MovimientoStock
+from .models import Categoria, Proveedor, Producto, MovimientoStock, MovimientoStockArchivo
 
 
 @admin.register(Categoria)
@@ -32,3 +32,20 @@ class MovimientoStockAdmin(admin.ModelAdmin):
     )
     list_filter = ('tipo', 'producto')
     search_fields = ('producto__nombre', 'motivo')
+
+
+@admin.register(MovimientoStockArchivo)
+class MovimientoStockArchivoAdmin(admin.ModelAdmin):
+    # Solo lectura: el archivo lo escribe `archivar_movimientos`
+    list_display = (
+        'id', 'producto', 'tipo', 'cantidad', 'creado_en', 'archivado_en'
+    )
+    list_filter = ('tipo',)
+    search_fields = ('producto__nombre', 'motivo')
+    list_select_related = ('producto',)
+
+    def has_add_permission(self, request):
+        return False
+
+    def has_change_permission(self, request, obj=None):
+        return False
@@ -1,11 +1,16 @@
 from django.urls import path, include
 from rest_framework.routers import DefaultRouter
 
+from . import vistas_async
+
 from .views import (
     CategoriaViewSet,
     ProveedorViewSet,
     ProductoViewSet,
     MovimientoStockViewSet,
+    KpisView,
+    ReporteMovimientosView,
+    CacheEstadisticasView,
 )
 
 router = DefaultRouter()
@@ -15,5 +20,15 @@ router.register(r'productos', ProductoViewSet)
 router.register(r'movimientos', MovimientoStockViewSet)
 
 urlpatterns = [
+    path('kpis/', KpisView.as_view(), name='api_kpis'),
+    path('reportes/movimientos/', ReporteMovimientosView.as_view(), name='api_reporte_movimientos'),
+    path('cache/estadisticas/', CacheEstadisticasView.as_view(), name='api_cache_estadisticas'),
+
+    # Lectura async (ASGI)
+    path('async/productos/', vistas_async.productos_lista, name='api_async_productos'),
+    path('async/productos/<int:pk>/', vistas_async.productos_detalle, name='api_async_producto'),
+    path('async/productos/<int:pk>/stock/', vistas_async.productos_stock, name='api_async_producto_stock'),
+    path('async/movimientos/', vistas_async.movimientos_lista, name='api_async_movimientos'),
+
     path('', include(router.urls)),
 ]
@@ -0,0 +1,66 @@
+import time
+from datetime import timedelta
+
+from django.conf import settings
+from django.db import connection, transaction
+from django.utils import timezone
+
+from .condicional import marcar_modificado
+from .models import MovimientoStock, MovimientoStockArchivo
+
+
+# Columnas copiadas tal cual de la tabla caliente al archivo
+COLUMNAS = ('id', 'producto_id', 'tipo', 'cantidad', 'motivo', 'creado_en')
+
+
+def corte_por_defecto():
+    """Instante antes del cual un movimiento se considera archivable."""
+    return timezone.now() - timedelta(days=getattr(settings, 'INVENTARIO_ARCHIVO_DIAS', 365))
+
+
+@transaction.atomic
+def _mover_lote(corte, lote):
+    ids = list(
+        MovimientoStock.objects.filter(creado_en__lt=corte)
+        .order_by('creado_en', 'id')
+        .values_list('id', flat=True)[:lote]
+    )
+    if not ids:
+        return 0
+
+    q = connection.ops.quote_name
+    caliente, archivo = q(MovimientoStock._meta.db_table), q(MovimientoStockArchivo._meta.db_table)
+    columnas = ', '.join(q(c) for c in COLUMNAS)
+    marcadores = ', '.join(['%s'] * len(ids))
+    ahora = connection.ops.adapt_datetimefield_value(timezone.now())
+    with connection.cursor() as cursor:
+        # INSERT ... SELECT en la base y DELETE directo: sin señales, porque
+        # archivar no cambia el stock ni los KPIs
+        cursor.execute(
+            f'INSERT INTO {archivo} ({columnas}, {q("archivado_en")}) '
+            f'SELECT {columnas}, %s FROM {caliente} WHERE {q("id")} IN ({marcadores})',
+            [ahora, *ids],
+        )
+        cursor.execute(f'DELETE FROM {caliente} WHERE {q("id")} IN ({marcadores})', ids)
+    # Sin señales: la lista de /api/movimientos/ cambió (ver inventario.condicional)
+    marcar_modificado('movimientos')
+    return len(ids)
+
+
+def archivar_movimientos(corte=None, lote=5000, pausa=0.0, progreso=None):
+    """Mueve al archivo los movimientos con ``creado_en < corte``, del más antiguo al más nuevo.
+
+    Cada lote es una transacción corta (copiar + borrar), así los escritores
+    del stock no esperan más que un lote. Devuelve el total movido.
+    """
+    corte = corte or corte_por_defecto()
+    total = 0
+    while True:
+        movidos = _mover_lote(corte, lote)
+        total += movidos
+        if progreso is not None and movidos:
+            progreso(total)
+        if movidos < lote:
+            return total
+        if pausa:
+            time.sleep(pausa)
@@ -0,0 +1,144 @@
+import copy
+import threading
+import time
+from collections import OrderedDict
+
+from django.conf import settings
+from rest_framework.authentication import TokenAuthentication
+from rest_framework.authtoken.models import Token
+
+from .cache_referencias import acotar_ttl, incrementar_version, version
+
+
+# Recurso de versión compartida (cache de Django): invalida los tokens
+# cacheados en todos los procesos
+RECURSO = 'tokens'
+# Segundos que un proceso reutiliza la versión compartida antes de releerla
+VERSION_CADA = 1.0
+# Caches por instancia de usuario que no deben pasar de un request a otro
+_CACHES_USUARIO = ('_perm_cache', '_user_perm_cache', '_group_perm_cache')
+
+
+class _LRU:
+    """Mapa acotado clave -> valor con TTL y versión; seguro entre hilos."""
+
+    def __init__(self):
+        self._datos = OrderedDict()
+        self._lock = threading.Lock()
+        self._version = (None, 0.0)
+        self.aciertos = self.fallos = 0
+
+    def version(self):
+        valor, leida = self._version
+        if valor is None or time.monotonic() - leida >= VERSION_CADA:
+            valor = version(RECURSO)
+            self._version = (valor, time.monotonic())
+        return valor
+
+    def obtener(self, clave):
+        vigente = self.version()
+        with self._lock:
+            entrada = self._datos.get(clave)
+            if entrada is not None:
+                valor, expira, version_entrada = entrada
+                if version_entrada == vigente and expira > time.monotonic():
+                    self._datos.move_to_end(clave)
+                    self.aciertos += 1
+                    return valor
+                del self._datos[clave]
+            self.fallos += 1
+            return None
+
+    def guardar(self, clave, valor, version_leida):
+        """``version_leida`` es la de ``version()`` *antes* de consultar la base.
+
+        Si se invalida mientras la consulta está en curso, la entrada queda
+        con la versión anterior y el siguiente ``obtener`` la descarta.
+        """
+        # Sin cache compartida la versión no cruza procesos: solo el TTL
+        # acota cuánto sigue valiendo aquí un token revocado en otro worker
+        ttl = acotar_ttl(getattr(settings, 'INVENTARIO_TOKEN_CACHE_TTL', 60))
+        maximo = getattr(settings, 'INVENTARIO_TOKEN_CACHE_MAX', 10000)
+        entrada = (valor, time.monotonic() + ttl, version_leida)
+        with self._lock:
+            self._datos[clave] = entrada
+            self._datos.move_to_end(clave)
+            while len(self._datos) > maximo:
+                self._datos.popitem(last=False)
+
+    def vaciar(self):
+        with self._lock:
+            self._datos.clear()
+            self._version = (None, 0.0)
+
+    def __len__(self):
+        return len(self._datos)
+
+
+tokens_cacheados = _LRU()
+
+
+def invalidar_tokens():
+    """Descarta los tokens cacheados aquí y, vía la versión compartida, en los demás procesos.
+
+    Las señales la llaman al guardar o borrar usuarios y tokens. Los
+    ``update()`` masivos no envían señales: tras
+    ``User.objects.filter(...).update(is_active=False)`` hay que llamarla a mano.
+    """
+    incrementar_version(RECURSO)
+    tokens_cacheados.vaciar()
+
+
+def _copia(usuario):
+    # Cada request recibe su propia instancia, sin permisos cacheados de otro
+    usuario = copy.copy(usuario)
+    for atributo in _CACHES_USUARIO:
+        usuario.__dict__.pop(atributo, None)
+    return usuario
+
+
+def usuario_de_token(clave, buscar):
+    """``(usuario, token)`` para ``clave`` desde la cache; si falta, ``buscar(clave)``.
+
+    ``buscar`` hace la consulta real y lanza ``AuthenticationFailed``; los
+    fallos no se cachean, así un token recién creado funciona enseguida.
+    """
+    entrada = tokens_cacheados.obtener(clave)
+    if entrada is None:
+        vigente = tokens_cacheados.version()
+        entrada = buscar(clave)
+        tokens_cacheados.guardar(clave, entrada, vigente)
+    usuario, token = entrada
+    return _copia(usuario), token
+
+
+async def ausuario_de_token(clave):
+    """Versión async para las vistas ASGI: el usuario activo o ``None``."""
+    entrada = tokens_cacheados.obtener(clave)
+    if entrada is None:
+        vigente = tokens_cacheados.version()
+        try:
+            token = await Token.objects.select_related('user').aget(key=clave)
+        except Token.DoesNotExist:
+            return None
+        if not token.user.is_active:
+            return None
+        entrada = (token.user, token)
+        tokens_cacheados.guardar(clave, entrada, vigente)
+    return _copia(entrada[0])
+
+
+class CachedTokenAuthentication(TokenAuthentication):
+    """``TokenAuthentication`` sin consulta por request.
+
+    Guarda ``(usuario, token)`` en un LRU por proceso (INVENTARIO_TOKEN_CACHE_MAX
+    entradas, INVENTARIO_TOKEN_CACHE_TTL segundos). Borrar o rotar un token y
+    guardar o borrar un usuario invalidan la cache (inventario.signals); los
+    otros procesos lo notan en menos de VERSION_CADA segundos si comparten
+    la cache de Django, y si no, al vencer el TTL, que entonces se acota a
+    INVENTARIO_CACHE_LOCAL_TTL. Los ``update()`` masivos sobre usuarios no
+    disparan señales: ver ``invalidar_tokens``.
+    """
+
+    def authenticate_credentials(self, key):
+        return usuario_de_token(key, super().authenticate_credentials)
@@ -0,0 +1,92 @@
+import re
+
+from django.db import connection
+from django.db.models import Q
+from django.db.models.expressions import RawSQL
+from rest_framework.filters import SearchFilter
+
+from .models import Producto, Proveedor
+
+
+# Tablas FTS5 creadas en la migración 0004 (solo SQLite)
+TABLAS_FTS = {
+    Producto: 'inventario_producto_fts',
+    Proveedor: 'inventario_proveedor_fts',
+}
+
+TOKEN = re.compile(r'\w+', re.UNICODE)
+
+
+def fts_disponible(modelo):
+    return connection.vendor == 'sqlite' and modelo in TABLAS_FTS
+
+
+def expresion_match(texto):
+    """Convierte el texto del usuario en una consulta FTS5 con prefijos.
+
+    ``"lapiz az"`` -> ``"lapiz"* "az"*`` (todos los términos, por prefijo).
+    Devuelve ``None`` si no queda ningún término utilizable.
+    """
+    terminos = TOKEN.findall(texto or '')
+    if not terminos:
+        return None
+    return ' '.join(f'"{t}"*' for t in terminos)
+
+
+def _filtro_simple(queryset, campos, texto):
+    condicion = Q()
+    for termino in TOKEN.findall(texto or ''):
+        por_termino = Q()
+        for campo in campos:
+            por_termino |= Q(**{f'{campo}__icontains': termino})
+        condicion &= por_termino
+    return queryset.filter(condicion)
+
+
+def filtrar(queryset, texto, campos):
+    """Filtra ``queryset`` por texto usando el índice FTS cuando existe."""
+    expresion = expresion_match(texto)
+    if expresion is None:
+        return queryset
+    if not fts_disponible(queryset.model):
+        return _filtro_simple(queryset, campos, texto)
+
+    tabla = TABLAS_FTS[queryset.model]
+    return queryset.filter(
+        id__in=RawSQL(f'SELECT rowid FROM {tabla} WHERE {tabla} MATCH %s', [expresion])
+    )
+
+
+def buscar(queryset, texto, campos, limite=20):
+    """Resultados de ``queryset`` ordenados por relevancia (bm25)."""
+    expresion = expresion_match(texto)
+    if expresion is None:
+        return []
+    if not fts_disponible(queryset.model):
+        return list(_filtro_simple(queryset, campos, texto)[:limite])
+
+    tabla = TABLAS_FTS[queryset.model]
+    with connection.cursor() as cursor:
+        # El primer campo (nombre) pesa más que el segundo (sku / email)
+        cursor.execute(
+            f'SELECT rowid FROM {tabla} WHERE {tabla} MATCH %s '
+            f'ORDER BY bm25({tabla}, 10.0, 5.0) LIMIT %s',
+            [expresion, limite],
+        )
+        ids = [fila[0] for fila in cursor.fetchall()]
+
+    encontrados = queryset.in_bulk(ids)
+    return [encontrados[pk] for pk in ids if pk in encontrados]
+
+
+# ----------------------
+# FILTRO DRF (?search=)
+# ----------------------
+class BusquedaTextoFilter(SearchFilter):
+    """``SearchFilter`` respaldado por FTS5; cae a ``icontains`` fuera de SQLite."""
+
+    def filter_queryset(self, request, queryset, view):
+        texto = request.query_params.get(self.search_param, '')
+        if not texto.strip():
+            return queryset
+        return filtrar(queryset, texto, self.get_search_fields(view, request))
@@ -0,0 +1,127 @@
+import hashlib
+import time
+
+from django.conf import settings
+from django.core.cache import cache, caches
+from django.core.cache.backends.dummy import DummyCache
+from django.core.cache.backends.locmem import LocMemCache
+from rest_framework.response import Response
+
+from .models import Categoria, Proveedor
+
+
+PREFIJO = 'inventario:ref'
+RECURSOS = ('categorias', 'proveedores')
+
+
+def cache_compartida():
+    """False si la cache por defecto vive en la memoria de cada proceso."""
+    return not isinstance(caches['default'], (LocMemCache, DummyCache))
+
+
+def acotar_ttl(segundos):
+    """``segundos`` (``None``: sin vencimiento) acotado con una cache por proceso.
+
+    Con locmem cada worker tiene su propia copia de versiones y datos: una
+    escritura solo invalida la del worker que la atendió. Acotar la vida de
+    las entradas a INVENTARIO_CACHE_LOCAL_TTL limita lo que los demás sirven
+    datos viejos; con una cache compartida (file, redis) no hace falta.
+    """
+    if cache_compartida():
+        return segundos
+    local = getattr(settings, 'INVENTARIO_CACHE_LOCAL_TTL', 5)
+    return local if segundos is None else min(segundos, local)
+
+
+def _ttl():
+    return acotar_ttl(getattr(settings, 'INVENTARIO_CACHE_REFERENCIAS_TTL', 3600))
+
+
+# ----------------------
+# VERSIONES
+# ----------------------
+def version(recurso):
+    clave = f'{PREFIJO}:{recurso}:version'
+    actual = cache.get(clave)
+    if actual is None:
+        # Valor inicial basado en el reloj: si la clave se pierde nunca se
+        # reutiliza una versión anterior con entradas viejas todavía en cache.
+        # Con cache por proceso la versión también vence (ver acotar_ttl)
+        cache.add(clave, int(time.time() * 1000), acotar_ttl(None))
+        actual = cache.get(clave)
+    return actual
+
+
+def incrementar_version(recurso):
+    try:
+        cache.incr(f'{PREFIJO}:{recurso}:version')
+    except ValueError:
+        version(recurso)
+
+
+# ----------------------
+# CONTADORES
+# ----------------------
+def _contar(recurso, tipo):
+    clave = f'{PREFIJO}:{recurso}:{tipo}'
+    try:
+        cache.incr(clave)
+    except ValueError:
+        if not cache.add(clave, 1, None):
+            cache.incr(clave)
+
+
+def estadisticas():
+    datos = {}
+    for recurso in RECURSOS:
+        aciertos = cache.get(f'{PREFIJO}:{recurso}:aciertos', 0)
+        fallos = cache.get(f'{PREFIJO}:{recurso}:fallos', 0)
+        total = aciertos + fallos
+        datos[recurso] = {
+            'version': version(recurso),
+            'aciertos': aciertos,
+            'fallos': fallos,
+            'tasa_aciertos': round(aciertos / total, 4) if total else None,
+        }
+    return datos
+
+
+def obtener(recurso, subclave, calcular):
+    """Valor cacheado bajo la versión vigente de ``recurso``; si falta, ``calcular()``."""
+    clave = f'{PREFIJO}:{recurso}:v{version(recurso)}:{subclave}'
+    valor = cache.get(clave)
+    if valor is not None:
+        _contar(recurso, 'aciertos')
+        return valor
+    _contar(recurso, 'fallos')
+    valor = calcular()
+    cache.set(clave, valor, _ttl())
+    return valor
+
+
+# ----------------------
+# USOS
+# ----------------------
+def opciones_formulario():
+    """Categorías y proveedores (id, nombre) para los formularios de productos."""
+    categorias = obtener('categorias', 'opciones', lambda: list(Categoria.objects.values('id', 'nombre')))
+    proveedores = obtener('proveedores', 'opciones', lambda: list(Proveedor.objects.values('id', 'nombre')))
+    return categorias, proveedores
+
+
+class CacheVersionadoMixin:
+    """Cachea la respuesta de ``list`` con claves versionadas por recurso."""
+
+    recurso_cache = None
+
+    def list(self, request, *args, **kwargs):
+        subclave = hashlib.sha1(request.build_absolute_uri().encode()).hexdigest()
+        estado = {}
+
+        def calcular():
+            respuesta = super(CacheVersionadoMixin, self).list(request, *args, **kwargs)
+            estado['respuesta'] = respuesta
+            return respuesta.data
+
+        datos = obtener(self.recurso_cache, subclave, calcular)
+        return estado.get('respuesta') or Response(datos)
@@ -0,0 +1,132 @@
+import hashlib
+
+from django.db import connection
+from django.db.models import Count, Max
+from django.utils import timezone
+from django.utils.cache import get_conditional_response
+from django.utils.http import http_date, quote_etag
+
+from .models import VersionDatos
+
+
+def marcar_modificado(*recursos):
+    """Incrementa la versión en base de ``recursos``.
+
+    Un solo ``INSERT ... ON CONFLICT DO UPDATE`` (como resumenes.acumular):
+    crea la fila la primera vez y si no incrementa sin pisar a otra
+    transacción. Debe llamarse dentro de la transacción de la escritura.
+    """
+    recursos = sorted(set(recursos))
+    q = connection.ops.quote_name
+    tabla = q(VersionDatos._meta.db_table)
+    ahora = connection.ops.adapt_datetimefield_value(timezone.now())
+    with connection.cursor() as cursor:
+        cursor.execute(
+            f'INSERT INTO {tabla} ({q("recurso")}, {q("version")}, {q("actualizado_en")}) '
+            f'VALUES {", ".join(["(%s, 1, %s)"] * len(recursos))} '
+            f'ON CONFLICT ({q("recurso")}) DO UPDATE SET '
+            f'{q("version")} = {tabla}.{q("version")} + 1, '
+            f'{q("actualizado_en")} = excluded.{q("actualizado_en")}',
+            [valor for recurso in recursos for valor in (recurso, ahora)],
+        )
+
+
+class ConditionalGetMixin:
+    """ETag y Last-Modified para ``list`` y ``retrieve`` de un ModelViewSet.
+
+    Los validadores salen solo del estado de la base, así coinciden entre
+    workers y no cambian sin escrituras. Para la lista: ``COUNT``, ``MAX(pk)``
+    y ``MAX(campo_modificacion)`` del queryset filtrado (altas, bajas y
+    ediciones con marca de tiempo) más las filas de VersionDatos de
+    ``recurso_version`` y ``recursos_relacionados``, que inventario.signals
+    incrementa en la transacción de cada escritura que esos agregados no ven.
+    Si el cliente ya tiene la versión vigente se responde 304 sin serializar
+    nada. ``recursos_relacionados`` son recursos cuyos datos aparecen en la
+    respuesta (p. ej. nombres de categoría).
+    """
+
+    campo_modificacion = 'actualizado_en'
+    recurso_version = None
+    recursos_relacionados = ()
+
+    @staticmethod
+    def _versiones(*recursos):
+        recursos = [r for r in recursos if r]
+        if not recursos:
+            return [], []
+        filas = {
+            recurso: (version, actualizado)
+            for recurso, version, actualizado in VersionDatos.objects.filter(
+                recurso__in=recursos
+            ).values_list('recurso', 'version', 'actualizado_en')
+        }
+        versiones = [f'{r}:{filas.get(r, (0, None))[0]}' for r in recursos]
+        return versiones, [actualizado for _, actualizado in filas.values()]
+
+    @staticmethod
+    def _etag(*partes):
+        return quote_etag(hashlib.sha1('|'.join(str(p) for p in partes).encode()).hexdigest())
+
+    @staticmethod
+    def _ultima_modificacion(*marcas):
+        marcas = [m for m in marcas if m is not None]
+        return int(max(marcas).timestamp()) if marcas else None
+
+    @staticmethod
+    def _no_modificado(request, etag, last_modified):
+        if request.method not in ('GET', 'HEAD'):
+            return None
+        return get_conditional_response(request._request, etag=etag, last_modified=last_modified)
+
+    @staticmethod
+    def _con_validadores(response, etag, last_modified):
+        if response.status_code == 200:
+            response['ETag'] = etag
+            if last_modified is not None:
+                response['Last-Modified'] = http_date(last_modified)
+        return response
+
+    def list(self, request, *args, **kwargs):
+        agregados = self.filter_queryset(self.get_queryset()).order_by().aggregate(
+            total=Count('pk'), maximo=Max('pk'), modificado=Max(self.campo_modificacion),
+        )
+        versiones, marcas = self._versiones(self.recurso_version, *self.recursos_relacionados)
+        modificado = agregados['modificado']
+        etag = self._etag(
+            request.get_full_path(),
+            agregados['total'],
+            agregados['maximo'],
+            modificado.isoformat() if modificado else None,
+            *versiones,
+        )
+        last_modified = self._ultima_modificacion(modificado, *marcas)
+        respuesta = self._no_modificado(request, etag, last_modified)
+        if respuesta is not None:
+            return respuesta
+        return self._con_validadores(super().list(request, *args, **kwargs), etag, last_modified)
+
+    def retrieve(self, request, *args, **kwargs):
+        lookup = self.lookup_url_kwarg or self.lookup_field
+        try:
+            fila = (
+                self.filter_queryset(self.get_queryset())
+                .filter(**{self.lookup_field: kwargs[lookup]})
+                .values_list('pk', self.campo_modificacion)
+                .first()
+            )
+        except (TypeError, ValueError):
+            fila = None
+        if fila is None:
+            # 404 / permisos: el flujo normal se encarga
+            return super().retrieve(request, *args, **kwargs)
+
+        pk, modificado = fila
+        # La marca de la fila no basta si la respuesta incluye datos de otros
+        # recursos (renombrar la categoría no la mueve): suman sus versiones
+        versiones, marcas = self._versiones(*self.recursos_relacionados)
+        etag = self._etag(self.basename, pk, modificado.isoformat(), *versiones)
+        last_modified = self._ultima_modificacion(modificado, *marcas)
+        respuesta = self._no_modificado(request, etag, last_modified)
+        if respuesta is not None:
+            return respuesta
+        return self._con_validadores(super().retrieve(request, *args, **kwargs), etag, last_modified)
@@ -0,0 +1,203 @@
+import logging
+import re
+import time
+from collections import Counter
+from contextlib import contextmanager
+from contextvars import ContextVar
+
+from asgiref.sync import iscoroutinefunction, markcoroutinefunction, sync_to_async
+from django.conf import settings
+from django.db import connection, connections
+from django.db.backends.signals import connection_created
+from django.dispatch import receiver
+
+
+logger = logging.getLogger('inventario.consultas')
+
+# Listas de parámetros y literales: dos consultas con la misma "forma" solo
+# difieren en los valores (el patrón típico de un N+1)
+_LISTA_IN = re.compile(r'IN \((?:%s(?:, )?)+\)')
+_LITERALES = re.compile(r"'(?:[^']|'')*'|\b\d+\b")
+
+
+class PresupuestoExcedido(AssertionError):
+    pass
+
+
+def forma(sql):
+    return _LITERALES.sub('?', _LISTA_IN.sub('IN (...)', sql))
+
+
+class RegistroConsultas:
+    """``execute_wrapper`` que anota cada consulta y su duración."""
+
+    def __init__(self):
+        self.consultas = []
+
+    def __call__(self, execute, sql, params, many, context):
+        inicio = time.perf_counter()
+        try:
+            return execute(sql, params, many, context)
+        finally:
+            self.consultas.append((sql, time.perf_counter() - inicio))
+
+    @property
+    def total(self):
+        return len(self.consultas)
+
+    @property
+    def milisegundos(self):
+        return sum(duracion for _, duracion in self.consultas) * 1000
+
+    def repetidas(self, minimo):
+        """Formas de consulta ejecutadas ``minimo`` veces o más, de mayor a menor."""
+        conteo = Counter(forma(sql) for sql, _ in self.consultas)
+        return [(sql, veces) for sql, veces in conteo.most_common() if veces >= minimo]
+
+    def verificar(self, presupuesto, vista='consulta'):
+        if presupuesto is not None and self.total > presupuesto:
+            detalle = '\n'.join(f'  {veces}x {sql}' for sql, veces in self.repetidas(2)[:5])
+            raise PresupuestoExcedido(
+                f'{vista}: {self.total} consultas (presupuesto {presupuesto}).'
+                + (f'\nRepetidas:\n{detalle}' if detalle else '')
+            )
+
+
+@contextmanager
+def registrar_consultas():
+    registro = RegistroConsultas()
+    with connection.execute_wrapper(registro):
+        yield registro
+
+
+# ----------------------
+# REGISTRO POR CONTEXTO (ASGI)
+# ----------------------
+# En una vista async el ORM corre en otro hilo (sync_to_async) con otra
+# conexión, así que execute_wrapper no sirve desde el event loop. Todas las
+# conexiones llevan este wrapper, que anota en el registro del contexto
+# actual (asgiref copia las ContextVar al hilo del ORM).
+_registro_actual = ContextVar('registro_consultas', default=None)
+
+
+def _anotar_en_contexto(execute, sql, params, many, context):
+    registro = _registro_actual.get()
+    if registro is None:
+        return execute(sql, params, many, context)
+    return registro(execute, sql, params, many, context)
+
+
+def _instrumentar(conexion):
+    if _anotar_en_contexto not in conexion.execute_wrappers:
+        conexion.execute_wrappers.append(_anotar_en_contexto)
+
+
+def _instrumentar_hilo():
+    for conexion in connections.all():
+        _instrumentar(conexion)
+
+
+@receiver(connection_created)
+def _instrumentar_conexion(sender, connection, **kwargs):
+    _instrumentar(connection)
+
+
+@contextmanager
+def registrar_en_contexto():
+    registro = RegistroConsultas()
+    marca = _registro_actual.set(registro)
+    try:
+        yield registro
+    finally:
+        _registro_actual.reset(marca)
+
+
+@contextmanager
+def presupuesto_consultas(maximo, vista='bloque'):
+    """Para tests: falla si el bloque ejecuta más de ``maximo`` consultas.
+
+        with presupuesto_consultas(6):
+            self.client.get('/api/productos/')
+    """
+    with registrar_consultas() as registro:
+        yield registro
+    registro.verificar(maximo, vista)
+
+
+# ----------------------
+# PRESUPUESTO DECLARADO EN LA VISTA
+# ----------------------
+def presupuesto_de_vista(request):
+    """``presupuesto_consultas`` de la vista resuelta (entero o dict por acción).
+
+    En los viewsets el dict se indexa por acción (``list``, ``retrieve``,
+    ``bulk``...) con ``'*'`` como valor por defecto.
+    """
+    match = getattr(request, 'resolver_match', None)
+    if match is None:
+        return None
+    vista = match.func
+    clase = getattr(vista, 'cls', None) or getattr(vista, 'view_class', None)
+    presupuesto = getattr(clase or vista, 'presupuesto_consultas', None)
+    if isinstance(presupuesto, dict):
+        accion = (getattr(vista, 'actions', None) or {}).get(request.method.lower())
+        presupuesto = presupuesto.get(accion, presupuesto.get('*'))
+    return presupuesto
+
+
+class ConsultasMiddleware:
+    """Cuenta consultas y tiempo SQL por request.
+
+    Con DEBUG o INVENTARIO_CONSULTAS_ESTRICTO (config/settings.py solo lo
+    instala entonces) añade ``X-Consultas`` / ``X-Consultas-Ms`` a la respuesta; registra un
+    aviso si una misma forma de consulta se repite ``INVENTARIO_CONSULTAS_REPETIDAS``
+    veces o más y, si la vista declara ``presupuesto_consultas``, avisa al
+    excederlo (o lanza ``PresupuestoExcedido`` con ``INVENTARIO_CONSULTAS_ESTRICTO``).
+    Las respuestas en streaming consultan después de salir de aquí y no cuentan.
+    """
+
+    sync_capable = True
+    async_capable = True
+
+    def __init__(self, get_response):
+        self.get_response = get_response
+        if iscoroutinefunction(get_response):
+            markcoroutinefunction(self)
+        self.hilo_orm_instrumentado = False
+
+    def __call__(self, request):
+        if iscoroutinefunction(self):
+            return self.__acall__(request)
+        with registrar_consultas() as registro:
+            request.registro_consultas = registro
+            response = self.get_response(request)
+        return self._revisar(request, response, registro)
+
+    async def __acall__(self, request):
+        if not self.hilo_orm_instrumentado:
+            # Una sola vez: la conexión del hilo del ORM pudo abrirse antes de
+            # cargar el middleware y entonces no emitió connection_created
+            await sync_to_async(_instrumentar_hilo)()
+            self.hilo_orm_instrumentado = True
+        with registrar_en_contexto() as registro:
+            request.registro_consultas = registro
+            response = await self.get_response(request)
+        return self._revisar(request, response, registro)
+
+    def _revisar(self, request, response, registro):
+        vista = request.path
+        minimo = getattr(settings, 'INVENTARIO_CONSULTAS_REPETIDAS', 10)
+        for sql, veces in registro.repetidas(minimo):
+            logger.warning('%s %s: consulta repetida %d veces (¿N+1?): %s', request.method, vista, veces, sql)
+
+        try:
+            registro.verificar(presupuesto_de_vista(request), f'{request.method} {vista}')
+        except PresupuestoExcedido as exc:
+            if getattr(settings, 'INVENTARIO_CONSULTAS_ESTRICTO', False):
+                raise
+            logger.warning('%s', exc)
+
+        if settings.DEBUG or getattr(settings, 'INVENTARIO_CONSULTAS_ESTRICTO', False):
+            response['X-Consultas'] = str(registro.total)
+            response['X-Consultas-Ms'] = f'{registro.milisegundos:.2f}'
+        return response
@@ -0,0 +1,167 @@
+import csv
+import json
+from datetime import datetime, time, timedelta
+from decimal import Decimal
+
+from django.http import StreamingHttpResponse
+from django.utils import timezone
+from django.utils.dateparse import parse_date
+from rest_framework.exceptions import ValidationError
+
+from .models import Producto, MovimientoStock
+
+
+# Filas leídas por viaje a la base y filas por bloque enviado al cliente
+FILAS_POR_LECTURA = 2000
+FILAS_POR_BLOQUE = 500
+
+# (columna exportada, ruta en el ORM); los nombres se resuelven con JOIN en la base
+COLUMNAS_PRODUCTOS = [
+    ('id', 'id'),
+    ('sku', 'sku'),
+    ('nombre', 'nombre'),
+    ('categoria', 'categoria__nombre'),
+    ('proveedor', 'proveedor__nombre'),
+    ('precio', 'precio'),
+    ('stock_actual', 'stock_actual'),
+    ('stock_minimo', 'stock_minimo'),
+    ('activo', 'activo'),
+    ('creado_en', 'creado_en'),
+    ('actualizado_en', 'actualizado_en'),
+]
+
+COLUMNAS_MOVIMIENTOS = [
+    ('id', 'id'),
+    ('creado_en', 'creado_en'),
+    ('producto_id', 'producto_id'),
+    ('sku', 'producto__sku'),
+    ('producto', 'producto__nombre'),
+    ('categoria', 'producto__categoria__nombre'),
+    ('proveedor', 'producto__proveedor__nombre'),
+    ('tipo', 'tipo'),
+    ('cantidad', 'cantidad'),
+    ('motivo', 'motivo'),
+]
+
+FORMATOS = {
+    'csv': 'text/csv; charset=utf-8',
+    'ndjson': 'application/x-ndjson',
+}
+
+
+# ----------------------
+# FILTROS (SE APLICAN EN LA BASE)
+# ----------------------
+def _fecha(params, nombre):
+    valor = params.get(nombre)
+    if not valor:
+        return None
+    try:
+        fecha = parse_date(valor)
+    except ValueError:
+        # Bien formada pero imposible (2024-13-01)
+        fecha = None
+    if fecha is None:
+        raise ValidationError({nombre: 'Formato de fecha inválido, use AAAA-MM-DD.'})
+    return fecha
+
+
+def _id(params, nombre):
+    valor = params.get(nombre)
+    if not valor:
+        return None
+    try:
+        return int(valor)
+    except ValueError:
+        raise ValidationError({nombre: 'Debe ser un id numérico.'})
+
+
+def _inicio_dia(fecha):
+    return timezone.make_aware(datetime.combine(fecha, time.min))
+
+
+def productos_filtrados(params):
+    queryset = Producto.objects.all()
+    for campo in ('categoria', 'proveedor'):
+        valor = _id(params, campo)
+        if valor is not None:
+            queryset = queryset.filter(**{f'{campo}_id': valor})
+    if params.get('activo') in ('1', 'true', '0', 'false'):
+        queryset = queryset.filter(activo=params['activo'] in ('1', 'true'))
+    return queryset
+
+
+def movimientos_filtrados(params):
+    queryset = MovimientoStock.objects.all()
+    desde, hasta = _fecha(params, 'desde'), _fecha(params, 'hasta')
+    if desde:
+        queryset = queryset.filter(creado_en__gte=_inicio_dia(desde))
+    if hasta:
+        queryset = queryset.filter(creado_en__lt=_inicio_dia(hasta + timedelta(days=1)))
+    categoria, producto = _id(params, 'categoria'), _id(params, 'producto')
+    if categoria is not None:
+        queryset = queryset.filter(producto__categoria_id=categoria)
+    if producto is not None:
+        queryset = queryset.filter(producto_id=producto)
+    if params.get('tipo'):
+        queryset = queryset.filter(tipo=params['tipo'])
+    return queryset
+
+
+# ----------------------
+# SERIALIZACIÓN EN STREAMING
+# ----------------------
+def _valor(valor):
+    if isinstance(valor, datetime):
+        return timezone.localtime(valor).isoformat()
+    if isinstance(valor, Decimal):
+        return str(valor)
+    return valor
+
+
+class _Eco:
+    # Pseudo-buffer: csv.writer devuelve la línea en vez de escribirla
+    def write(self, valor):
+        return valor
+
+
+def _csv(encabezados, filas):
+    escritor = csv.writer(_Eco())
+    bloque = [escritor.writerow(encabezados)]
+    for fila in filas:
+        bloque.append(escritor.writerow([_valor(v) for v in fila]))
+        if len(bloque) >= FILAS_POR_BLOQUE:
+            yield ''.join(bloque)
+            bloque = []
+    if bloque:
+        yield ''.join(bloque)
+
+
+def _ndjson(encabezados, filas):
+    bloque = []
+    for fila in filas:
+        registro = {k: _valor(v) for k, v in zip(encabezados, fila)}
+        bloque.append(json.dumps(registro, ensure_ascii=False) + '\n')
+        if len(bloque) >= FILAS_POR_BLOQUE:
+            yield ''.join(bloque)
+            bloque = []
+    if bloque:
+        yield ''.join(bloque)
+
+
+def respuesta_exportacion(queryset, columnas, formato, nombre, orden=('id',)):
+    """``StreamingHttpResponse`` con memoria constante sin importar el número de filas."""
+    if formato not in FORMATOS:
+        raise ValidationError({'formato': f'Formatos soportados: {", ".join(FORMATOS)}.'})
+
+    encabezados = [columna for columna, _ in columnas]
+    filas = (
+        queryset.order_by(*orden)
+        .values_list(*[ruta for _, ruta in columnas])
+        .iterator(chunk_size=FILAS_POR_LECTURA)
+    )
+    generador = _csv(encabezados, filas) if formato == 'csv' else _ndjson(encabezados, filas)
+
+    respuesta = StreamingHttpResponse(generador, content_type=FORMATOS[formato])
+    respuesta['Content-Disposition'] = f'attachment; filename="{nombre}.{formato}"'
+    return respuesta
@@ -0,0 +1,19 @@
+import django_filters
+
+from .models import Producto
+from .stock_bajo import productos_sin_stock_bajo, productos_stock_bajo
+
+
+class ProductoFilter(django_filters.FilterSet):
+    # ?stock_bajo=true -> stock_actual <= stock_minimo (índice parcial)
+    # ?stock_bajo=false -> stock_actual > stock_minimo
+    stock_bajo = django_filters.BooleanFilter(method='filtrar_stock_bajo')
+
+    class Meta:
+        model = Producto
+        fields = ['categoria', 'proveedor', 'stock_bajo']
+
+    def filtrar_stock_bajo(self, queryset, name, value):
+        if value:
+            return productos_stock_bajo(queryset)
+        return productos_sin_stock_bajo(queryset)
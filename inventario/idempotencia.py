@@ -0,0 +1,170 @@
+import hashlib
+from datetime import timedelta
+
+from django.conf import settings
+from django.db import IntegrityError, transaction
+from django.http import HttpResponse
+from django.utils import timezone
+from rest_framework import status
+from rest_framework.exceptions import APIException, ValidationError
+
+from .models import ClaveIdempotencia
+
+
+CABECERA = 'Idempotency-Key'
+LARGO_MAXIMO = 255
+
+
+# ----------------------
+# ERRORES
+# ----------------------
+class ClaveEnCurso(APIException):
+    status_code = status.HTTP_409_CONFLICT
+    default_detail = 'Hay una solicitud con esta Idempotency-Key en curso; reintente más tarde.'
+    default_code = 'idempotencia_en_curso'
+
+
+class ClaveReutilizada(APIException):
+    status_code = status.HTTP_422_UNPROCESSABLE_ENTITY
+    default_detail = 'La Idempotency-Key ya se usó con otra solicitud.'
+    default_code = 'idempotencia_reutilizada'
+
+
+class _Repeticion(Exception):
+    # Corta el flujo de la vista con la respuesta guardada
+    def __init__(self, respuesta):
+        self.respuesta = respuesta
+
+
+# ----------------------
+# REGISTRO DE CLAVES
+# ----------------------
+def huella(request):
+    """SHA-256 de método, ruta y cuerpo: la misma clave con otra solicitud es un error."""
+    digest = hashlib.sha256()
+    for parte in (request.method.encode(), request.path.encode(), request.body):
+        digest.update(parte)
+        digest.update(b'\0')
+    return digest.hexdigest()
+
+
+def reservar(usuario, clave, firma):
+    """Reserva ``clave`` para ``usuario`` o devuelve el registro que ya la tiene.
+
+    Se llama dentro de la transacción de la escritura (IdempotenciaMixin),
+    así la fila nueva solo se confirma junto con la escritura y su
+    respuesta. La restricción única (usuario, clave) decide entre
+    solicitudes concurrentes: la segunda espera en el INSERT a que la
+    primera confirme o revierta, y después lee su registro o inserta el
+    suyo. Devuelve ``(reserva, None)`` o ``(None, existente)``. Solo se
+    reemplazan registros vencidos: uno en curso pudo haber confirmado ya
+    su escritura.
+    """
+    ahora = timezone.now()
+    ttl = timedelta(hours=getattr(settings, 'INVENTARIO_IDEMPOTENCIA_TTL_HORAS', 24))
+
+    for _ in range(3):
+        try:
+            with transaction.atomic():
+                return ClaveIdempotencia.objects.create(
+                    usuario=usuario, clave=clave, huella=firma, expira_en=ahora + ttl,
+                ), None
+        except IntegrityError:
+            existente = ClaveIdempotencia.objects.filter(usuario=usuario, clave=clave).first()
+            if existente is None:
+                continue
+            if existente.expira_en > ahora:
+                return None, existente
+            # Solo la reemplaza quien logra borrarla
+            ClaveIdempotencia.objects.filter(pk=existente.pk, expira_en=existente.expira_en).delete()
+    raise ClaveEnCurso()
+
+
+def respuesta_guardada(registro):
+    respuesta = HttpResponse(bytes(registro.cuerpo), status=registro.estado, content_type=registro.tipo_contenido)
+    respuesta['Idempotent-Replayed'] = 'true'
+    return respuesta
+
+
+def limpiar_vencidas(lote=5000):
+    """Borra los registros vencidos en lotes; devuelve cuántos borró."""
+    total = 0
+    while True:
+        ids = list(
+            ClaveIdempotencia.objects.filter(expira_en__lte=timezone.now())
+            .values_list('id', flat=True)[:lote]
+        )
+        if not ids:
+            return total
+        total += ClaveIdempotencia.objects.filter(id__in=ids).delete()[0]
+
+
+# ----------------------
+# MIXIN PARA VIEWSETS
+# ----------------------
+class IdempotenciaMixin:
+    """Soporte de la cabecera ``Idempotency-Key`` en ``acciones_idempotentes``.
+
+    Con la cabecera, la acción entera corre en una transacción: la reserva
+    de la clave, la escritura y el guardado de la primera respuesta se
+    confirman juntos o no se confirma nada (errores 5xx incluidos, que
+    dejan la clave libre). Las repeticiones con la misma clave y el mismo
+    cuerpo se responden desde la tabla sin volver a validar ni escribir; si
+    el cuerpo cambió, 422.
+    """
+
+    acciones_idempotentes = ('create',)
+
+    def dispatch(self, request, *args, **kwargs):
+        # self.action todavía no existe: se resuelve como lo hará initialize_request
+        accion = getattr(self, 'action_map', {}).get(request.method.lower())
+        if CABECERA not in request.headers or accion not in self.acciones_idempotentes:
+            return super().dispatch(request, *args, **kwargs)
+        with transaction.atomic():
+            return super().dispatch(request, *args, **kwargs)
+
+    def initial(self, request, *args, **kwargs):
+        super().initial(request, *args, **kwargs)
+        self.reserva_idempotencia = None
+        clave = request.headers.get(CABECERA)
+        if not clave or self.action not in self.acciones_idempotentes:
+            return
+        if len(clave) > LARGO_MAXIMO:
+            raise ValidationError({CABECERA: f'Máximo {LARGO_MAXIMO} caracteres.'})
+
+        firma = huella(request)
+        reserva, existente = reservar(request.user, clave, firma)
+        if existente is not None:
+            if existente.huella != firma:
+                raise ClaveReutilizada()
+            if existente.estado is None:
+                raise ClaveEnCurso()
+            raise _Repeticion(respuesta_guardada(existente))
+        self.reserva_idempotencia = reserva
+
+    def handle_exception(self, exc):
+        if isinstance(exc, _Repeticion):
+            return exc.respuesta
+        # Un error no controlado sale de dispatch y revierte clave y escritura
+        return super().handle_exception(exc)
+
+    def finalize_response(self, request, response, *args, **kwargs):
+        response = super().finalize_response(request, response, *args, **kwargs)
+        self._cerrar_reserva(response)
+        return response
+
+    def _cerrar_reserva(self, response):
+        reserva = getattr(self, 'reserva_idempotencia', None)
+        if reserva is None:
+            return
+        self.reserva_idempotencia = None
+        if response.status_code >= 500:
+            # Sin respuesta definitiva: se revierte todo y la clave queda libre
+            transaction.set_rollback(True)
+            return
+        if hasattr(response, 'render'):
+            response.render()
+        reserva.estado = response.status_code
+        reserva.tipo_contenido = response.get('Content-Type', '')
+        reserva.cuerpo = response.content
+        reserva.save(update_fields=['estado', 'tipo_contenido', 'cuerpo'])
@@ -0,0 +1,215 @@
+import csv
+import time
+from decimal import Decimal, InvalidOperation
+
+from django.db import DataError, IntegrityError, transaction
+
+from .condicional import marcar_modificado
+from .models import Categoria, Proveedor, Producto
+from .signals import notificar_stock_modificado
+from .stock_bajo import recalcular_stock_bajo
+
+
+COLUMNAS_REQUERIDAS = ('sku', 'nombre', 'categoria', 'proveedor', 'precio')
+
+# Campos que se sobrescriben cuando el SKU ya existe. El stock no se toca:
+# en productos existentes solo cambia a través de movimientos.
+CAMPOS_ACTUALIZABLES = [
+    'nombre', 'descripcion', 'categoria', 'proveedor',
+    'precio', 'stock_minimo', 'activo', 'actualizado_en',
+]
+
+VERDADEROS = ('1', 'true', 'si', 'sí', 'yes')
+
+# Máximo de un PositiveIntegerField en todas las bases soportadas
+ENTERO_MAXIMO = 2147483647
+
+
+class ErrorImportacion(Exception):
+    # ``resultado``: progreso hasta el error, si ya se confirmaron lotes
+    def __init__(self, mensaje, resultado=None):
+        super().__init__(mensaje)
+        self.resultado = resultado
+
+
+class ResultadoImportacion:
+    def __init__(self, desde_fila=0):
+        self.procesadas = 0
+        self.importadas = 0
+        self.errores = []
+        self.errores_omitidos = 0
+        self.ultima_fila = desde_fila
+        self.inicio = time.perf_counter()
+
+    @property
+    def segundos(self):
+        return time.perf_counter() - self.inicio
+
+    @property
+    def filas_por_segundo(self):
+        return self.procesadas / self.segundos if self.segundos else 0.0
+
+    def como_dict(self):
+        return {
+            'procesadas': self.procesadas,
+            'importadas': self.importadas,
+            'con_error': len(self.errores) + self.errores_omitidos,
+            'errores': [{'fila': fila, 'error': error} for fila, error in self.errores],
+            'ultima_fila': self.ultima_fila,
+            'segundos': round(self.segundos, 3),
+            'filas_por_segundo': round(self.filas_por_segundo, 1),
+        }
+
+
+def _entero(valor, campo):
+    valor = (valor or '').strip()
+    if not valor:
+        return 0
+    try:
+        numero = int(valor)
+    except ValueError:
+        raise ErrorImportacion(f'{campo} debe ser un entero.')
+    if numero < 0:
+        raise ErrorImportacion(f'{campo} no puede ser negativo.')
+    if numero > ENTERO_MAXIMO:
+        raise ErrorImportacion(f'{campo} fuera de rango.')
+    return numero
+
+
+def _precio(valor):
+    try:
+        precio = Decimal((valor or '').strip())
+    except InvalidOperation:
+        raise ErrorImportacion('precio inválido.')
+    # NaN / Infinity se leen sin error pero no se pueden comparar
+    if not precio.is_finite():
+        raise ErrorImportacion('precio inválido.')
+    if precio < 0 or precio.as_tuple().exponent < -2 or precio >= Decimal('1e8'):
+        raise ErrorImportacion('precio fuera de rango.')
+    return precio
+
+
+class _Referencias:
+    # Mapa nombre -> id precargado; opcionalmente crea los que faltan
+    def __init__(self, modelo, crear_faltantes):
+        self.modelo = modelo
+        self.crear_faltantes = crear_faltantes
+        self.ids = dict(modelo.objects.values_list('nombre', 'id'))
+
+    def resolver(self, nombre, campo):
+        nombre = (nombre or '').strip()
+        if not nombre:
+            raise ErrorImportacion(f'{campo} es obligatorio.')
+        if nombre not in self.ids:
+            if not self.crear_faltantes:
+                raise ErrorImportacion(f'{campo} "{nombre}" no existe.')
+            self.ids[nombre] = self.modelo.objects.get_or_create(nombre=nombre)[0].id
+        return self.ids[nombre]
+
+
+def _producto(fila, categorias, proveedores):
+    sku = (fila.get('sku') or '').strip()
+    nombre = (fila.get('nombre') or '').strip()
+    if not sku or len(sku) > 50:
+        raise ErrorImportacion('sku vacío o de más de 50 caracteres.')
+    if not nombre or len(nombre) > 150:
+        raise ErrorImportacion('nombre vacío o de más de 150 caracteres.')
+
+    activo = (fila.get('activo') or '').strip().lower()
+    return Producto(
+        sku=sku,
+        nombre=nombre,
+        descripcion=(fila.get('descripcion') or '').strip(),
+        categoria_id=categorias.resolver(fila.get('categoria'), 'categoria'),
+        proveedor_id=proveedores.resolver(fila.get('proveedor'), 'proveedor'),
+        precio=_precio(fila.get('precio')),
+        stock_actual=_entero(fila.get('stock_actual'), 'stock_actual'),
+        stock_minimo=_entero(fila.get('stock_minimo'), 'stock_minimo'),
+        activo=activo in VERDADEROS if activo else True,
+    )
+
+
+@transaction.atomic
+def _guardar(lote):
+    Producto.objects.bulk_create(
+        lote,
+        update_conflicts=True,
+        unique_fields=['sku'],
+        update_fields=CAMPOS_ACTUALIZABLES,
+    )
+    # bulk_create no dispara post_save: la lista de movimientos muestra
+    # nombres de producto que pueden haber cambiado (inventario.condicional)
+    marcar_modificado('productos')
+
+
+def _guardar_lote(lote, numero, resultado):
+    # Un error de restricción o de datos revierte solo este lote (los
+    # anteriores quedan confirmados) y es culpa del archivo: 400. Los
+    # operativos (base bloqueada, conexión perdida) suben tal cual: 5xx
+    try:
+        _guardar(list(lote.values()))
+    except (IntegrityError, DataError) as exc:
+        raise ErrorImportacion(
+            f'No se pudo guardar el lote que termina en la fila {numero}: {exc}. '
+            f'Última fila confirmada: {resultado.ultima_fila}.',
+            resultado,
+        )
+    resultado.importadas += len(lote)
+
+
+def importar_productos(archivo, tamano_lote=1000, desde_fila=0, crear_faltantes=False,
+                       max_errores=1000, progreso=None):
+    """Importa productos desde un CSV (objeto de texto) con upsert por SKU.
+
+    El archivo se lee fila a fila y se guarda en lotes de ``tamano_lote``; cada
+    lote es una transacción. ``ultima_fila`` en el resultado es la última fila
+    de datos confirmada, para reanudar con ``desde_fila``. ``progreso`` se llama
+    con el resultado parcial después de cada lote. Si la base rechaza un lote
+    se lanza ``ErrorImportacion`` con el resultado hasta ese punto.
+    """
+    lector = csv.DictReader(archivo)
+    faltantes = [c for c in COLUMNAS_REQUERIDAS if c not in (lector.fieldnames or [])]
+    if faltantes:
+        raise ErrorImportacion(f'Faltan columnas: {", ".join(faltantes)}.')
+
+    categorias = _Referencias(Categoria, crear_faltantes)
+    proveedores = _Referencias(Proveedor, crear_faltantes)
+    resultado = ResultadoImportacion(desde_fila)
+
+    # Por SKU: si se repite dentro del lote, gana la última fila
+    lote = {}
+    numero = desde_fila
+    try:
+        for numero, fila in enumerate(lector, start=1):
+            if numero <= desde_fila:
+                continue
+            resultado.procesadas += 1
+            try:
+                producto = _producto(fila, categorias, proveedores)
+            except ErrorImportacion as exc:
+                if len(resultado.errores) < max_errores:
+                    resultado.errores.append((numero, str(exc)))
+                else:
+                    resultado.errores_omitidos += 1
+                continue
+
+            lote[producto.sku] = producto
+            if len(lote) >= tamano_lote:
+                _guardar_lote(lote, numero, resultado)
+                resultado.ultima_fila = numero
+                lote = {}
+                if progreso:
+                    progreso(resultado)
+
+        if lote:
+            _guardar_lote(lote, numero, resultado)
+        resultado.ultima_fila = max(numero, desde_fila)
+    finally:
+        # El upsert masivo no pasa por señales: se recuentan los conteos de
+        # stock bajo (también si un lote falló después de otros confirmados)
+        if resultado.importadas:
+            recalcular_stock_bajo()
+            notificar_stock_modificado([])
+    if progreso:
+        progreso(resultado)
+    return resultado
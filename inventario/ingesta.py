@@ -0,0 +1,138 @@
+import logging
+from datetime import timedelta
+
+from django.conf import settings
+from django.db import connection, transaction
+from django.db.models import Count, Min
+from django.utils import timezone
+
+from .models import EventoMovimiento
+from .stock import StockInsuficiente, registrar_lote
+
+
+logger = logging.getLogger('inventario.ingesta')
+
+# Lotes seguidos revertidos por concurrencia antes de abortar el drenado
+REINTENTOS = 5
+
+
+# ----------------------
+# ENCOLADO (LADO HTTP)
+# ----------------------
+def encolar(items, usuario=None):
+    """Guarda ``items`` (ya validados en formato) como eventos pendientes.
+
+    Un solo INSERT en una transacción corta, sin leer productos ni stock.
+    Devuelve los ids de los eventos en el mismo orden.
+    """
+    eventos = EventoMovimiento.objects.bulk_create(
+        [
+            EventoMovimiento(
+                usuario=usuario,
+                producto_id=item['producto'],
+                tipo=item['tipo'],
+                cantidad=item['cantidad'],
+                motivo=item.get('motivo', ''),
+            )
+            for item in items
+        ],
+        batch_size=500,
+    )
+    return [evento.pk for evento in eventos]
+
+
+def estado_cola():
+    """Pendientes y antigüedad del más viejo (por el índice parcial de pendientes)."""
+    datos = EventoMovimiento.objects.filter(estado=EventoMovimiento.ESTADO_PENDIENTE).aggregate(
+        pendientes=Count('id'), mas_antiguo=Min('recibido_en'),
+    )
+    datos['retraso_segundos'] = (
+        round((timezone.now() - datos['mas_antiguo']).total_seconds(), 1) if datos['mas_antiguo'] else 0.0
+    )
+    return datos
+
+
+# ----------------------
+# APLICACIÓN (WORKER)
+# ----------------------
+def procesar_lote(tamano=500):
+    """Aplica hasta ``tamano`` eventos pendientes, en orden de llegada, en una transacción.
+
+    Los eventos se pasan a ``registrar_lote(parcial=True)``, que agrupa los
+    deltas por producto (un UPDATE por bloque de productos, no uno por
+    evento). Los que dejarían stock negativo o apuntan a un producto
+    inexistente quedan rechazados con su error. Devuelve cuántos procesó.
+    """
+    with transaction.atomic():
+        # En PostgreSQL, varios workers se reparten los pendientes; en
+        # SQLite el BEGIN IMMEDIATE ya los serializa
+        eventos = list(
+            EventoMovimiento.objects.filter(estado=EventoMovimiento.ESTADO_PENDIENTE)
+            .select_for_update(skip_locked=True)
+            .order_by('id')[:tamano]
+        )
+        if not eventos:
+            return 0
+
+        movimientos, errores = registrar_lote(
+            [
+                {'producto': e.producto_id, 'tipo': e.tipo, 'cantidad': e.cantidad, 'motivo': e.motivo}
+                for e in eventos
+            ],
+            parcial=True,
+        )
+
+        ahora = connection.ops.adapt_datetimefield_value(timezone.now())
+        creados = iter(movimientos)
+        filas = []
+        for indice, evento in enumerate(eventos):
+            if indice in errores:
+                filas.append((EventoMovimiento.ESTADO_RECHAZADO, errores[indice][:255], None, ahora, evento.pk))
+            else:
+                filas.append((EventoMovimiento.ESTADO_APLICADO, '', next(creados).pk, ahora, evento.pk))
+        # executemany de un UPDATE por id: bulk_update arma un CASE por
+        # columna y se llevaba la mayor parte del tiempo del lote
+        q = connection.ops.quote_name
+        with connection.cursor() as cursor:
+            cursor.executemany(
+                f'UPDATE {q(EventoMovimiento._meta.db_table)} SET {q("estado")} = %s, {q("error")} = %s, '
+                f'{q("movimiento_id")} = %s, {q("procesado_en")} = %s WHERE {q("id")} = %s',
+                filas,
+            )
+    return len(eventos)
+
+
+def drenar(tamano=500, maximo=None):
+    """Procesa lotes hasta vaciar la cola (o ``maximo`` lotes); devuelve ``(eventos, lotes)``."""
+    total = lotes = fallidos = 0
+    while maximo is None or lotes < maximo:
+        try:
+            procesados = procesar_lote(tamano)
+        except StockInsuficiente:
+            # Otro proceso tocó el stock entre la lectura y el UPDATE; el lote
+            # se revirtió completo y se reintenta
+            fallidos += 1
+            if fallidos >= REINTENTOS:
+                raise
+            logger.warning('Lote de ingesta revertido por escritura concurrente; se reintenta.')
+            continue
+        fallidos = 0
+        if not procesados:
+            break
+        total += procesados
+        lotes += 1
+    return total, lotes
+
+
+def purgar_procesados(horas=None, lote=5000):
+    """Borra eventos procesados hace más de ``horas`` (INVENTARIO_INGESTA_RETENCION_HORAS)."""
+    horas = horas if horas is not None else getattr(settings, 'INVENTARIO_INGESTA_RETENCION_HORAS', 72)
+    limite = timezone.now() - timedelta(hours=horas)
+    total = 0
+    while True:
+        ids = list(
+            EventoMovimiento.objects.filter(procesado_en__lt=limite).values_list('id', flat=True)[:lote]
+        )
+        if not ids:
+            return total
+        total += EventoMovimiento.objects.filter(id__in=ids).delete()[0]
@@ -0,0 +1,63 @@
+from datetime import datetime, time
+from decimal import Decimal
+
+from django.conf import settings
+from django.core.cache import cache
+from django.db.models import Count, DecimalField, F, Func, IntegerField, Max, Subquery, Sum
+from django.db.models.functions import Coalesce
+from django.utils import timezone
+
+from .cache_referencias import acotar_ttl
+from .models import Producto, MovimientoStock, StockBajoCategoria
+
+
+def _clave(fecha=None):
+    # La fecha forma parte de la clave: "movimientos hoy" se reinicia a medianoche
+    return f'inventario:kpis:{fecha or timezone.localdate()}'
+
+
+def calcular_kpis():
+    """Todos los indicadores del dashboard en una sola consulta."""
+    inicio_hoy = timezone.make_aware(datetime.combine(timezone.localdate(), time.min))
+    movimientos_hoy = (
+        MovimientoStock.objects.filter(creado_en__gte=inicio_hoy)
+        .order_by()
+        .annotate(total=Func(F('id'), function='COUNT'))
+        .values('total')
+    )
+    # Conteos mantenidos por categoría (inventario.stock_bajo): O(categorías)
+    # y el mismo número que /api/categorias/stock-bajo/
+    stock_bajo = (
+        StockBajoCategoria.objects.order_by()
+        .annotate(total_bajo=Func(F('total'), function='SUM'))
+        .values('total_bajo')
+    )
+
+    datos = Producto.objects.aggregate(
+        productos=Count('id'),
+        valor_inventario=Coalesce(
+            Sum(F('precio') * F('stock_actual'), output_field=DecimalField(max_digits=20, decimal_places=2)),
+            0,
+            output_field=DecimalField(max_digits=20, decimal_places=2),
+        ),
+        stock_bajo=Coalesce(Max(Subquery(stock_bajo, output_field=IntegerField())), 0),
+        # Subconsulta escalar no correlacionada: MAX() solo la admite dentro del agregado
+        movimientos_hoy=Coalesce(Max(Subquery(movimientos_hoy, output_field=IntegerField())), 0),
+    )
+    datos['valor_inventario'] = Decimal(datos['valor_inventario']).quantize(Decimal('0.01'))
+    datos['calculado_en'] = timezone.now()
+    return datos
+
+
+def obtener_kpis():
+    clave = _clave()
+    datos = cache.get(clave)
+    if datos is None:
+        datos = calcular_kpis()
+        # Con cache por proceso la invalidación no llega a los otros workers
+        cache.set(clave, datos, acotar_ttl(getattr(settings, 'INVENTARIO_KPIS_TTL', 300)))
+    return datos
+
+
+def invalidar_kpis():
+    cache.delete(_clave())
@@ -0,0 +1,93 @@
+from django.db.models import F
+from rest_framework import serializers
+from rest_framework.response import Response
+
+
+# Campos cuyo to_representation cambia el valor (fechas, decimales);
+# el resto sale tal cual de .values()
+CAMPOS_CON_CONVERSION = (
+    serializers.DateTimeField,
+    serializers.DateField,
+    serializers.DecimalField,
+)
+
+
+class PlanRapido:
+    """Columnas y conversiones que replican la salida de un ModelSerializer plano.
+
+    Se arma una vez a partir de los campos del serializer: cada campo se lee
+    desde su ``source`` con ``.values()`` (con JOIN para ``categoria.nombre``)
+    y solo fechas y decimales pasan por el ``to_representation`` del campo.
+    """
+
+    def __init__(self, serializer_class):
+        campos = serializer_class().fields
+        self.claves = []
+        self.columnas = []
+        self.alias = {}
+        self.conversiones = {}
+
+        for clave, campo in campos.items():
+            if campo.write_only:
+                continue
+            if isinstance(campo, (serializers.SerializerMethodField, serializers.BaseSerializer)):
+                raise TypeError(f'{clave}: campo no soportado por la lista rápida')
+
+            ruta = campo.source.replace('.', '__')
+            if ruta == clave:
+                self.columnas.append(clave)
+            else:
+                self.alias[clave] = F(ruta)
+            if isinstance(campo, CAMPOS_CON_CONVERSION):
+                self.conversiones[clave] = campo.to_representation
+            self.claves.append(clave)
+
+    def valores(self, queryset):
+        return queryset.values(*self.columnas, **self.alias)
+
+    def representar(self, filas):
+        claves, conversiones = self.claves, self.conversiones
+        resultado = []
+        for fila in filas:
+            dato = {clave: fila[clave] for clave in claves}
+            for clave, convertir in conversiones.items():
+                if dato[clave] is not None:
+                    dato[clave] = convertir(dato[clave])
+            resultado.append(dato)
+        return resultado
+
+
+_planes = {}
+
+
+def plan_para(serializer_class):
+    if serializer_class not in _planes:
+        _planes[serializer_class] = PlanRapido(serializer_class)
+    return _planes[serializer_class]
+
+
+def serializar_rapido(serializer_class, queryset):
+    plan = plan_para(serializer_class)
+    return plan.representar(plan.valores(queryset))
+
+
+class ListaRapidaMixin:
+    """``list`` sin instanciar modelos ni serializers por fila.
+
+    La salida es idéntica a la del serializer; ``?rapido=0`` fuerza el
+    camino normal (útil para comparar).
+    """
+
+    lista_rapida = True
+
+    def list(self, request, *args, **kwargs):
+        if not self.lista_rapida or request.query_params.get('rapido') == '0':
+            return super().list(request, *args, **kwargs)
+
+        plan = plan_para(self.get_serializer_class())
+        queryset = plan.valores(self.filter_queryset(self.get_queryset()))
+
+        pagina = self.paginate_queryset(queryset)
+        if pagina is not None:
+            return self.get_paginated_response(plan.representar(pagina))
+        return Response(plan.representar(queryset))
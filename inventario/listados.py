@@ -0,0 +1,49 @@
+from django.conf import settings
+from django.core.paginator import Paginator
+
+from .paginacion import pagina_keyset
+
+
+def _entero(valor, defecto):
+    try:
+        return int(valor)
+    except (TypeError, ValueError):
+        return defecto
+
+
+def por_pagina(request):
+    """``?por_pagina=`` acotado a ``INVENTARIO_HTML_MAX_POR_PAGINA``."""
+    defecto = getattr(settings, 'INVENTARIO_HTML_POR_PAGINA', 25)
+    maximo = getattr(settings, 'INVENTARIO_HTML_MAX_POR_PAGINA', 100)
+    return max(1, min(_entero(request.GET.get('por_pagina'), defecto), maximo))
+
+
+def ordenar(queryset, request, permitidos, defecto):
+    """Aplica ``?orden=campo`` / ``-campo`` solo si el campo está en ``permitidos``.
+
+    Se añade ``id`` como desempate para que la paginación sea estable.
+    """
+    orden = request.GET.get('orden', defecto)
+    if orden.lstrip('-') not in permitidos:
+        orden = defecto
+    return queryset.order_by(orden, '-id' if orden.startswith('-') else 'id'), orden
+
+
+def parametros(request, *excluir):
+    """Query string actual sin los parámetros de paginación (para los enlaces)."""
+    copia = request.GET.copy()
+    for nombre in ('page', 'cursor', *excluir):
+        copia.pop(nombre, None)
+    return copia.urlencode()
+
+
+def paginar(request, queryset):
+    return Paginator(queryset, por_pagina(request)).get_page(request.GET.get('page'))
+
+
+def paginar_keyset(request, queryset):
+    """Página por cursor ``(creado_en, id)``; un cursor inválido vuelve al inicio."""
+    try:
+        return pagina_keyset(queryset, request.GET.get('cursor'), por_pagina(request))
+    except ValueError:
+        return pagina_keyset(queryset, None, por_pagina(request))
@@ -0,0 +1,55 @@
+from datetime import timedelta
+
+from django.conf import settings
+from django.core.management.base import BaseCommand, CommandError
+from django.utils import timezone
+from django.utils.dateparse import parse_date
+
+from inventario.archivo import archivar_movimientos
+from inventario.historial import fin_del_dia
+from inventario.models import MovimientoStock
+
+
+class Command(BaseCommand):
+    help = (
+        'Mueve a la tabla de archivo los movimientos más antiguos que --dias '
+        '(por defecto INVENTARIO_ARCHIVO_DIAS) o anteriores a --antes-de, en '
+        'lotes de transacción corta. Los listados siguen sobre la tabla caliente; '
+        'el historial y el stock a una fecha leen ambas.'
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('--dias', type=int, default=getattr(settings, 'INVENTARIO_ARCHIVO_DIAS', 365))
+        parser.add_argument('--antes-de', help='Archiva lo anterior a este día (AAAA-MM-DD); ignora --dias.')
+        parser.add_argument('--lote', type=int, default=5000, help='Movimientos por transacción.')
+        parser.add_argument('--pausa-ms', type=float, default=0.0, help='Pausa entre lotes.')
+        parser.add_argument('--simular', action='store_true', help='Solo cuenta lo que se archivaría.')
+
+    def handle(self, *args, **opts):
+        if opts['lote'] < 1:
+            raise CommandError('--lote debe ser positivo.')
+        if opts['antes_de']:
+            try:
+                fecha = parse_date(opts['antes_de'])
+            except ValueError:  # bien formada pero inexistente (2024-02-30)
+                fecha = None
+            if fecha is None:
+                raise CommandError('Fecha inválida, use AAAA-MM-DD.')
+            corte = fin_del_dia(fecha - timedelta(days=1))
+        else:
+            corte = timezone.now() - timedelta(days=opts['dias'])
+
+        if opts['simular']:
+            pendientes = MovimientoStock.objects.filter(creado_en__lt=corte).count()
+            self.stdout.write(f'{pendientes} movimiento(s) anteriores a {corte:%Y-%m-%d %H:%M} se archivarían.')
+            return
+
+        total = archivar_movimientos(
+            corte,
+            lote=opts['lote'],
+            pausa=opts['pausa_ms'] / 1000,
+            progreso=lambda n: self.stdout.write(f'  {n} archivados...') if opts['verbosity'] > 1 else None,
+        )
+        self.stdout.write(self.style.SUCCESS(
+            f'{total} movimiento(s) anteriores a {corte:%Y-%m-%d %H:%M} archivados.'
+        ))
@@ -0,0 +1,238 @@
+import json
+import platform
+import random
+import statistics
+import subprocess
+import time
+import uuid
+
+import django
+from django.contrib.auth.models import User
+from django.core.management.base import BaseCommand, CommandError
+from django.db import connection
+from django.test import Client
+from django.utils import timezone
+from rest_framework.authtoken.models import Token
+
+from inventario.consultas import registrar_consultas
+from inventario.models import Categoria, Producto
+
+
+class Escenario:
+    def __init__(self, nombre, metodo, url, auth='token', datos=None, escribe=False):
+        self.nombre = nombre
+        self.metodo = metodo
+        self.url = url        # str o función sin argumentos que devuelve la URL
+        self.auth = auth      # 'token' | 'sesion' | None
+        self.datos = datos    # función sin argumentos que devuelve el cuerpo
+        self.escribe = escribe
+
+
+class Command(BaseCommand):
+    help = (
+        'Benchmark de las rutas calientes (API y vistas HTML) sobre la base actual '
+        '(p. ej. tras seed_inventario). Reporta throughput, p50/p95/p99 y consultas '
+        'por request; guarda JSON y puede compararse con una corrida anterior. '
+        'Usa el cliente de pruebas de Django en proceso con Host "localhost".'
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('--solicitudes', type=int, default=200, help='Solicitudes medidas por escenario.')
+        parser.add_argument('--calentamiento', type=int, default=10)
+        parser.add_argument('--escenarios', help='Nombres separados por coma (por defecto, todos).')
+        parser.add_argument('--solo-lectura', action='store_true', help='Omite los escenarios que escriben (movimientos de entrada "bench").')
+        parser.add_argument('--salida', help='Archivo JSON donde guardar los resultados.')
+        parser.add_argument('--comparar', help='JSON de una corrida anterior.')
+        parser.add_argument(
+            '--umbral', type=float, default=15.0,
+            help='%% de aumento de p95 (o de consultas) considerado regresión.'
+        )
+        parser.add_argument('--semilla', type=int, default=1)
+
+    def handle(self, *args, **opts):
+        if opts['solicitudes'] < 2:
+            raise CommandError('--solicitudes debe ser al menos 2.')
+        if not Producto.objects.exists():
+            raise CommandError('No hay productos: ejecute antes seed_inventario.')
+
+        self.azar = random.Random(opts['semilla'])
+        clave = uuid.uuid4().hex
+        usuario = User.objects.create_user(f'bench-{clave[:8]}', password=clave, is_staff=True)
+        try:
+            escenarios = self._escenarios(usuario, clave, opts)
+            resultados = self._ejecutar(escenarios, usuario, opts)
+        finally:
+            usuario.delete()
+
+        informe = {
+            'fecha': timezone.now().isoformat(),
+            'commit': self._commit(),
+            'entorno': {
+                'python': platform.python_version(),
+                'django': django.get_version(),
+                'base_de_datos': connection.vendor,
+                'productos': Producto.objects.count(),
+            },
+            'parametros': {k: opts[k] for k in ('solicitudes', 'calentamiento', 'semilla')},
+            'escenarios': resultados,
+        }
+        self._imprimir(resultados)
+
+        if opts['salida']:
+            with open(opts['salida'], 'w', encoding='utf-8') as archivo:
+                json.dump(informe, archivo, indent=2, ensure_ascii=False)
+            self.stdout.write(f'Resultados guardados en {opts["salida"]}')
+
+        if opts['comparar']:
+            self._comparar(resultados, opts['comparar'], opts['umbral'])
+
+    # ----------------------
+    # ESCENARIOS
+    # ----------------------
+    def _escenarios(self, usuario, clave, opts):
+        azar = self.azar
+        ids = list(Producto.objects.order_by('?').values_list('id', flat=True)[:500])
+        categorias = list(Categoria.objects.values_list('id', flat=True)[:50])
+        nombres = Producto.objects.order_by('?').values_list('nombre', flat=True)[:50]
+        palabras = [n.split()[0] for n in nombres if n.split()] or ['a']
+
+        escenarios = [
+            Escenario('api_productos_lista', 'get', '/api/productos/'),
+            Escenario('api_productos_busqueda', 'get', lambda: f'/api/productos/?search={azar.choice(palabras)}'),
+            Escenario(
+                'api_productos_filtro_orden', 'get',
+                lambda: f'/api/productos/?categoria={azar.choice(categorias)}&ordering=-precio',
+            ),
+            Escenario('api_movimientos_lista', 'get', '/api/movimientos/'),
+            Escenario(
+                'api_movimientos_crear', 'post', '/api/movimientos/', escribe=True,
+                datos=lambda: {'producto': azar.choice(ids), 'tipo': 'IN', 'cantidad': 1, 'motivo': 'bench'},
+            ),
+            Escenario(
+                'api_token', 'post', '/api/token/', auth=None,
+                datos=lambda: {'username': usuario.username, 'password': clave},
+            ),
+            Escenario('html_productos', 'get', '/inventario/productos/', auth='sesion'),
+            Escenario(
+                'html_productos_filtro', 'get', auth='sesion',
+                url=lambda: f'/inventario/productos/?categoria={azar.choice(categorias)}&orden=-precio',
+            ),
+            Escenario('html_movimientos', 'get', '/inventario/movimientos/', auth='sesion'),
+            Escenario('html_categorias', 'get', '/inventario/categorias/', auth='sesion'),
+            Escenario('html_proveedores', 'get', '/inventario/proveedores/', auth='sesion'),
+        ]
+
+        if opts['solo_lectura']:
+            escenarios = [e for e in escenarios if not e.escribe]
+        if opts['escenarios']:
+            pedidos = {n.strip() for n in opts['escenarios'].split(',')}
+            desconocidos = pedidos - {e.nombre for e in escenarios}
+            if desconocidos:
+                raise CommandError(f'Escenarios desconocidos: {", ".join(sorted(desconocidos))}')
+            escenarios = [e for e in escenarios if e.nombre in pedidos]
+        return escenarios
+
+    def _clientes(self, usuario):
+        token, _ = Token.objects.get_or_create(user=usuario)
+        sesion = Client(SERVER_NAME='localhost')
+        sesion.force_login(usuario)
+        return {
+            'token': Client(SERVER_NAME='localhost', HTTP_AUTHORIZATION=f'Token {token.key}'),
+            'sesion': sesion,
+            None: Client(SERVER_NAME='localhost'),
+        }
+
+    # ----------------------
+    # MEDICIÓN
+    # ----------------------
+    def _solicitud(self, cliente, escenario):
+        url = escenario.url() if callable(escenario.url) else escenario.url
+        if escenario.metodo == 'get':
+            return cliente.get(url)
+        datos = escenario.datos() if escenario.datos else {}
+        if escenario.auth is None:
+            return cliente.post(url, datos)
+        return cliente.post(url, json.dumps(datos), content_type='application/json')
+
+    def _ejecutar(self, escenarios, usuario, opts):
+        clientes = self._clientes(usuario)
+        resultados = {}
+        for escenario in escenarios:
+            cliente = clientes[escenario.auth]
+            for _ in range(opts['calentamiento']):
+                self._solicitud(cliente, escenario)
+
+            latencias, consultas, errores = [], [], 0
+            inicio_total = time.perf_counter()
+            for _ in range(opts['solicitudes']):
+                with registrar_consultas() as registro:
+                    inicio = time.perf_counter()
+                    respuesta = self._solicitud(cliente, escenario)
+                    latencias.append(time.perf_counter() - inicio)
+                consultas.append(registro.total)
+                if respuesta.status_code >= 400:
+                    errores += 1
+            total = time.perf_counter() - inicio_total
+
+            cuantiles = statistics.quantiles(latencias, n=100, method='inclusive')
+            resultados[escenario.nombre] = {
+                'solicitudes': len(latencias),
+                'errores': errores,
+                'rps': round(len(latencias) / total, 1),
+                'p50_ms': round(cuantiles[49] * 1000, 2),
+                'p95_ms': round(cuantiles[94] * 1000, 2),
+                'p99_ms': round(cuantiles[98] * 1000, 2),
+                'media_ms': round(statistics.fmean(latencias) * 1000, 2),
+                'consultas_por_solicitud': round(statistics.fmean(consultas), 2),
+            }
+            self.stdout.write(f'  {escenario.nombre}: listo')
+        return resultados
+
+    # ----------------------
+    # INFORME / COMPARACIÓN
+    # ----------------------
+    @staticmethod
+    def _commit():
+        try:
+            return subprocess.run(
+                ['git', 'rev-parse', '--short', 'HEAD'],
+                capture_output=True, text=True, check=True, timeout=5,
+            ).stdout.strip()
+        except (OSError, subprocess.SubprocessError):
+            return None
+
+    def _imprimir(self, resultados):
+        self.stdout.write(
+            f'{"escenario":<28}{"rps":>9}{"p50 ms":>10}{"p95 ms":>10}{"p99 ms":>10}{"consultas":>11}{"errores":>9}'
+        )
+        for nombre, r in resultados.items():
+            self.stdout.write(
+                f'{nombre:<28}{r["rps"]:>9}{r["p50_ms"]:>10}{r["p95_ms"]:>10}'
+                f'{r["p99_ms"]:>10}{r["consultas_por_solicitud"]:>11}{r["errores"]:>9}'
+            )
+
+    def _comparar(self, resultados, ruta, umbral):
+        try:
+            with open(ruta, encoding='utf-8') as archivo:
+                anteriores = json.load(archivo)['escenarios']
+        except (OSError, ValueError, KeyError) as exc:
+            raise CommandError(f'No se pudo leer {ruta}: {exc}')
+
+        regresiones = []
+        self.stdout.write(f'\nComparación con {ruta} (umbral {umbral}%):')
+        for nombre, actual in resultados.items():
+            previo = anteriores.get(nombre)
+            if previo is None:
+                continue
+            for campo in ('p95_ms', 'consultas_por_solicitud'):
+                antes, ahora = previo[campo], actual[campo]
+                cambio = (ahora - antes) / antes * 100 if antes else 0.0
+                marca = ''
+                if cambio > umbral:
+                    marca = '  <-- REGRESIÓN'
+                    regresiones.append(f'{nombre}.{campo}')
+                self.stdout.write(f'  {nombre}.{campo}: {antes} -> {ahora} ({cambio:+.1f}%){marca}')
+
+        if regresiones:
+            raise CommandError(f'Regresiones: {", ".join(regresiones)}')
+        self.stdout.write(self.style.SUCCESS('Sin regresiones.'))
@@ -0,0 +1,140 @@
+import asyncio
+import statistics
+import threading
+import time
+import uuid
+from concurrent.futures import ThreadPoolExecutor
+
+from django.conf import settings
+from django.contrib.auth.models import User
+from django.core.management.base import BaseCommand, CommandError
+from django.db import connection, connections
+from django.test import AsyncClient, Client, override_settings
+from rest_framework.authtoken.models import Token
+
+from inventario.models import Producto
+
+
+# (nombre, ruta del viewset WSGI, ruta async); {id} se reemplaza por un producto
+RUTAS = (
+    ('productos', '/api/productos/', '/api/async/productos/'),
+    ('producto', '/api/productos/{id}/', '/api/async/productos/{id}/'),
+    ('stock', '/api/productos/{id}/', '/api/async/productos/{id}/stock/'),
+    ('movimientos', '/api/movimientos/', '/api/async/movimientos/'),
+)
+
+
+class Command(BaseCommand):
+    help = (
+        'Throughput con clientes concurrentes: viewsets DRF servidos como WSGI por '
+        'un pool de --hilos hilos frente a las vistas async (ORM async) en un único '
+        'event loop. --espera-ms simula un cliente lento: en WSGI ocupa el hilo '
+        'del worker; en ASGI solo suspende la corrutina.'
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('--clientes', type=int, default=32, help='Clientes concurrentes.')
+        parser.add_argument('--solicitudes', type=int, default=20, help='Solicitudes por cliente.')
+        parser.add_argument('--hilos', type=int, default=8, help='Hilos del worker WSGI.')
+        parser.add_argument('--espera-ms', type=float, default=0.0, help='Demora simulada por respuesta.')
+        parser.add_argument('--rutas', default=','.join(r[0] for r in RUTAS))
+
+    def handle(self, *args, **opts):
+        if connection.vendor == 'sqlite' and connection.is_in_memory_db():
+            raise CommandError('Se necesita una base en disco compartida entre hilos.')
+        producto = Producto.objects.order_by('id').values_list('id', flat=True).first()
+        if producto is None:
+            raise CommandError('No hay productos: ejecute antes seed_inventario.')
+
+        pedidas = {r.strip() for r in opts['rutas'].split(',')}
+        rutas = [r for r in RUTAS if r[0] in pedidas]
+        if not rutas:
+            raise CommandError(f'Rutas válidas: {", ".join(r[0] for r in RUTAS)}')
+
+        usuario = User.objects.create_user(f'bench-{uuid.uuid4().hex[:8]}', is_staff=True)
+        token = Token.objects.create(user=usuario).key
+        # Los clientes de prueba de Django usan el Host "testserver"
+        hosts = override_settings(ALLOWED_HOSTS=[*settings.ALLOWED_HOSTS, 'testserver'])
+        hosts.enable()
+        try:
+            self.stdout.write(
+                f'{"ruta":<14}{"modo":<7}{"req/s":>9}{"p50 ms":>10}{"p95 ms":>10}{"p99 ms":>10}{"errores":>9}'
+            )
+            for nombre, ruta_wsgi, ruta_async in rutas:
+                for modo, ruta in (('wsgi', ruta_wsgi), ('asgi', ruta_async)):
+                    url = ruta.format(id=producto)
+                    if modo == 'wsgi':
+                        resultado = self._wsgi(url, token, opts)
+                    else:
+                        resultado = asyncio.run(self._asgi(url, token, opts))
+                    self._imprimir(nombre, modo, *resultado)
+        finally:
+            hosts.disable()
+            usuario.delete()
+
+    def _imprimir(self, nombre, modo, latencias, errores, segundos):
+        cuantiles = statistics.quantiles(latencias, n=100, method='inclusive')
+        self.stdout.write(
+            f'{nombre:<14}{modo:<7}{len(latencias) / segundos:>9.1f}{cuantiles[49] * 1000:>10.2f}'
+            f'{cuantiles[94] * 1000:>10.2f}{cuantiles[98] * 1000:>10.2f}{errores:>9}'
+        )
+
+    # ----------------------
+    # WSGI: cada cliente espera su respuesta antes de pedir la siguiente; el
+    # worker atiende con un pool fijo de hilos (la latencia incluye la cola)
+    # ----------------------
+    def _wsgi(self, url, token, opts):
+        espera = opts['espera_ms'] / 1000
+        local = threading.local()
+        latencias, errores = [], []
+
+        def atender():
+            if not hasattr(local, 'cliente'):
+                local.cliente = Client(HTTP_AUTHORIZATION=f'Token {token}')
+            respuesta = local.cliente.get(url)
+            if espera:
+                time.sleep(espera)
+            return respuesta.status_code
+
+        def cliente(pool):
+            for _ in range(opts['solicitudes']):
+                inicio = time.perf_counter()
+                codigo = pool.submit(atender).result()
+                latencias.append(time.perf_counter() - inicio)
+                if codigo != 200:
+                    errores.append(codigo)
+
+        inicio = time.perf_counter()
+        with ThreadPoolExecutor(max_workers=opts['hilos']) as pool:
+            clientes = [threading.Thread(target=cliente, args=(pool,)) for _ in range(opts['clientes'])]
+            for hilo in clientes:
+                hilo.start()
+            for hilo in clientes:
+                hilo.join()
+            segundos = time.perf_counter() - inicio
+            for futuro in [pool.submit(connections.close_all) for _ in range(opts['hilos'])]:
+                futuro.result()
+        return latencias, len(errores), segundos
+
+    # ----------------------
+    # ASGI: un event loop con N corrutinas cliente
+    # ----------------------
+    async def _asgi(self, url, token, opts):
+        espera = opts['espera_ms'] / 1000
+        cabeceras = {'Authorization': f'Token {token}'}
+        latencias, errores = [], []
+
+        async def cliente():
+            http = AsyncClient()
+            for _ in range(opts['solicitudes']):
+                inicio = time.perf_counter()
+                respuesta = await http.get(url, headers=cabeceras)
+                if espera:
+                    await asyncio.sleep(espera)
+                latencias.append(time.perf_counter() - inicio)
+                if respuesta.status_code != 200:
+                    errores.append(respuesta.status_code)
+
+        inicio = time.perf_counter()
+        await asyncio.gather(*(cliente() for _ in range(opts['clientes'])))
+        return latencias, len(errores), time.perf_counter() - inicio
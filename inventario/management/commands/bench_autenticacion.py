@@ -0,0 +1,99 @@
+import statistics
+import time
+import uuid
+
+from django.contrib.auth.models import User
+from django.core.management.base import BaseCommand, CommandError
+from django.test import Client
+from rest_framework.authentication import SessionAuthentication, TokenAuthentication
+from rest_framework.authtoken.models import Token
+from rest_framework.views import APIView
+
+from inventario.autenticacion import CachedTokenAuthentication, tokens_cacheados
+from inventario.consultas import registrar_consultas
+from inventario.models import Producto
+
+
+# Rutas baratas: ahí la consulta de autenticación pesa más; {id} = un producto
+RUTAS = (
+    ('kpis', '/api/kpis/'),
+    ('producto', '/api/productos/{id}/'),
+    ('cache', '/api/cache/estadisticas/'),
+    ('reorden', '/api/productos/reorden/?proveedor=0'),
+)
+MODOS = (
+    ('token', TokenAuthentication),
+    ('token_cache', CachedTokenAuthentication),
+)
+
+
+class Command(BaseCommand):
+    help = (
+        'Consultas por request y throughput de rutas baratas de la API con '
+        'TokenAuthentication (una consulta a authtoken_token + auth_user por '
+        'request) frente a CachedTokenAuthentication (LRU en proceso).'
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('--solicitudes', type=int, default=300, help='Solicitudes medidas por ruta y modo.')
+        parser.add_argument('--calentamiento', type=int, default=10)
+
+    def handle(self, *args, **opts):
+        if opts['solicitudes'] < 2:
+            raise CommandError('--solicitudes debe ser al menos 2.')
+        producto = Producto.objects.order_by('id').values_list('id', flat=True).first()
+        if producto is None:
+            raise CommandError('No hay productos: ejecute antes seed_inventario.')
+
+        usuario = User.objects.create_user(f'bench-{uuid.uuid4().hex[:8]}', is_staff=True)
+        cliente = Client(SERVER_NAME='localhost', HTTP_AUTHORIZATION=f'Token {Token.objects.create(user=usuario).key}')
+        # Las vistas DRF leen authentication_classes de APIView al definirse
+        # la clase; se cambia ahí para medir ambos modos en el mismo proceso
+        originales = APIView.authentication_classes
+        try:
+            self.stdout.write(
+                f'{"ruta":<10}{"modo":<13}{"consultas":>10}{"de auth":>9}{"req/s":>9}{"p50 ms":>9}{"p95 ms":>9}'
+            )
+            for nombre, ruta in RUTAS:
+                for modo, clase in MODOS:
+                    APIView.authentication_classes = [SessionAuthentication, clase]
+                    tokens_cacheados.vaciar()
+                    resultado = self._medir(cliente, ruta.format(id=producto), opts)
+                    self.stdout.write(
+                        f'{nombre:<10}{modo:<13}{resultado["consultas"]:>10.2f}{resultado["auth"]:>9.2f}'
+                        f'{resultado["rps"]:>9.1f}{resultado["p50"]:>9.2f}{resultado["p95"]:>9.2f}'
+                    )
+        finally:
+            APIView.authentication_classes = originales
+            usuario.delete()
+
+        total = tokens_cacheados.aciertos + tokens_cacheados.fallos
+        if total:
+            self.stdout.write(f'Aciertos de la cache de tokens: {tokens_cacheados.aciertos / total:.1%}')
+
+    def _medir(self, cliente, url, opts):
+        for _ in range(opts['calentamiento']):
+            cliente.get(url)
+
+        latencias, consultas, auth = [], 0, 0
+        inicio = time.perf_counter()
+        for _ in range(opts['solicitudes']):
+            t0 = time.perf_counter()
+            with registrar_consultas() as registro:
+                respuesta = cliente.get(url)
+            latencias.append(time.perf_counter() - t0)
+            if respuesta.status_code != 200:
+                raise CommandError(f'{url}: HTTP {respuesta.status_code}')
+            consultas += registro.total
+            auth += sum(1 for sql, _ in registro.consultas if 'authtoken_token' in sql)
+        segundos = time.perf_counter() - inicio
+
+        n = opts['solicitudes']
+        cuantiles = statistics.quantiles(latencias, n=100, method='inclusive')
+        return {
+            'consultas': consultas / n,
+            'auth': auth / n,
+            'rps': n / segundos,
+            'p50': cuantiles[49] * 1000,
+            'p95': cuantiles[94] * 1000,
+        }
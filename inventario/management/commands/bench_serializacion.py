@@ -0,0 +1,66 @@
+import time
+
+from django.core.management.base import BaseCommand, CommandError
+
+from inventario.lista_rapida import serializar_rapido
+from inventario.models import Producto, MovimientoStock
+from inventario.serializers import ProductoSerializer, MovimientoStockSerializer
+
+
+class Command(BaseCommand):
+    help = (
+        'Compara filas por segundo del serializer DRF y de la lista rápida '
+        '(.values()) para productos y movimientos, verificando que la salida sea igual.'
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('--filas', type=int, default=1000, help='Filas por pasada.')
+        parser.add_argument('--repeticiones', type=int, default=5)
+
+    def handle(self, *args, **opts):
+        filas, repeticiones = opts['filas'], opts['repeticiones']
+        if filas < 1 or repeticiones < 1:
+            raise CommandError('--filas y --repeticiones deben ser positivos.')
+
+        casos = [
+            ('productos', Producto.objects.order_by('id'), ProductoSerializer,
+             ('categoria', 'proveedor')),
+            ('movimientos', MovimientoStock.objects.order_by('-creado_en', '-id'),
+             MovimientoStockSerializer, ('producto',)),
+        ]
+        for nombre, queryset, serializer_class, relaciones in casos:
+            queryset = queryset[:filas]
+
+            def serializer():
+                return serializer_class(queryset.select_related(*relaciones), many=True).data
+
+            def rapido():
+                return serializar_rapido(serializer_class, queryset)
+
+            # Misma salida (comparada como JSON-equivalente: dict vs OrderedDict)
+            if [dict(d) for d in serializer()] != rapido():
+                raise CommandError(f'{nombre}: la lista rápida no coincide con el serializer.')
+
+            total = len(rapido())
+            if not total:
+                self.stdout.write(f'{nombre}: sin datos, se omite.')
+                continue
+
+            lento = self._medir(serializer, repeticiones)
+            veloz = self._medir(rapido, repeticiones)
+            self.stdout.write(
+                f'{nombre}: {total} filas x {repeticiones} | '
+                f'serializer {total / lento:,.0f} filas/s | '
+                f'rápida {total / veloz:,.0f} filas/s | x{lento / veloz:.1f}'
+            )
+
+    @staticmethod
+    def _medir(funcion, repeticiones):
+        # Mejor tiempo de N pasadas (menos ruido que el promedio)
+        mejor = None
+        for _ in range(repeticiones):
+            inicio = time.perf_counter()
+            funcion()
+            duracion = time.perf_counter() - inicio
+            mejor = duracion if mejor is None else min(mejor, duracion)
+        return mejor
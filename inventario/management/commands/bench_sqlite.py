@@ -0,0 +1,86 @@
+import json
+import os
+import subprocess
+import sys
+import tempfile
+import time
+
+from django.conf import settings
+from django.core.management.base import BaseCommand, CommandError
+
+
+PERFILES = ('basico', 'optimizado')
+
+
+class Command(BaseCommand):
+    help = (
+        'Contención de escritura en SQLite: ejecuta bench_stock en varios procesos '
+        'a la vez sobre una base temporal con el perfil "basico" (valores de Django) '
+        'y con el "optimizado" (WAL, BEGIN IMMEDIATE, busy_timeout...) y compara '
+        'throughput y errores "database is locked".'
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('--procesos', type=int, default=8, help='Procesos simultáneos por perfil.')
+        parser.add_argument('--hilos', type=int, default=16, help='Hilos por proceso.')
+        parser.add_argument('--operaciones', type=int, default=30, help='Salidas por hilo.')
+        parser.add_argument('--perfiles', default=','.join(PERFILES))
+
+    def handle(self, *args, **opts):
+        perfiles = [p.strip() for p in opts['perfiles'].split(',') if p.strip()]
+        if not perfiles or set(perfiles) - set(PERFILES):
+            raise CommandError(f'Perfiles válidos: {", ".join(PERFILES)}')
+
+        manage = os.path.join(settings.BASE_DIR, 'manage.py')
+        resultados = {}
+        for perfil in perfiles:
+            with tempfile.TemporaryDirectory() as directorio:
+                entorno = {
+                    **os.environ,
+                    'INVENTARIO_DB': 'sqlite',
+                    'INVENTARIO_DB_NAME': os.path.join(directorio, 'bench.sqlite3'),
+                    'INVENTARIO_SQLITE_PERFIL': perfil,
+                }
+                subprocess.run([sys.executable, manage, 'migrate', '-v0'], env=entorno, check=True)
+                resultados[perfil] = self._correr(manage, entorno, opts)
+
+        self.stdout.write(
+            f'{"perfil":<12}{"op/s":>10}{"aplicadas":>11}{"bloqueos":>10}{"deriva":>8}{"segundos":>10}'
+        )
+        for perfil, r in resultados.items():
+            self.stdout.write(
+                f'{perfil:<12}{r["op_por_segundo"]:>10}{r["aplicadas"]:>11}'
+                f'{r["errores_bloqueo"]:>10}{r["deriva"]:>8}{r["segundos"]:>10}'
+            )
+
+    def _correr(self, manage, entorno, opts):
+        comando = [
+            sys.executable, manage, 'bench_stock', '--json',
+            '--hilos', str(opts['hilos']), '--operaciones', str(opts['operaciones']),
+        ]
+        inicio = time.perf_counter()
+        procesos = [
+            subprocess.Popen(comando, env=entorno, stdout=subprocess.PIPE, stderr=subprocess.PIPE, text=True)
+            for _ in range(opts['procesos'])
+        ]
+        salidas = [p.communicate() for p in procesos]
+        segundos = time.perf_counter() - inicio
+
+        total = {'intentos': 0, 'aplicadas': 0, 'errores_bloqueo': 0, 'deriva': 0}
+        fase = []
+        for proceso, (salida, error) in zip(procesos, salidas):
+            lineas = [l for l in salida.splitlines() if l.startswith('{')]
+            if not lineas:
+                # Sin resumen: el proceso ni siquiera pudo preparar sus datos
+                self.stderr.write(error.strip().splitlines()[-1] if error.strip() else 'bench_stock falló')
+                total['errores_bloqueo'] += 1
+                continue
+            datos = json.loads(lineas[-1])
+            fase.append(datos['segundos'])
+            for campo in total:
+                total[campo] += abs(datos[campo]) if campo == 'deriva' else datos[campo]
+
+        # Throughput sobre la fase de contención (sin el arranque de cada proceso)
+        total['segundos'] = round(max(fase) if fase else segundos, 2)
+        total['op_por_segundo'] = round(total['intentos'] / total['segundos'], 1) if total['segundos'] else 0.0
+        return total
@@ -0,0 +1,114 @@
+import json
+import threading
+import time
+import uuid
+
+from django.core.management.base import BaseCommand, CommandError
+from django.db import OperationalError, connection, connections
+from django.db.models import Sum
+
+from inventario.models import Categoria, Proveedor, Producto, MovimientoStock
+from inventario.stock import registrar_movimiento, StockInsuficiente
+
+
+class Command(BaseCommand):
+    help = (
+        'Contención de stock: N hilos registran salidas concurrentes sobre un mismo '
+        'producto y se verifica que el stock final no tenga deriva.'
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('--hilos', type=int, default=16)
+        parser.add_argument('--operaciones', type=int, default=200, help='Salidas por hilo.')
+        parser.add_argument('--cantidad', type=int, default=1, help='Unidades por salida.')
+        parser.add_argument(
+            '--stock-inicial', type=int, default=None,
+            help='Por defecto la mitad de lo que se intenta retirar (fuerza rechazos).'
+        )
+        parser.add_argument('--conservar', action='store_true', help='No borrar los datos de prueba.')
+        parser.add_argument('--json', action='store_true', help='Imprime el resumen como una línea JSON.')
+
+    def handle(self, *args, **opts):
+        if connection.vendor == 'sqlite' and connection.is_in_memory_db():
+            raise CommandError('Se necesita una base en disco compartida entre hilos.')
+
+        hilos, operaciones, cantidad = opts['hilos'], opts['operaciones'], opts['cantidad']
+        stock_inicial = opts['stock_inicial']
+        if stock_inicial is None:
+            stock_inicial = hilos * operaciones * cantidad // 2
+
+        sufijo = uuid.uuid4().hex[:8]
+        categoria = Categoria.objects.create(nombre=f'bench-{sufijo}')
+        proveedor = Proveedor.objects.create(nombre=f'bench-{sufijo}')
+        producto = Producto.objects.create(
+            sku=f'BENCH-{sufijo}', nombre='Bench contención', categoria=categoria,
+            proveedor=proveedor, precio=1, stock_actual=stock_inicial,
+        )
+
+        conteo = {'ok': 0, 'insuficiente': 0, 'bloqueo': 0}
+        candado = threading.Lock()
+        barrera = threading.Barrier(hilos)
+
+        def trabajador():
+            local = {'ok': 0, 'insuficiente': 0, 'bloqueo': 0}
+            try:
+                barrera.wait()
+                for _ in range(operaciones):
+                    try:
+                        registrar_movimiento(producto, MovimientoStock.TIPO_SALIDA, cantidad)
+                        local['ok'] += 1
+                    except StockInsuficiente:
+                        local['insuficiente'] += 1
+                    except OperationalError:
+                        local['bloqueo'] += 1
+            finally:
+                connections.close_all()
+                with candado:
+                    for clave, valor in local.items():
+                        conteo[clave] += valor
+
+        inicio = time.perf_counter()
+        workers = [threading.Thread(target=trabajador) for _ in range(hilos)]
+        for t in workers:
+            t.start()
+        for t in workers:
+            t.join()
+        duracion = time.perf_counter() - inicio
+
+        producto.refresh_from_db()
+        retirado = producto.movimientos.aggregate(total=Sum('cantidad'))['total'] or 0
+        deriva = producto.stock_actual - (stock_inicial - retirado)
+        intentos = hilos * operaciones
+
+        if opts['json']:
+            self.stdout.write(json.dumps({
+                'hilos': hilos,
+                'intentos': intentos,
+                'segundos': round(duracion, 3),
+                'op_por_segundo': round(intentos / duracion, 1),
+                'aplicadas': conteo['ok'],
+                'rechazos_stock': conteo['insuficiente'],
+                'errores_bloqueo': conteo['bloqueo'],
+                'deriva': deriva,
+            }))
+        else:
+            self._resumen(hilos, intentos, duracion, conteo, stock_inicial, producto, retirado)
+
+        if not opts['conservar']:
+            producto.delete()
+            categoria.delete()
+            proveedor.delete()
+
+        if deriva or retirado != conteo['ok'] * cantidad:
+            raise CommandError(f'Deriva de stock detectada: {deriva}')
+        if not opts['json']:
+            self.stdout.write(self.style.SUCCESS('Sin deriva de stock.'))
+
+    def _resumen(self, hilos, intentos, duracion, conteo, stock_inicial, producto, retirado):
+        self.stdout.write(f'hilos={hilos} intentos={intentos} duración={duracion:.2f}s')
+        self.stdout.write(f'throughput={intentos / duracion:.0f} op/s  aplicadas={conteo["ok"]}')
+        self.stdout.write(f'rechazos por stock={conteo["insuficiente"]}  errores de bloqueo={conteo["bloqueo"]}')
+        self.stdout.write(
+            f'stock inicial={stock_inicial} final={producto.stock_actual} '
+            f'retirado según movimientos={retirado}'
+        )
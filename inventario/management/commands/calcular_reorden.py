@@ -0,0 +1,35 @@
+import time
+
+from django.core.management.base import BaseCommand, CommandError
+
+from inventario.pronostico import calcular_reorden, parametros
+
+
+class Command(BaseCommand):
+    help = (
+        'Recalcula días para quiebre y cantidad sugerida de reorden de todos los '
+        'productos a partir del resumen diario de salidas (NumPy, una sola lectura). '
+        'Los valores por defecto salen de INVENTARIO_REORDEN_*.'
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('--historia', type=int, help='Días cerrados de consumo a leer.')
+        parser.add_argument('--ventana', type=int, help='Días de la media móvil.')
+        parser.add_argument('--alfa', type=float, help='Factor del suavizado exponencial (0-1).')
+        parser.add_argument('--plazo', type=int, help='Plazo de entrega en días.')
+        parser.add_argument('--cobertura', type=int, help='Días de consumo que debe cubrir el pedido.')
+
+    def handle(self, *args, **opts):
+        valores = {clave: opts[clave] for clave in ('historia', 'ventana', 'alfa', 'plazo', 'cobertura')}
+        p = parametros(**valores)
+        if not 0 < p['alfa'] <= 1:
+            raise CommandError('--alfa debe estar entre 0 y 1.')
+        if not 0 < p['ventana'] <= p['historia']:
+            raise CommandError('--ventana debe ser positiva y no mayor que --historia.')
+
+        inicio = time.perf_counter()
+        productos, reordenar = calcular_reorden(**valores)
+        self.stdout.write(self.style.SUCCESS(
+            f'{productos} producto(s) pronosticados en {time.perf_counter() - inicio:.1f}s; '
+            f'{reordenar} para reordenar.'
+        ))
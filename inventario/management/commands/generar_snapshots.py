@@ -0,0 +1,30 @@
+from django.core.management.base import BaseCommand, CommandError
+from django.utils.dateparse import parse_date
+
+from inventario.historial import generar_snapshots, PERIODOS
+
+
+class Command(BaseCommand):
+    help = 'Genera los snapshots de stock pendientes a partir del último existente.'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--periodo', choices=PERIODOS, default='diario')
+        parser.add_argument('--hasta', help='Último día a generar (AAAA-MM-DD). Por defecto y como máximo, ayer.')
+
+    def handle(self, *args, **opts):
+        hasta = None
+        if opts['hasta']:
+            try:
+                hasta = parse_date(opts['hasta'])
+            except ValueError:  # bien formada pero inexistente (2024-02-30)
+                hasta = None
+            if hasta is None:
+                raise CommandError('Fecha inválida, use AAAA-MM-DD.')
+
+        fechas = generar_snapshots(hasta=hasta, periodo=opts['periodo'])
+        if not fechas:
+            self.stdout.write('Los snapshots ya están al día.')
+            return
+        self.stdout.write(self.style.SUCCESS(
+            f'{len(fechas)} checkpoint(s) generados: {fechas[0]} .. {fechas[-1]}'
+        ))
@@ -0,0 +1,52 @@
+from django.core.management.base import BaseCommand, CommandError
+
+from inventario.importacion import importar_productos, ErrorImportacion
+
+
+class Command(BaseCommand):
+    help = (
+        'Importa productos desde un CSV con upsert por SKU. Columnas: sku, nombre, '
+        'categoria, proveedor, precio y opcionalmente descripcion, stock_actual, '
+        'stock_minimo, activo.'
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('archivo')
+        parser.add_argument('--lote', type=int, default=1000, help='Filas por transacción.')
+        parser.add_argument('--desde-fila', type=int, default=0, help='Reanudar después de esta fila de datos.')
+        parser.add_argument('--crear-faltantes', action='store_true', help='Crear categorías y proveedores inexistentes.')
+        parser.add_argument('--encoding', default='utf-8-sig')
+
+    def handle(self, *args, **opts):
+        def progreso(resultado):
+            self.stdout.write(
+                f'fila {resultado.ultima_fila}: {resultado.importadas} importadas, '
+                f'{len(resultado.errores)} con error, {resultado.filas_por_segundo:.0f} filas/s'
+            )
+
+        try:
+            with open(opts['archivo'], encoding=opts['encoding'], newline='') as archivo:
+                resultado = importar_productos(
+                    archivo,
+                    tamano_lote=opts['lote'],
+                    desde_fila=opts['desde_fila'],
+                    crear_faltantes=opts['crear_faltantes'],
+                    progreso=progreso,
+                )
+        except (OSError, ErrorImportacion) as exc:
+            if getattr(exc, 'resultado', None) is not None:
+                self._errores(exc.resultado)
+            raise CommandError(str(exc))
+
+        self._errores(resultado)
+
+        datos = resultado.como_dict()
+        self.stdout.write(self.style.SUCCESS(
+            f'{datos["importadas"]} productos importados de {datos["procesadas"]} filas '
+            f'en {datos["segundos"]}s ({datos["filas_por_segundo"]} filas/s). '
+            f'Última fila: {datos["ultima_fila"]}.'
+        ))
+
+    def _errores(self, resultado):
+        for fila, error in resultado.errores:
+            self.stderr.write(f'fila {fila}: {error}')
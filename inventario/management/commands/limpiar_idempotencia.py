@@ -0,0 +1,16 @@
+from django.core.management.base import BaseCommand, CommandError
+
+from inventario.idempotencia import limpiar_vencidas
+
+
+class Command(BaseCommand):
+    help = 'Borra las respuestas guardadas por Idempotency-Key cuyo TTL ya venció.'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--lote', type=int, default=5000, help='Registros por DELETE.')
+
+    def handle(self, *args, **opts):
+        if opts['lote'] < 1:
+            raise CommandError('--lote debe ser positivo.')
+        total = limpiar_vencidas(lote=opts['lote'])
+        self.stdout.write(self.style.SUCCESS(f'{total} clave(s) de idempotencia vencidas borradas.'))
@@ -0,0 +1,51 @@
+import time
+
+from django.core.management.base import BaseCommand, CommandError
+
+from inventario.ingesta import drenar, estado_cola, purgar_procesados
+
+
+# Segundos entre purgas de eventos procesados en modo continuo
+PURGA_CADA = 60
+
+
+class Command(BaseCommand):
+    help = (
+        'Worker de la cola de ingesta: aplica los eventos pendientes de '
+        'POST /api/movimientos/ingesta/ en lotes transaccionales, agrupando '
+        'los deltas de stock por producto. Sin --una-vez queda esperando eventos nuevos.'
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('--lote', type=int, default=500, help='Eventos por transacción.')
+        parser.add_argument('--espera', type=float, default=1.0, help='Segundos entre consultas con la cola vacía.')
+        parser.add_argument('--una-vez', action='store_true', help='Vacía la cola y termina.')
+        parser.add_argument('--retencion-horas', type=int, help='Purga eventos procesados más antiguos (por defecto INVENTARIO_INGESTA_RETENCION_HORAS).')
+
+    def handle(self, *args, **opts):
+        if opts['lote'] < 1:
+            raise CommandError('--lote debe ser positivo.')
+
+        ultima_purga = time.monotonic()
+        while True:
+            inicio = time.perf_counter()
+            eventos, lotes = drenar(opts['lote'])
+            if eventos:
+                segundos = time.perf_counter() - inicio
+                self.stdout.write(
+                    f'{eventos} evento(s) en {lotes} lote(s), {segundos:.2f}s '
+                    f'({eventos / segundos if segundos else 0:,.0f} eventos/s)'
+                )
+            if opts['una_vez']:
+                break
+            # Cola vacía: buen momento para purgar lo ya procesado
+            if time.monotonic() - ultima_purga >= PURGA_CADA:
+                purgar_procesados(opts['retencion_horas'])
+                ultima_purga = time.monotonic()
+            time.sleep(opts['espera'])
+
+        purgados = purgar_procesados(opts['retencion_horas'])
+        pendientes = estado_cola()['pendientes']
+        self.stdout.write(self.style.SUCCESS(
+            f'Cola vacía ({pendientes} pendiente(s)); {purgados} evento(s) procesados purgados.'
+        ))
@@ -0,0 +1,33 @@
+from django.core.management.base import BaseCommand, CommandError
+from django.utils.dateparse import parse_date
+
+from inventario.resumenes import reconstruir_resumenes
+
+
+class Command(BaseCommand):
+    help = (
+        'Recalcula el resumen diario de movimientos desde la tabla caliente y el '
+        'archivo (un mes por transacción). Úselo tras cargas por SQL directo o si '
+        'se sospecha deriva; el mantenimiento normal es incremental.'
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('--desde', help='Primer día a recalcular (AAAA-MM-DD). Por defecto, el primer movimiento.')
+        parser.add_argument('--hasta', help='Último día a recalcular (AAAA-MM-DD). Por defecto, el último movimiento.')
+
+    def handle(self, *args, **opts):
+        fechas = {}
+        for nombre in ('desde', 'hasta'):
+            if opts[nombre]:
+                try:
+                    fechas[nombre] = parse_date(opts[nombre])
+                except ValueError:  # bien formada pero inexistente (2024-02-30)
+                    fechas[nombre] = None
+                if fechas[nombre] is None:
+                    raise CommandError('Fecha inválida, use AAAA-MM-DD.')
+
+        total = reconstruir_resumenes(
+            **fechas,
+            progreso=lambda mes, n: self.stdout.write(f'  {mes:%Y-%m}: {n} filas') if opts['verbosity'] > 1 else None,
+        )
+        self.stdout.write(self.style.SUCCESS(f'{total} fila(s) de resumen escritas.'))
@@ -0,0 +1,234 @@
+import random
+import time
+from datetime import datetime, timedelta, timezone as tz
+from decimal import Decimal
+from itertools import accumulate
+
+from django.conf import settings
+from django.core.management.base import BaseCommand, CommandError
+from django.db import connection, transaction
+from django.utils import timezone
+
+from inventario.cache_referencias import incrementar_version
+from inventario.models import Categoria, Proveedor, Producto, MovimientoStock
+from inventario.resumenes import reconstruir_resumenes
+from inventario.signals import notificar_stock_modificado
+from inventario.stock_bajo import recalcular_stock_bajo
+
+
+MOTIVOS_ENTRADA = ('Reposición', 'Compra a proveedor', 'Devolución de cliente', '')
+MOTIVOS_SALIDA = ('Venta', 'Venta', 'Venta', 'Merma', 'Ajuste de inventario', '')
+
+
+class Command(BaseCommand):
+    help = (
+        'Genera un inventario sintético grande: categorías, proveedores, productos '
+        'con popularidad sesgada (SKUs "calientes") y movimientos con ráfagas, '
+        'insertados en lotes con SQL directo. El stock final de cada producto '
+        'coincide con la suma de sus movimientos.'
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('--categorias', type=int, default=40)
+        parser.add_argument('--proveedores', type=int, default=200)
+        parser.add_argument('--productos', type=int, default=20000)
+        parser.add_argument('--movimientos', type=int, default=1000000)
+        parser.add_argument('--dias', type=int, default=365, help='Antigüedad del primer movimiento.')
+        parser.add_argument(
+            '--sesgo', type=float, default=1.1,
+            help='Exponente Zipf de la popularidad de productos (0 = uniforme).'
+        )
+        parser.add_argument(
+            '--rafagas', type=float, default=0.3,
+            help='Fracción de movimientos concentrados en ráfagas de minutos.'
+        )
+        parser.add_argument('--lote', type=int, default=50000, help='Filas por INSERT/transacción.')
+        parser.add_argument('--semilla', type=int, default=None)
+        parser.add_argument('--prefijo', default='SEED', help='Prefijo de SKUs y nombres generados.')
+
+    def handle(self, *args, **opts):
+        for campo in ('categorias', 'proveedores', 'productos', 'lote', 'dias'):
+            if opts[campo] < 1:
+                raise CommandError(f'--{campo} debe ser positivo.')
+        if opts['movimientos'] < 0 or not 0 <= opts['rafagas'] <= 1:
+            raise CommandError('--movimientos >= 0 y --rafagas entre 0 y 1.')
+
+        self.azar = random.Random(opts['semilla'])
+        self.lote = opts['lote']
+        self.prefijo = opts['prefijo']
+        self.ahora = timezone.now()
+        self.inicio = self.ahora - timedelta(days=opts['dias'])
+        if Producto.objects.filter(sku__startswith=f'{self.prefijo}-').exists():
+            raise CommandError(f'Ya hay productos con prefijo {self.prefijo}; use otro --prefijo.')
+
+        if connection.vendor == 'sqlite':
+            # Caché de páginas amplia para esta conexión: los índices de
+            # movimientos no caben en la de 2 MB por defecto
+            with connection.cursor() as cursor:
+                cursor.execute('PRAGMA cache_size = -262144')
+
+        t0 = time.perf_counter()
+        categorias = self._insertar_referencias(Categoria, opts['categorias'], 'Categoría')
+        proveedores = self._insertar_referencias(Proveedor, opts['proveedores'], 'Proveedor')
+        productos = self._insertar_productos(opts['productos'], categorias, proveedores)
+        self.stdout.write(f'{len(productos)} productos en {time.perf_counter() - t0:.1f}s')
+
+        t1 = time.perf_counter()
+        stocks = self._insertar_movimientos(productos, opts['movimientos'], opts['sesgo'], opts['rafagas'])
+        segundos = time.perf_counter() - t1
+        self.stdout.write(
+            f'{opts["movimientos"]} movimientos en {segundos:.1f}s '
+            f'({opts["movimientos"] / segundos if segundos else 0:,.0f} filas/s)'
+        )
+
+        self._actualizar_stock(productos, stocks)
+
+        # Las inserciones directas no pasan por señales ni por inventario.stock
+        recalcular_stock_bajo()
+        reconstruir_resumenes(desde=timezone.localdate(self.inicio))
+        incrementar_version('categorias')
+        incrementar_version('proveedores')
+        notificar_stock_modificado([])
+        self.stdout.write(self.style.SUCCESS(f'Listo en {time.perf_counter() - t0:.1f}s'))
+
+    # ----------------------
+    # SQL DIRECTO EN LOTES
+    # ----------------------
+    def _insert(self, modelo, columnas, filas):
+        tabla = connection.ops.quote_name(modelo._meta.db_table)
+        sql = 'INSERT INTO {} ({}) VALUES ({})'.format(
+            tabla,
+            ', '.join(connection.ops.quote_name(c) for c in columnas),
+            ', '.join(['%s'] * len(columnas)),
+        )
+        with transaction.atomic(), connection.cursor() as cursor:
+            cursor.executemany(sql, filas)
+
+    def _fecha(self, valor):
+        return connection.ops.adapt_datetimefield_value(valor)
+
+    @staticmethod
+    def _conversor_instantes():
+        # Timestamp -> valor de la columna. En SQLite es el mismo texto UTC que
+        # produce adapt_datetimefield_value, sin su costo por fila
+        if connection.vendor == 'sqlite' and settings.USE_TZ:
+            return lambda instante: str(datetime.fromtimestamp(instante, tz.utc).replace(tzinfo=None))
+        adaptar = connection.ops.adapt_datetimefield_value
+        return lambda instante: adaptar(datetime.fromtimestamp(instante, tz.utc))
+
+    def _insertar_referencias(self, modelo, cantidad, etiqueta):
+        ahora = self._fecha(self.ahora)
+        nombres = [f'{self.prefijo} {etiqueta} {i:05d}' for i in range(1, cantidad + 1)]
+        if modelo is Categoria:
+            columnas = ('nombre', 'descripcion', 'creado_en', 'actualizado_en')
+            filas = [(n, '', ahora, ahora) for n in nombres]
+        else:
+            columnas = ('nombre', 'email', 'telefono', 'direccion', 'activo', 'creado_en', 'actualizado_en')
+            filas = [
+                (n, f'contacto{i}@{self.prefijo.lower()}.example', '', '', True, ahora, ahora)
+                for i, n in enumerate(nombres, start=1)
+            ]
+        self._insert(modelo, columnas, filas)
+        return list(modelo.objects.filter(nombre__in=nombres).values_list('id', flat=True))
+
+    def _insertar_productos(self, cantidad, categorias, proveedores):
+        azar = self.azar
+        creado = self._fecha(self.inicio)
+        columnas = (
+            'sku', 'nombre', 'descripcion', 'categoria_id', 'proveedor_id', 'precio',
+            'stock_actual', 'stock_minimo', 'activo', 'creado_en', 'actualizado_en',
+        )
+        filas = (
+            (
+                f'{self.prefijo}-{i:08d}',
+                f'{self.prefijo} Producto {i}',
+                '',
+                azar.choice(categorias),
+                azar.choice(proveedores),
+                Decimal(f'{min(azar.lognormvariate(8, 1.2), 9e7):.2f}'),
+                0,
+                azar.randint(0, 25),
+                azar.random() > 0.03,
+                creado,
+                creado,
+            )
+            for i in range(1, cantidad + 1)
+        )
+        for bloque in self._bloques(filas):
+            self._insert(Producto, columnas, bloque)
+        return list(
+            Producto.objects.filter(sku__startswith=f'{self.prefijo}-')
+            .order_by('id').values_list('id', flat=True)
+        )
+
+    def _bloques(self, filas):
+        bloque = []
+        for fila in filas:
+            bloque.append(fila)
+            if len(bloque) >= self.lote:
+                yield bloque
+                bloque = []
+        if bloque:
+            yield bloque
+
+    # ----------------------
+    # MOVIMIENTOS
+    # ----------------------
+    def _instantes(self, cantidad, desde, hasta, rafagas):
+        """``cantidad`` instantes ordenados en [desde, hasta) con parte en ráfagas."""
+        azar = self.azar
+        en_rafaga = int(cantidad * rafagas)
+        instantes = [azar.uniform(desde, hasta) for _ in range(cantidad - en_rafaga)]
+        if en_rafaga:
+            centros = [azar.uniform(desde, hasta) for _ in range(azar.randint(1, 3))]
+            for _ in range(en_rafaga):
+                instante = azar.choice(centros) + azar.gauss(0, 600)
+                instantes.append(min(max(instante, desde), hasta - 1e-3))
+        instantes.sort()
+        return instantes
+
+    def _insertar_movimientos(self, productos, total, sesgo, rafagas):
+        azar = self.azar
+        # Popularidad Zipf con el ranking barajado: los SKUs calientes quedan repartidos
+        ranking = productos[:]
+        azar.shuffle(ranking)
+        pesos = list(accumulate(1 / (rango ** sesgo) for rango in range(1, len(ranking) + 1)))
+
+        stocks = dict.fromkeys(productos, 0)
+        columnas = ('producto_id', 'tipo', 'cantidad', 'motivo', 'creado_en')
+        entrada, salida = MovimientoStock.TIPO_ENTRADA, MovimientoStock.TIPO_SALIDA
+        desde, hasta = self.inicio.timestamp(), self.ahora.timestamp()
+        convertir = self._conversor_instantes()
+        ventanas = max(1, -(-total // self.lote))
+        paso = (hasta - desde) / ventanas
+        generados = 0
+
+        # Cada ventana de tiempo es un lote: los movimientos se insertan en orden cronológico
+        for ventana in range(ventanas):
+            cantidad = min(self.lote, total - generados)
+            elegidos = azar.choices(ranking, cum_weights=pesos, k=cantidad)
+            instantes = self._instantes(cantidad, desde + ventana * paso, desde + (ventana + 1) * paso, rafagas)
+            filas = []
+            for producto, instante in zip(elegidos, instantes):
+                unidades = azar.randint(1, 5)
+                # Se repone si la salida no alcanza (nunca queda stock negativo)
+                if stocks[producto] < unidades or azar.random() < 0.12:
+                    tipo, unidades, motivo = entrada, azar.randint(20, 200), azar.choice(MOTIVOS_ENTRADA)
+                    stocks[producto] += unidades
+                else:
+                    tipo, motivo = salida, azar.choice(MOTIVOS_SALIDA)
+                    stocks[producto] -= unidades
+                filas.append((producto, tipo, unidades, motivo, convertir(instante)))
+            self._insert(MovimientoStock, columnas, filas)
+            generados += cantidad
+            if ventanas > 1 and (ventana + 1) % 20 == 0:
+                self.stdout.write(f'  {generados}/{total} movimientos...')
+        return stocks
+
+    def _actualizar_stock(self, productos, stocks):
+        tabla = connection.ops.quote_name(Producto._meta.db_table)
+        sql = f'UPDATE {tabla} SET stock_actual = %s WHERE id = %s'
+        filas = [(stocks[pid], pid) for pid in productos if stocks[pid]]
+        for bloque in self._bloques(filas):
+            with transaction.atomic(), connection.cursor() as cursor:
+                cursor.executemany(sql, bloque)
@@ -0,0 +1,322 @@
+import atexit
+import glob
+import hmac
+import json
+import logging
+import os
+import tempfile
+import threading
+import time
+from bisect import bisect_left
+from contextlib import nullcontext
+
+from asgiref.sync import iscoroutinefunction, markcoroutinefunction
+from django.conf import settings
+
+from .consultas import registrar_consultas, registrar_en_contexto
+
+logger = logging.getLogger('inventario.metricas')
+
+# Límites (segundos) de los buckets de latencia; los de Prometheus por defecto
+BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0)
+
+SIN_RUTA = '<sin_ruta>'
+
+
+def _serie_vacia():
+    return {
+        'solicitudes': 0,
+        'buckets': [0] * (len(BUCKETS) + 1),  # el último es +Inf
+        'segundos': 0.0,
+        'consultas': 0,
+        'sql_segundos': 0.0,
+        'bytes': 0,
+    }
+
+
+def _varios_procesos():
+    """¿Hay otros workers sirviendo la misma aplicación?
+
+    ``WEB_CONCURRENCY`` (gunicorn, uvicorn) o, en Linux, procesos hermanos
+    en /proc con el mismo padre y la misma línea de comandos.
+    """
+    try:
+        if int(os.environ.get('WEB_CONCURRENCY', 1)) > 1:
+            return True
+    except ValueError:
+        pass
+    try:
+        padre, propia = os.getppid(), _linea_de_comandos('self')
+        for pid in os.listdir('/proc'):
+            if not pid.isdigit() or int(pid) == os.getpid():
+                continue
+            with open(f'/proc/{pid}/stat', encoding='utf-8') as archivo:
+                # El nombre va entre paréntesis y puede contener espacios
+                ppid = int(archivo.read().rsplit(')', 1)[1].split()[1])
+            if ppid == padre and _linea_de_comandos(pid) == propia:
+                return True
+    except (OSError, ValueError, IndexError):
+        pass
+    return False
+
+
+def _linea_de_comandos(pid):
+    with open(f'/proc/{pid}/cmdline', 'rb') as archivo:
+        return archivo.read()
+
+
+def _sumar(destino, origen):
+    for campo in ('solicitudes', 'segundos', 'consultas', 'sql_segundos', 'bytes'):
+        destino[campo] += origen[campo]
+    destino['buckets'] = [a + b for a, b in zip(destino['buckets'], origen['buckets'])]
+
+
+class Metricas:
+    """Acumulador del proceso, volcado a ``<dir>/metricas-<pid>.json``.
+
+    Cada worker escribe solo su archivo (como mucho cada
+    ``INVENTARIO_METRICAS_INTERVALO`` segundos) y ``/metrics`` suma todos,
+    así los contadores son globales aunque haya varios procesos. Los archivos
+    de procesos terminados se conservan para que los totales no retrocedan.
+    Sin directorio y con varios workers cada scrape vería solo un proceso
+    distinto: se avisa una vez por proceso.
+    """
+
+    def __init__(self):
+        self.candado = threading.Lock()
+        self.pid = None
+        self.series = {}
+        self.ultimo_volcado = 0.0
+        self.avisado = False
+
+    @property
+    def directorio(self):
+        return getattr(settings, 'INVENTARIO_METRICAS_DIR', None)
+
+    def _archivo(self, pid):
+        return os.path.join(self.directorio, f'metricas-{pid}.json')
+
+    def _comprobar_proceso(self):
+        # Tras un fork el hijo no debe heredar (ni volver a contar) lo del padre
+        pid = os.getpid()
+        if pid != self.pid:
+            self.pid = pid
+            self.series = {}
+            if self.directorio:
+                # Un archivo con nuestro pid es de un proceso anterior: se continúa
+                self.series = self._leer(self._archivo(pid))
+            elif not self.avisado and _varios_procesos():
+                self.avisado = True
+                logger.warning(
+                    'Varios workers sin INVENTARIO_METRICAS_DIR: /metrics solo mostrará '
+                    'los contadores del proceso que atienda cada scrape.'
+                )
+
+    def observar(self, ruta, metodo, codigo, segundos, consultas, sql_segundos, tamano):
+        with self.candado:
+            self._comprobar_proceso()
+            clave = (ruta, metodo, str(codigo))
+            serie = self.series.get(clave)
+            if serie is None:
+                serie = self.series[clave] = _serie_vacia()
+            serie['solicitudes'] += 1
+            serie['buckets'][bisect_left(BUCKETS, segundos)] += 1
+            serie['segundos'] += segundos
+            serie['consultas'] += consultas
+            serie['sql_segundos'] += sql_segundos
+            serie['bytes'] += tamano
+
+            intervalo = getattr(settings, 'INVENTARIO_METRICAS_INTERVALO', 5)
+            if self.directorio and time.monotonic() - self.ultimo_volcado >= intervalo:
+                self._volcar()
+
+    # ----------------------
+    # PERSISTENCIA POR PROCESO
+    # ----------------------
+    @staticmethod
+    def _leer(ruta):
+        try:
+            with open(ruta, encoding='utf-8') as archivo:
+                filas = json.load(archivo)
+        except (OSError, ValueError):
+            return {}
+        return {(f['ruta'], f['metodo'], f['codigo']): f['serie'] for f in filas}
+
+    def _volcar(self):
+        os.makedirs(self.directorio, exist_ok=True)
+        filas = [
+            {'ruta': r, 'metodo': m, 'codigo': c, 'serie': serie}
+            for (r, m, c), serie in self.series.items()
+        ]
+        # Escritura atómica: quien lea nunca ve un archivo a medias
+        descriptor, temporal = tempfile.mkstemp(dir=self.directorio, suffix='.tmp')
+        with os.fdopen(descriptor, 'w', encoding='utf-8') as archivo:
+            json.dump(filas, archivo)
+        os.replace(temporal, self._archivo(self.pid))
+        self.ultimo_volcado = time.monotonic()
+
+    def volcar(self):
+        with self.candado:
+            self._comprobar_proceso()
+            if self.directorio:
+                self._volcar()
+
+    def combinadas(self):
+        """Series de todos los procesos (o solo de este si no hay directorio)."""
+        self.volcar()
+        if not self.directorio:
+            with self.candado:
+                return {clave: dict(serie) for clave, serie in self.series.items()}
+
+        total = {}
+        for ruta in glob.glob(os.path.join(self.directorio, 'metricas-*.json')):
+            for clave, serie in self._leer(ruta).items():
+                if clave not in total:
+                    total[clave] = _serie_vacia()
+                _sumar(total[clave], serie)
+        return total
+
+
+metricas = Metricas()
+atexit.register(lambda: metricas.series and metricas.volcar())
+
+
+# ----------------------
+# ACCESO A /metrics
+# ----------------------
+def acceso_permitido(request):
+    """Staff con sesión, ``Authorization: Bearer <INVENTARIO_METRICAS_TOKEN>``
+    o una IP de ``INVENTARIO_METRICAS_IPS`` (``REMOTE_ADDR``; detrás de un
+    proxy, la del proxy).
+    """
+    usuario = getattr(request, 'user', None)
+    if usuario is not None and usuario.is_authenticated and usuario.is_staff:
+        return True
+
+    token = getattr(settings, 'INVENTARIO_METRICAS_TOKEN', None)
+    tipo, _, valor = request.headers.get('Authorization', '').partition(' ')
+    if token and tipo.lower() == 'bearer' and hmac.compare_digest(valor.strip().encode(), token.encode()):
+        return True
+
+    return request.META.get('REMOTE_ADDR') in getattr(settings, 'INVENTARIO_METRICAS_IPS', ())
+
+
+# ----------------------
+# FORMATO DE TEXTO PROMETHEUS
+# ----------------------
+def _etiqueta(valor):
+    return str(valor).replace('\\', r'\\').replace('"', r'\"').replace('\n', r'\n')
+
+
+def _etiquetas(**pares):
+    return '{' + ','.join(f'{k}="{_etiqueta(v)}"' for k, v in pares.items()) + '}'
+
+
+def exposicion():
+    series = sorted(metricas.combinadas().items())
+    lineas = []
+
+    def familia(nombre, tipo, ayuda):
+        lineas.append(f'# HELP {nombre} {ayuda}')
+        lineas.append(f'# TYPE {nombre} {tipo}')
+
+    familia('inventario_http_solicitudes_total', 'counter', 'Solicitudes HTTP por ruta, método y código.')
+    for (ruta, metodo, codigo), serie in series:
+        lineas.append(
+            f'inventario_http_solicitudes_total{_etiquetas(ruta=ruta, metodo=metodo, codigo=codigo)} '
+            f'{serie["solicitudes"]}'
+        )
+
+    # Histograma y demás contadores se agregan sin el código de respuesta
+    por_ruta = {}
+    for (ruta, metodo, _), serie in series:
+        if (ruta, metodo) not in por_ruta:
+            por_ruta[(ruta, metodo)] = _serie_vacia()
+        _sumar(por_ruta[(ruta, metodo)], serie)
+
+    familia('inventario_http_latencia_segundos', 'histogram', 'Latencia de las solicitudes HTTP.')
+    for (ruta, metodo), serie in por_ruta.items():
+        acumulado = 0
+        for limite, cantidad in zip((*BUCKETS, '+Inf'), serie['buckets']):
+            acumulado += cantidad
+            lineas.append(
+                f'inventario_http_latencia_segundos_bucket'
+                f'{_etiquetas(ruta=ruta, metodo=metodo, le=limite)} {acumulado}'
+            )
+        etiquetas = _etiquetas(ruta=ruta, metodo=metodo)
+        lineas.append(f'inventario_http_latencia_segundos_sum{etiquetas} {serie["segundos"]:.6f}')
+        lineas.append(f'inventario_http_latencia_segundos_count{etiquetas} {serie["solicitudes"]}')
+
+    for nombre, campo, ayuda, formato in (
+        ('inventario_db_consultas_total', 'consultas', 'Consultas SQL ejecutadas.', '{}'),
+        ('inventario_db_segundos_total', 'sql_segundos', 'Tiempo en consultas SQL.', '{:.6f}'),
+        ('inventario_http_respuesta_bytes_total', 'bytes', 'Bytes de cuerpo de respuesta.', '{}'),
+    ):
+        familia(nombre, 'counter', ayuda)
+        for (ruta, metodo), serie in por_ruta.items():
+            lineas.append(f'{nombre}{_etiquetas(ruta=ruta, metodo=metodo)} {formato.format(serie[campo])}')
+
+    return '\n'.join(lineas) + '\n'
+
+
+# ----------------------
+# MIDDLEWARE
+# ----------------------
+def _ruta(request):
+    match = getattr(request, 'resolver_match', None)
+    if match is None:
+        return SIN_RUTA
+    return match.view_name or match.route or SIN_RUTA
+
+
+def _tamano(response):
+    if response.streaming:
+        return int(response.get('Content-Length') or 0)
+    return len(response.content)
+
+
+class MetricasMiddleware:
+    """Latencia, consultas y tamaño de respuesta por ruta resuelta y método.
+
+    Va primero en ``MIDDLEWARE`` para medir la solicitud completa. Las
+    consultas las aporta ``ConsultasMiddleware`` (``request.registro_consultas``);
+    si no está instalado se cuentan aquí.
+    """
+
+    sync_capable = True
+    async_capable = True
+
+    def __init__(self, get_response):
+        self.get_response = get_response
+        self.contar_aqui = 'inventario.consultas.ConsultasMiddleware' not in settings.MIDDLEWARE
+        if iscoroutinefunction(get_response):
+            markcoroutinefunction(self)
+
+    def __call__(self, request):
+        if iscoroutinefunction(self):
+            return self.__acall__(request)
+        inicio = time.perf_counter()
+        with registrar_consultas() if self.contar_aqui else nullcontext() as propio:
+            response = self.get_response(request)
+        self._observar(request, response, time.perf_counter() - inicio, propio)
+        return response
+
+    async def __acall__(self, request):
+        inicio = time.perf_counter()
+        with registrar_en_contexto() if self.contar_aqui else nullcontext() as propio:
+            response = await self.get_response(request)
+        self._observar(request, response, time.perf_counter() - inicio, propio)
+        return response
+
+    @staticmethod
+    def _observar(request, response, segundos, propio):
+        registro = propio or getattr(request, 'registro_consultas', None)
+        metricas.observar(
+            _ruta(request),
+            request.method,
+            response.status_code,
+            segundos,
+            registro.total if registro else 0,
+            registro.milisegundos / 1000 if registro else 0.0,
+            _tamano(response),
+        )
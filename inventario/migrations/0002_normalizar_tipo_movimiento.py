@@ -0,0 +1,19 @@
+from django.db import migrations
+
+
+# La vista HTML guardaba 'ENTRADA'/'SALIDA' en lugar de los códigos del modelo
+def normalizar_tipos(apps, schema_editor):
+    MovimientoStock = apps.get_model('inventario', 'MovimientoStock')
+    MovimientoStock.objects.filter(tipo='ENTRADA').update(tipo='IN')
+    MovimientoStock.objects.filter(tipo='SALIDA').update(tipo='OUT')
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('inventario', '0001_initial'),
+    ]
+
+    operations = [
+        migrations.RunPython(normalizar_tipos, migrations.RunPython.noop),
+    ]
@@ -0,0 +1,17 @@
+# Generated by Django 6.0 on 2026-10-18 08:22
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('inventario', '0002_normalizar_tipo_movimiento'),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name='movimientostock',
+            index=models.Index(fields=['-creado_en', '-id'], name='mov_creado_id_idx'),
+        ),
+    ]
@@ -0,0 +1,61 @@
+from django.db import migrations
+
+
+# Índices FTS5 externos (content=) sobre productos y proveedores.
+# Los triggers los mantienen sincronizados con cualquier INSERT/UPDATE/DELETE,
+# incluidas las operaciones masivas que no disparan señales de Django.
+TABLAS = {
+    'inventario_producto': ('nombre', 'sku'),
+    'inventario_proveedor': ('nombre', 'email'),
+}
+
+
+def _sql_crear(tabla, columnas):
+    fts = f'{tabla}_fts'
+    cols = ', '.join(columnas)
+    nuevos = ', '.join(f'new.{c}' for c in columnas)
+    viejos = ', '.join(f'old.{c}' for c in columnas)
+    return [
+        f"CREATE VIRTUAL TABLE {fts} USING fts5({cols}, content='{tabla}', "
+        f"content_rowid='id', tokenize='unicode61 remove_diacritics 2', prefix='2 3')",
+
+        f"CREATE TRIGGER {fts}_ai AFTER INSERT ON {tabla} BEGIN "
+        f"INSERT INTO {fts}(rowid, {cols}) VALUES (new.id, {nuevos}); END",
+
+        f"CREATE TRIGGER {fts}_ad AFTER DELETE ON {tabla} BEGIN "
+        f"INSERT INTO {fts}({fts}, rowid, {cols}) VALUES ('delete', old.id, {viejos}); END",
+
+        f"CREATE TRIGGER {fts}_au AFTER UPDATE OF {cols} ON {tabla} BEGIN "
+        f"INSERT INTO {fts}({fts}, rowid, {cols}) VALUES ('delete', old.id, {viejos}); "
+        f"INSERT INTO {fts}(rowid, {cols}) VALUES (new.id, {nuevos}); END",
+
+        f"INSERT INTO {fts}({fts}) VALUES ('rebuild')",
+    ]
+
+
+def crear_fts(apps, schema_editor):
+    if schema_editor.connection.vendor != 'sqlite':
+        return
+    for tabla, columnas in TABLAS.items():
+        for sql in _sql_crear(tabla, columnas):
+            schema_editor.execute(sql)
+
+
+def eliminar_fts(apps, schema_editor):
+    if schema_editor.connection.vendor != 'sqlite':
+        return
+    for tabla in TABLAS:
+        for sufijo in ('ai', 'ad', 'au'):
+            schema_editor.execute(f'DROP TRIGGER IF EXISTS {tabla}_fts_{sufijo}')
+        schema_editor.execute(f'DROP TABLE IF EXISTS {tabla}_fts')
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('inventario', '0003_movimiento_indice_keyset'),
+    ]
+
+    operations = [
+        migrations.RunPython(crear_fts, eliminar_fts),
+    ]
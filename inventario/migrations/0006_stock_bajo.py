@@ -0,0 +1,44 @@
+# Generated by Django 6.0 on 2026-10-18 08:26
+
+import django.db.models.deletion
+from django.db import migrations, models
+
+
+def calcular_conteos(apps, schema_editor):
+    Producto = apps.get_model('inventario', 'Producto')
+    Categoria = apps.get_model('inventario', 'Categoria')
+    StockBajoCategoria = apps.get_model('inventario', 'StockBajoCategoria')
+
+    conteos = dict(
+        Producto.objects.filter(stock_actual__lte=models.F('stock_minimo'))
+        .order_by()
+        .values('categoria_id')
+        .annotate(total=models.Count('id'))
+        .values_list('categoria_id', 'total')
+    )
+    StockBajoCategoria.objects.bulk_create([
+        StockBajoCategoria(categoria_id=cid, total=conteos.get(cid, 0))
+        for cid in Categoria.objects.values_list('id', flat=True)
+    ])
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('inventario', '0005_snapshot_stock'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='StockBajoCategoria',
+            fields=[
+                ('categoria', models.OneToOneField(on_delete=django.db.models.deletion.CASCADE, primary_key=True, related_name='stock_bajo', serialize=False, to='inventario.categoria')),
+                ('total', models.IntegerField(default=0)),
+            ],
+        ),
+        migrations.AddIndex(
+            model_name='producto',
+            index=models.Index(condition=models.Q(('stock_actual__lte', models.F('stock_minimo'))), fields=['categoria'], name='producto_stock_bajo_idx'),
+        ),
+        migrations.RunPython(calcular_conteos, migrations.RunPython.noop),
+    ]
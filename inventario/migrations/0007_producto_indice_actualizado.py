@@ -0,0 +1,17 @@
+# Generated by Django 6.0 on 2026-10-18 08:29
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('inventario', '0006_stock_bajo'),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name='producto',
+            index=models.Index(fields=['actualizado_en'], name='producto_actualizado_idx'),
+        ),
+    ]
@@ -0,0 +1,30 @@
+# Generated by Django 6.0 on 2026-10-18 08:51
+
+import django.db.models.deletion
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('inventario', '0008_indices_listados'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='MovimientoStockArchivo',
+            fields=[
+                ('id', models.BigIntegerField(primary_key=True, serialize=False)),
+                ('tipo', models.CharField(choices=[('IN', 'Entrada'), ('OUT', 'Salida')], max_length=3)),
+                ('cantidad', models.PositiveIntegerField()),
+                ('motivo', models.CharField(blank=True, max_length=255)),
+                ('creado_en', models.DateTimeField()),
+                ('archivado_en', models.DateTimeField(auto_now_add=True)),
+                ('producto', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='movimientos_archivados', to='inventario.producto')),
+            ],
+            options={
+                'ordering': ['-creado_en'],
+                'indexes': [models.Index(fields=['-creado_en', '-id'], name='mov_arch_creado_id_idx'), models.Index(fields=['producto', '-creado_en', '-id'], name='mov_arch_producto_creado_idx')],
+            },
+        ),
+    ]
@@ -0,0 +1,31 @@
+# Generated by Django 6.0 on 2026-10-18 08:54
+
+import django.db.models.deletion
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('inventario', '0009_movimiento_archivo'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='ResumenDiarioMovimiento',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('fecha', models.DateField()),
+                ('cantidad_entrada', models.BigIntegerField(default=0)),
+                ('cantidad_salida', models.BigIntegerField(default=0)),
+                ('entradas', models.IntegerField(default=0)),
+                ('salidas', models.IntegerField(default=0)),
+                ('producto', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='resumenes_diarios', to='inventario.producto')),
+            ],
+            options={
+                'ordering': ['-fecha'],
+                'indexes': [models.Index(fields=['fecha'], name='resumen_fecha_idx')],
+                'constraints': [models.UniqueConstraint(fields=('producto', 'fecha'), name='resumen_producto_fecha_unico')],
+            },
+        ),
+    ]
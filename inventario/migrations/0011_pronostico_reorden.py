@@ -0,0 +1,30 @@
+# Generated by Django 6.0 on 2026-10-18 08:57
+
+import django.db.models.deletion
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('inventario', '0010_resumen_diario_movimiento'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='PronosticoReorden',
+            fields=[
+                ('producto', models.OneToOneField(on_delete=django.db.models.deletion.CASCADE, primary_key=True, related_name='pronostico', serialize=False, to='inventario.producto')),
+                ('consumo_promedio', models.FloatField()),
+                ('consumo_suavizado', models.FloatField()),
+                ('dias_para_quiebre', models.FloatField(blank=True, null=True)),
+                ('punto_reorden', models.PositiveIntegerField()),
+                ('cantidad_sugerida', models.PositiveIntegerField()),
+                ('reordenar', models.BooleanField(default=False)),
+                ('calculado_en', models.DateTimeField()),
+            ],
+            options={
+                'indexes': [models.Index(fields=['reordenar', 'dias_para_quiebre'], name='pronostico_reordenar_idx')],
+            },
+        ),
+    ]
@@ -0,0 +1,17 @@
+# Generated by Django 6.0 on 2026-10-18 09:23
+
+from django.db import migrations
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('inventario', '0013_evento_movimiento'),
+    ]
+
+    operations = [
+        migrations.RemoveIndex(
+            model_name='producto',
+            name='producto_actualizado_idx',
+        ),
+    ]
@@ -1,3 +1,4 @@
+from django.conf import settings
 from django.db import models
 from django.core.exceptions import ValidationError
 
@@ -26,6 +27,9 @@ class Proveedor(models.Model):
 
     class Meta:
         ordering = ['nombre']
+        indexes = [
+            models.Index(fields=['nombre'], name='proveedor_nombre_idx'),
+        ]
 
     def __str__(self):
         return self.nombre
@@ -46,6 +50,16 @@ class Producto(models.Model):
 
     class Meta:
         ordering = ['nombre']
+        indexes = [
+            # Índice parcial: solo productos en stock bajo, agrupables por categoría
+            models.Index(
+                fields=['categoria'],
+                condition=models.Q(stock_actual__lte=models.F('stock_minimo')),
+                name='producto_stock_bajo_idx',
+            ),
+            # Orden por defecto de los listados
+            models.Index(fields=['nombre', 'id'], name='producto_nombre_idx'),
+        ]
 
     def __str__(self):
         return f'{self.nombre} ({self.sku})'
@@ -74,6 +88,12 @@ class MovimientoStock(models.Model):
 
     class Meta:
         ordering = ['-creado_en']
+        indexes = [
+            # Paginación keyset del historial: (creado_en, id) descendente
+            models.Index(fields=['-creado_en', '-id'], name='mov_creado_id_idx'),
+            # Historial de un producto con la misma paginación
+            models.Index(fields=['producto', '-creado_en', '-id'], name='mov_producto_creado_idx'),
+        ]
 
     def __str__(self):
         return f'{self.get_tipo_display()} - {self.producto} - {self.cantidad}'
@@ -88,3 +108,168 @@ class MovimientoStock(models.Model):
             nuevo_stock = self.producto.stock_actual - self.cantidad
             if nuevo_stock < 0:
                 raise ValidationError('El movimiento dejaría el stock en negativo.')
+
+
+class MovimientoStockArchivo(models.Model):
+    # Movimientos antiguos movidos fuera de MovimientoStock por
+    # `archivar_movimientos`; conservan id y fecha originales
+    id = models.BigIntegerField(primary_key=True)
+    producto = models.ForeignKey(Producto, on_delete=models.CASCADE, related_name='movimientos_archivados')
+    tipo = models.CharField(max_length=3, choices=MovimientoStock.TIPO_CHOICES)
+    cantidad = models.PositiveIntegerField()
+    motivo = models.CharField(max_length=255, blank=True)
+    creado_en = models.DateTimeField()
+    archivado_en = models.DateTimeField(auto_now_add=True)
+
+    class Meta:
+        ordering = ['-creado_en']
+        indexes = [
+            models.Index(fields=['-creado_en', '-id'], name='mov_arch_creado_id_idx'),
+            models.Index(fields=['producto', '-creado_en', '-id'], name='mov_arch_producto_creado_idx'),
+        ]
+
+    def __str__(self):
+        return f'{self.get_tipo_display()} - {self.producto} - {self.cantidad} (archivado)'
+
+
+class StockBajoCategoria(models.Model):
+    # Conteo mantenido de productos con stock_actual <= stock_minimo por categoría
+    categoria = models.OneToOneField(
+        Categoria, on_delete=models.CASCADE, primary_key=True, related_name='stock_bajo'
+    )
+    total = models.IntegerField(default=0)
+
+    def __str__(self):
+        return f'{self.categoria}: {self.total}'
+
+
+class SnapshotStock(models.Model):
+    # Stock de un producto al cierre de `fecha` (hora local)
+    producto = models.ForeignKey(Producto, on_delete=models.CASCADE, related_name='snapshots')
+    fecha = models.DateField()
+    stock = models.IntegerField()
+    creado_en = models.DateTimeField(auto_now_add=True)
+
+    class Meta:
+        ordering = ['-fecha']
+        constraints = [
+            models.UniqueConstraint(fields=['producto', 'fecha'], name='snapshot_producto_fecha_unico'),
+        ]
+
+    def __str__(self):
+        return f'{self.producto} @ {self.fecha}: {self.stock}'
+
+
+class ResumenDiarioMovimiento(models.Model):
+    # Totales de movimientos por producto y día (hora local); se mantiene en
+    # la misma transacción que cada movimiento (inventario.resumenes)
+    producto = models.ForeignKey(Producto, on_delete=models.CASCADE, related_name='resumenes_diarios')
+    fecha = models.DateField()
+    cantidad_entrada = models.BigIntegerField(default=0)
+    cantidad_salida = models.BigIntegerField(default=0)
+    entradas = models.IntegerField(default=0)
+    salidas = models.IntegerField(default=0)
+
+    class Meta:
+        ordering = ['-fecha']
+        constraints = [
+            models.UniqueConstraint(fields=['producto', 'fecha'], name='resumen_producto_fecha_unico'),
+        ]
+        indexes = [
+            # Series de todos los productos (o de una categoría) por rango de fechas
+            models.Index(fields=['fecha'], name='resumen_fecha_idx'),
+        ]
+
+    def __str__(self):
+        return f'{self.producto} @ {self.fecha}: +{self.cantidad_entrada} / -{self.cantidad_salida}'
+
+
+class PronosticoReorden(models.Model):
+    # Último resultado de `calcular_reorden` para cada producto
+    producto = models.OneToOneField(Producto, on_delete=models.CASCADE, primary_key=True, related_name='pronostico')
+    # Unidades de salida por día: media móvil y suavizado exponencial
+    consumo_promedio = models.FloatField()
+    consumo_suavizado = models.FloatField()
+    dias_para_quiebre = models.FloatField(null=True, blank=True)
+    punto_reorden = models.PositiveIntegerField()
+    cantidad_sugerida = models.PositiveIntegerField()
+    reordenar = models.BooleanField(default=False)
+    calculado_en = models.DateTimeField()
+
+    class Meta:
+        indexes = [
+            models.Index(fields=['reordenar', 'dias_para_quiebre'], name='pronostico_reordenar_idx'),
+        ]
+
+    def __str__(self):
+        return f'{self.producto}: {self.cantidad_sugerida} sugeridas'
+
+
+class ClaveIdempotencia(models.Model):
+    # Primera respuesta a un POST con cabecera Idempotency-Key, por usuario
+    # (inventario.idempotencia). estado nulo: la transacción de la solicitud
+    # original todavía no guardó su respuesta
+    usuario = models.ForeignKey(settings.AUTH_USER_MODEL, on_delete=models.CASCADE, related_name='+')
+    clave = models.CharField(max_length=255)
+    huella = models.CharField(max_length=64)
+    estado = models.PositiveSmallIntegerField(null=True, blank=True)
+    tipo_contenido = models.CharField(max_length=100, blank=True)
+    cuerpo = models.BinaryField(blank=True, default=b'')
+    creado_en = models.DateTimeField(auto_now_add=True)
+    expira_en = models.DateTimeField(db_index=True)
+
+    class Meta:
+        constraints = [
+            models.UniqueConstraint(fields=['usuario', 'clave'], name='idempotencia_usuario_clave_unico'),
+        ]
+
+    def __str__(self):
+        return f'{self.usuario_id}:{self.clave} ({self.estado or "en curso"})'
+
+
+class EventoMovimiento(models.Model):
+    # Cola de ingesta: POST /api/movimientos/ingesta/ inserta y responde 202;
+    # `procesar_ingesta` los aplica en lotes (inventario.ingesta)
+    ESTADO_PENDIENTE = 'pendiente'
+    ESTADO_APLICADO = 'aplicado'
+    ESTADO_RECHAZADO = 'rechazado'
+
+    ESTADO_CHOICES = [
+        (ESTADO_PENDIENTE, 'Pendiente'),
+        (ESTADO_APLICADO, 'Aplicado'),
+        (ESTADO_RECHAZADO, 'Rechazado'),
+    ]
+
+    usuario = models.ForeignKey(settings.AUTH_USER_MODEL, on_delete=models.SET_NULL, null=True, related_name='+')
+    # Sin FK: la existencia del producto se valida al aplicar, no al encolar
+    producto_id = models.IntegerField()
+    tipo = models.CharField(max_length=3, choices=MovimientoStock.TIPO_CHOICES)
+    cantidad = models.PositiveIntegerField()
+    motivo = models.CharField(max_length=255, blank=True)
+    estado = models.CharField(max_length=10, choices=ESTADO_CHOICES, default=ESTADO_PENDIENTE)
+    error = models.CharField(max_length=255, blank=True)
+    movimiento_id = models.BigIntegerField(null=True, blank=True)
+    recibido_en = models.DateTimeField(auto_now_add=True)
+    procesado_en = models.DateTimeField(null=True, blank=True)
+
+    class Meta:
+        indexes = [
+            # El worker solo recorre los pendientes, en orden de llegada
+            models.Index(fields=['id'], condition=models.Q(estado='pendiente'), name='evento_pendiente_idx'),
+            models.Index(fields=['procesado_en'], name='evento_procesado_idx'),
+        ]
+
+    def __str__(self):
+        return f'Evento {self.pk} ({self.estado})'
+
+
+class VersionDatos(models.Model):
+    # Versión por recurso, incrementada en la misma transacción que las
+    # escrituras que COUNT()/MAX() de la tabla no ven: ediciones sin marca de
+    # tiempo, bajas y cambios en datos relacionados (inventario.condicional)
+    recurso = models.CharField(max_length=50, primary_key=True)
+    version = models.PositiveBigIntegerField(default=0)
+    actualizado_en = models.DateTimeField()
+
+    def __str__(self):
+        return f'{self.recurso}: {self.version}'
@@ -0,0 +1,178 @@
+import base64
+import binascii
+import heapq
+
+from django.conf import settings
+from django.db.models import Q
+from django.utils.dateparse import parse_datetime
+from rest_framework.exceptions import NotFound
+from rest_framework.pagination import BasePagination
+from rest_framework.response import Response
+from rest_framework.utils.urls import replace_query_param
+
+
+# ----------------------
+# CURSORES (creado_en, id)
+# ----------------------
+def codificar_cursor(creado_en, pk, atras=False):
+    crudo = f'{"p" if atras else "n"}|{creado_en.isoformat()}|{pk}'
+    return base64.urlsafe_b64encode(crudo.encode()).decode().rstrip('=')
+
+
+def decodificar_cursor(cursor):
+    """Devuelve ``(creado_en, pk, atras)`` o lanza ``ValueError``."""
+    try:
+        relleno = '=' * (-len(cursor) % 4)
+        direccion, fecha, pk = base64.urlsafe_b64decode(cursor + relleno).decode().split('|')
+        creado_en = parse_datetime(fecha)
+        if creado_en is None or direccion not in ('n', 'p'):
+            raise ValueError(cursor)
+        return creado_en, int(pk), direccion == 'p'
+    except (binascii.Error, UnicodeDecodeError, TypeError) as exc:
+        raise ValueError(cursor) from exc
+
+
+def _posicion(fila):
+    if isinstance(fila, dict):
+        return fila['creado_en'], fila['id']
+    return fila.creado_en, fila.pk
+
+
+def _consulta_keyset(queryset, cursor, tamano):
+    atras = False
+    if cursor:
+        creado_en, pk, atras = decodificar_cursor(cursor)
+        if atras:
+            queryset = queryset.filter(Q(creado_en__gt=creado_en) | Q(creado_en=creado_en, id__gt=pk))
+        else:
+            queryset = queryset.filter(Q(creado_en__lt=creado_en) | Q(creado_en=creado_en, id__lt=pk))
+
+    orden = ('creado_en', 'id') if atras else ('-creado_en', '-id')
+    return queryset.order_by(*orden)[:tamano + 1], atras
+
+
+def _armar_pagina(filas, cursor, tamano, atras):
+    hay_mas = len(filas) > tamano
+    filas = filas[:tamano]
+    if atras:
+        filas.reverse()
+
+    siguiente = anterior = None
+    if filas:
+        primera, ultima = _posicion(filas[0]), _posicion(filas[-1])
+        # Hacia atrás siempre existe la página desde la que se vino
+        if atras or hay_mas:
+            siguiente = codificar_cursor(*ultima)
+        if (atras and hay_mas) or (cursor and not atras):
+            anterior = codificar_cursor(*primera, atras=True)
+    return filas, siguiente, anterior
+
+
+def pagina_keyset(queryset, cursor, tamano):
+    """Página de ``queryset`` ordenada por ``(-creado_en, -id)`` a partir de ``cursor``.
+
+    Nunca usa OFFSET ni COUNT: filtra por la posición del cursor y lee
+    ``tamano + 1`` filas sobre el índice compuesto. Devuelve
+    ``(filas, cursor_siguiente, cursor_anterior)``.
+    """
+    consulta, atras = _consulta_keyset(queryset, cursor, tamano)
+    return _armar_pagina(list(consulta), cursor, tamano, atras)
+
+
+async def apagina_keyset(queryset, cursor, tamano):
+    """Versión async de ``pagina_keyset`` (ORM async)."""
+    consulta, atras = _consulta_keyset(queryset, cursor, tamano)
+    return _armar_pagina([fila async for fila in consulta], cursor, tamano, atras)
+
+
+def pagina_keyset_combinada(querysets, cursor, tamano):
+    """``pagina_keyset`` sobre varias tablas con el mismo orden (caliente + archivo).
+
+    Cada queryset aporta como mucho ``tamano + 1`` filas por su índice y se
+    mezclan en memoria; los ids no se repiten entre tablas.
+    """
+    partes, atras = [], False
+    for queryset in querysets:
+        consulta, atras = _consulta_keyset(queryset, cursor, tamano)
+        partes.append(list(consulta))
+    filas = list(heapq.merge(*partes, key=_posicion, reverse=not atras))[:tamano + 1]
+    return _armar_pagina(filas, cursor, tamano, atras)
+
+
+# ----------------------
+# PAGINACIÓN DRF
+# ----------------------
+class MovimientoKeysetPagination(BasePagination):
+    cursor_query_param = 'cursor'
+    page_size_query_param = 'page_size'
+
+    def get_page_size(self, request):
+        tamano = getattr(settings, 'INVENTARIO_MOVIMIENTOS_PAGE_SIZE', 50)
+        maximo = getattr(settings, 'INVENTARIO_MOVIMIENTOS_MAX_PAGE_SIZE', 500)
+        try:
+            tamano = int(request.query_params.get(self.page_size_query_param, tamano))
+        except ValueError:
+            pass
+        return max(1, min(tamano, maximo))
+
+    def paginate_queryset(self, queryset, request, view=None):
+        # Una lista de querysets (historial con archivo) se pagina combinada
+        paginar = pagina_keyset_combinada if isinstance(queryset, list) else pagina_keyset
+        self.request = request
+        try:
+            filas, self.siguiente, self.anterior = paginar(
+                queryset,
+                request.query_params.get(self.cursor_query_param),
+                self.get_page_size(request),
+            )
+        except ValueError:
+            raise NotFound('Cursor inválido.')
+        return filas
+
+    def _enlace(self, cursor):
+        if cursor is None:
+            return None
+        url = self.request.build_absolute_uri()
+        return replace_query_param(url, self.cursor_query_param, cursor)
+
+    def get_next_link(self):
+        return self._enlace(self.siguiente)
+
+    def get_previous_link(self):
+        return self._enlace(self.anterior)
+
+    def get_paginated_response(self, data):
+        return Response({
+            'next': self.get_next_link(),
+            'previous': self.get_previous_link(),
+            'results': data,
+        })
+
+    def get_paginated_response_schema(self, schema):
+        return {
+            'type': 'object',
+            'required': ['results'],
+            'properties': {
+                'next': {'type': 'string', 'nullable': True, 'format': 'uri'},
+                'previous': {'type': 'string', 'nullable': True, 'format': 'uri'},
+                'results': schema,
+            },
+        }
+
+    def get_schema_operation_parameters(self, view):
+        return [
+            {
+                'name': self.cursor_query_param,
+                'required': False,
+                'in': 'query',
+                'description': 'Cursor de paginación (creado_en, id).',
+                'schema': {'type': 'string'},
+            },
+            {
+                'name': self.page_size_query_param,
+                'required': False,
+                'in': 'query',
+                'description': 'Cantidad de resultados por página.',
+                'schema': {'type': 'integer'},
+            },
+        ]
@@ -0,0 +1,177 @@
+import math
+from datetime import timedelta
+from itertools import groupby
+
+import numpy as np
+from django.conf import settings
+from django.db import connection, transaction
+from django.db.models import F
+from django.utils import timezone
+
+from .models import Producto, PronosticoReorden, ResumenDiarioMovimiento
+
+
+# Columnas guardadas y filas por llamada a executemany
+COLUMNAS = (
+    'producto_id', 'consumo_promedio', 'consumo_suavizado', 'dias_para_quiebre',
+    'punto_reorden', 'cantidad_sugerida', 'reordenar', 'calculado_en',
+)
+FILAS_POR_LOTE = 5000
+
+
+def parametros(**valores):
+    """Parámetros del cálculo: los de ``settings`` con los ``valores`` dados encima."""
+    base = {
+        'historia': getattr(settings, 'INVENTARIO_REORDEN_HISTORIA_DIAS', 90),
+        'ventana': getattr(settings, 'INVENTARIO_REORDEN_VENTANA_DIAS', 28),
+        'alfa': getattr(settings, 'INVENTARIO_REORDEN_ALFA', 0.3),
+        'plazo': getattr(settings, 'INVENTARIO_REORDEN_PLAZO_DIAS', 7),
+        'cobertura': getattr(settings, 'INVENTARIO_REORDEN_COBERTURA_DIAS', 30),
+    }
+    base.update({clave: valor for clave, valor in valores.items() if valor is not None})
+    return base
+
+
+# ----------------------
+# CONSUMO DIARIO (VECTORIZADO)
+# ----------------------
+def consumo_diario(ids, desde, dias, ventana, alfa):
+    """Media móvil y suavizado exponencial de las salidas diarias de ``ids`` (ordenados).
+
+    Lee el resumen diario en una sola consulta. Cada fila (producto, día,
+    salidas) se ubica por ``searchsorted`` y se agrega con ``np.bincount``:
+    no se arma una matriz densa productos x días. El suavizado es la suma
+    ponderada ``alfa * (1 - alfa) ** antigüedad`` (nivel inicial 0).
+    """
+    n = len(ids)
+    filas = list(
+        ResumenDiarioMovimiento.objects.filter(
+            fecha__gte=desde, fecha__lt=desde + timedelta(days=dias), cantidad_salida__gt=0
+        ).values_list('producto_id', 'fecha', 'cantidad_salida')
+    )
+    if not filas or not n:
+        return np.zeros(n), np.zeros(n)
+
+    pid, fecha, cantidad = (np.array(columna) for columna in zip(*filas))
+    dia = (fecha.astype('datetime64[D]') - np.datetime64(desde, 'D')).astype(np.int64)
+    cantidad = cantidad.astype(np.float64)
+
+    # Filas de productos que no están en ``ids`` (borrados entre consultas)
+    posicion = np.searchsorted(ids, pid)
+    validas = (posicion < n) & (ids[np.minimum(posicion, n - 1)] == pid)
+    posicion, dia, cantidad = posicion[validas], dia[validas], cantidad[validas]
+
+    recientes = dia >= dias - ventana
+    promedio = np.bincount(posicion[recientes], weights=cantidad[recientes], minlength=n) / ventana
+    pesos = alfa * (1 - alfa) ** (dias - 1 - np.arange(dias))
+    suavizado = np.bincount(posicion, weights=cantidad * pesos[dia], minlength=n)
+    return promedio, suavizado
+
+
+# ----------------------
+# CÁLCULO Y GUARDADO
+# ----------------------
+def calcular_reorden(hoy=None, **valores):
+    """Recalcula ``PronosticoReorden`` para todos los productos.
+
+    El consumo proyectado es el suavizado exponencial de los ``historia``
+    días cerrados anteriores a ``hoy``. Un producto se reordena cuando su
+    stock no cubre el plazo de entrega más el mínimo; la cantidad sugerida
+    lleva el stock a ``plazo + cobertura`` días de consumo más el mínimo.
+    Devuelve ``(productos, a_reordenar)``.
+    """
+    p = parametros(**valores)
+    hoy = hoy or timezone.localdate()
+    productos = list(Producto.objects.order_by('id').values_list('id', 'stock_actual', 'stock_minimo'))
+    if not productos:
+        return 0, 0
+
+    ids, stock, minimo = (np.array(columna, dtype=np.int64) for columna in zip(*productos))
+    promedio, suavizado = consumo_diario(ids, hoy - timedelta(days=p['historia']), p['historia'], p['ventana'], p['alfa'])
+
+    disponible = np.maximum(stock, 0)
+    with np.errstate(divide='ignore', invalid='ignore'):
+        dias_quiebre = np.where(suavizado > 0, disponible / suavizado, np.nan)
+    punto = np.ceil(suavizado * p['plazo']).astype(np.int64) + minimo
+    objetivo = np.ceil(suavizado * (p['plazo'] + p['cobertura'])).astype(np.int64) + minimo
+    sugerida = np.where(stock <= punto, np.maximum(objetivo - stock, 0), 0)
+
+    _guardar(ids, promedio, suavizado, dias_quiebre, punto, sugerida)
+    return len(ids), int(np.count_nonzero(sugerida))
+
+
+@transaction.atomic
+def _guardar(ids, promedio, suavizado, dias_quiebre, punto, sugerida):
+    # executemany con upsert: construir un modelo por producto costaba más
+    # que todo el cálculo
+    q = connection.ops.quote_name
+    ahora = connection.ops.adapt_datetimefield_value(timezone.now())
+    sql = 'INSERT INTO {} ({}) VALUES ({}) ON CONFLICT ({}) DO UPDATE SET {}'.format(
+        q(PronosticoReorden._meta.db_table),
+        ', '.join(q(c) for c in COLUMNAS),
+        ', '.join(['%s'] * len(COLUMNAS)),
+        q('producto_id'),
+        ', '.join(f'{q(c)} = excluded.{q(c)}' for c in COLUMNAS[1:]),
+    )
+    filas = [
+        (
+            pid, round(media, 4), round(suave, 4), None if math.isnan(dias) else round(dias, 2),
+            max(reorden, 0), cantidad, cantidad > 0, ahora,
+        )
+        for pid, media, suave, dias, reorden, cantidad in zip(
+            ids.tolist(), promedio.tolist(), suavizado.tolist(),
+            dias_quiebre.tolist(), punto.tolist(), sugerida.tolist(),
+        )
+    ]
+    with connection.cursor() as cursor:
+        for inicio in range(0, len(filas), FILAS_POR_LOTE):
+            cursor.executemany(sql, filas[inicio:inicio + FILAS_POR_LOTE])
+
+
+# ----------------------
+# LECTURA AGRUPADA POR PROVEEDOR
+# ----------------------
+def reorden_por_proveedor(proveedor=None, todos=False):
+    """Pronósticos agrupados por proveedor; sin ``todos``, solo los que hay que reordenar."""
+    queryset = PronosticoReorden.objects.all()
+    if not todos:
+        queryset = queryset.filter(reordenar=True)
+    if proveedor is not None:
+        queryset = queryset.filter(producto__proveedor_id=proveedor)
+
+    filas = queryset.order_by(
+        'producto__proveedor__nombre', 'producto__proveedor_id',
+        F('dias_para_quiebre').asc(nulls_last=True), 'producto_id',
+    ).values(
+        'producto_id', 'producto__sku', 'producto__nombre', 'producto__stock_actual',
+        'producto__stock_minimo', 'producto__proveedor_id', 'producto__proveedor__nombre',
+        'consumo_promedio', 'consumo_suavizado', 'dias_para_quiebre',
+        'punto_reorden', 'cantidad_sugerida', 'calculado_en',
+    )
+
+    grupos = []
+    for (pid, nombre), productos in groupby(
+        filas, key=lambda f: (f['producto__proveedor_id'], f['producto__proveedor__nombre'])
+    ):
+        productos = [
+            {
+                'id': f['producto_id'],
+                'sku': f['producto__sku'],
+                'nombre': f['producto__nombre'],
+                'stock_actual': f['producto__stock_actual'],
+                'stock_minimo': f['producto__stock_minimo'],
+                'consumo_promedio': f['consumo_promedio'],
+                'consumo_suavizado': f['consumo_suavizado'],
+                'dias_para_quiebre': f['dias_para_quiebre'],
+                'punto_reorden': f['punto_reorden'],
+                'cantidad_sugerida': f['cantidad_sugerida'],
+                'calculado_en': f['calculado_en'],
+            }
+            for f in productos
+        ]
+        grupos.append({
+            'proveedor': {'id': pid, 'nombre': nombre},
+            'cantidad_sugerida': sum(p['cantidad_sugerida'] for p in productos),
+            'productos': productos,
+        })
+    return grupos
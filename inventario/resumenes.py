@@ -0,0 +1,163 @@
+from collections import defaultdict
+from datetime import date, timedelta
+
+from django.db import connection, transaction
+from django.db.models import Count, F, Min, Max, Q, Sum
+from django.db.models.functions import TruncDate, TruncMonth, TruncWeek
+from django.utils import timezone
+
+from .historial import fin_del_dia, movimientos_entre
+from .models import MovimientoStock, ResumenDiarioMovimiento
+
+
+CAMPOS = ('cantidad_entrada', 'cantidad_salida', 'entradas', 'salidas')
+AGRUPACIONES = {'dia': None, 'semana': TruncWeek, 'mes': TruncMonth}
+
+# Filas por sentencia de upsert (6 parámetros por fila)
+FILAS_POR_SENTENCIA = 500
+
+
+# ----------------------
+# MANTENIMIENTO INCREMENTAL
+# ----------------------
+def _totales(movimientos, signo):
+    totales = defaultdict(lambda: [0, 0, 0, 0])
+    for movimiento in movimientos:
+        fila = totales[(movimiento.producto_id, timezone.localdate(movimiento.creado_en))]
+        if movimiento.tipo == MovimientoStock.TIPO_ENTRADA:
+            fila[0] += signo * movimiento.cantidad
+            fila[2] += signo
+        else:
+            fila[1] += signo * movimiento.cantidad
+            fila[3] += signo
+    return totales
+
+
+def acumular(movimientos, signo=1):
+    """Suma (o resta, con ``signo=-1``) ``movimientos`` a sus filas de resumen.
+
+    Usa ``INSERT ... ON CONFLICT DO UPDATE`` con incrementos, así dos
+    transacciones sobre el mismo producto y día no se pisan. Debe llamarse
+    dentro de la transacción que crea o borra los movimientos.
+    """
+    totales = _totales(movimientos, signo)
+    if not totales:
+        return
+
+    q = connection.ops.quote_name
+    tabla = q(ResumenDiarioMovimiento._meta.db_table)
+    columnas = ', '.join(q(c) for c in ('producto_id', 'fecha', *CAMPOS))
+    incrementos = ', '.join(f'{q(c)} = {tabla}.{q(c)} + excluded.{q(c)}' for c in CAMPOS)
+    # Orden fijo de claves: evita interbloqueos entre lotes concurrentes
+    filas = [
+        (pid, connection.ops.adapt_datefield_value(fecha), *valores)
+        for (pid, fecha), valores in sorted(totales.items())
+    ]
+    with connection.cursor() as cursor:
+        for inicio in range(0, len(filas), FILAS_POR_SENTENCIA):
+            bloque = filas[inicio:inicio + FILAS_POR_SENTENCIA]
+            cursor.execute(
+                f'INSERT INTO {tabla} ({columnas}) VALUES {", ".join(["(%s, %s, %s, %s, %s, %s)"] * len(bloque))} '
+                f'ON CONFLICT ({q("producto_id")}, {q("fecha")}) DO UPDATE SET {incrementos}',
+                [valor for fila in bloque for valor in fila],
+            )
+
+    if signo < 0:
+        # Días que se quedaron sin movimientos
+        vacios = Q()
+        for pid, fecha in totales:
+            vacios |= Q(producto_id=pid, fecha=fecha)
+        ResumenDiarioMovimiento.objects.filter(vacios, entradas=0, salidas=0).delete()
+
+
+# ----------------------
+# RECONSTRUCCIÓN
+# ----------------------
+def _meses(desde, hasta):
+    inicio = desde
+    while inicio <= hasta:
+        siguiente = date(inicio.year + inicio.month // 12, inicio.month % 12 + 1, 1)
+        yield inicio, min(siguiente - timedelta(days=1), hasta)
+        inicio = siguiente
+
+
+def _limites():
+    fechas = []
+    for queryset in movimientos_entre():
+        datos = queryset.aggregate(primero=Min('creado_en'), ultimo=Max('creado_en'))
+        fechas += [timezone.localdate(f) for f in datos.values() if f is not None]
+    return (min(fechas), max(fechas)) if fechas else (None, None)
+
+
+@transaction.atomic
+def _reconstruir_rango(desde, hasta):
+    ResumenDiarioMovimiento.objects.filter(fecha__gte=desde, fecha__lte=hasta).delete()
+
+    totales = defaultdict(lambda: [0, 0, 0, 0])
+    entrada = Q(tipo=MovimientoStock.TIPO_ENTRADA)
+    for queryset in movimientos_entre(fin_del_dia(desde - timedelta(days=1)), fin_del_dia(hasta)):
+        filas = (
+            queryset.order_by()
+            .annotate(dia=TruncDate('creado_en'))
+            .values('producto_id', 'dia')
+            .annotate(
+                cantidad_entrada=Sum('cantidad', filter=entrada),
+                cantidad_salida=Sum('cantidad', filter=~entrada),
+                entradas=Count('id', filter=entrada),
+                salidas=Count('id', filter=~entrada),
+            )
+        )
+        for fila in filas:
+            acumulado = totales[(fila['producto_id'], fila['dia'])]
+            for i, campo in enumerate(CAMPOS):
+                acumulado[i] += fila[campo] or 0
+
+    ResumenDiarioMovimiento.objects.bulk_create(
+        [
+            ResumenDiarioMovimiento(producto_id=pid, fecha=dia, **dict(zip(CAMPOS, valores)))
+            for (pid, dia), valores in totales.items()
+        ],
+        batch_size=1000,
+    )
+    return len(totales)
+
+
+def reconstruir_resumenes(desde=None, hasta=None, progreso=None):
+    """Recalcula los resúmenes entre ``desde`` y ``hasta`` (por defecto, todo el historial).
+
+    Lee la tabla caliente y el archivo, un mes por transacción. Devuelve
+    el número de filas escritas.
+    """
+    primero, ultimo = _limites()
+    desde, hasta = desde or primero, hasta or ultimo
+    if desde is None or hasta is None:
+        # No hay movimientos: no debe quedar ningún resumen
+        ResumenDiarioMovimiento.objects.all().delete()
+        return 0
+
+    total = 0
+    for inicio, fin in _meses(desde, hasta):
+        total += _reconstruir_rango(inicio, fin)
+        if progreso is not None:
+            progreso(inicio, total)
+    return total
+
+
+# ----------------------
+# SERIES PARA REPORTES
+# ----------------------
+def serie(desde, hasta, agrupacion='dia', **filtros):
+    """Totales por día, semana o mes leyendo solo el resumen (periodos sin movimientos se omiten)."""
+    truncar = AGRUPACIONES[agrupacion]
+    filas = (
+        ResumenDiarioMovimiento.objects.filter(fecha__gte=desde, fecha__lte=hasta, **filtros)
+        .order_by()
+        .annotate(periodo=F('fecha') if truncar is None else truncar('fecha'))
+        .values('periodo')
+        .annotate(**{f'total_{campo}': Sum(campo) for campo in CAMPOS})
+        .order_by('periodo')
+    )
+    return [
+        {'periodo': fila['periodo'], **{campo: fila[f'total_{campo}'] for campo in CAMPOS}}
+        for fila in filas
+    ]
@@ -1,6 +1,7 @@
 from django.db import transaction
 from rest_framework import serializers
 from .models import Categoria, Proveedor, Producto, MovimientoStock
+from .stock import registrar_movimiento, StockInsuficiente
 
 
 # ----------------------
@@ -56,9 +57,10 @@ class MovimientoStockSerializer(serializers.ModelSerializer):
 
     # VALIDACIÓN GENERAL
     def validate(self, attrs):
-        producto = attrs.get('producto')
-        tipo = attrs.get('tipo')
-        cantidad = attrs.get('cantidad')
+        # En PATCH los campos omitidos conservan el valor del movimiento
+        producto = attrs.get('producto', getattr(self.instance, 'producto', None))
+        tipo = attrs.get('tipo', getattr(self.instance, 'tipo', None))
+        cantidad = attrs.get('cantidad', getattr(self.instance, 'cantidad', None))
 
         if cantidad <= 0:
             raise serializers.ValidationError({'cantidad': 'Debe ser mayor a cero.'})
@@ -71,24 +73,45 @@ class MovimientoStockSerializer(serializers.ModelSerializer):
                 )
         return attrs
 
-    # CREACIÓN DEL MOVIMIENTO + ACTUALIZACIÓN DE STOCK
-    @transaction.atomic
+    # CREACIÓN DEL MOVIMIENTO + ACTUALIZACIÓN DE STOCK (UPDATE CONDICIONAL)
     def create(self, validated_data):
-        producto = validated_data['producto']
-        tipo = validated_data['tipo']
-        cantidad = validated_data['cantidad']
+        try:
+            return registrar_movimiento(
+                validated_data['producto'],
+                validated_data['tipo'],
+                validated_data['cantidad'],
+                validated_data.get('motivo', ''),
+            )
+        except StockInsuficiente:
+            raise serializers.ValidationError(
+                {'cantidad': 'El movimiento generaría stock negativo.'}
+            )
+
+    # EDICIÓN (PUT/PATCH): inventario.signals resta el movimiento anterior del
+    # resumen diario y suma el nuevo; lectura previa, guardado y ajuste van
+    # en una sola transacción. El stock del producto no se recalcula
+    @transaction.atomic
+    def update(self, instance, validated_data):
+        return super().update(instance, validated_data)
 
-        if tipo == MovimientoStock.TIPO_SALIDA:
-            nuevo_stock = producto.stock_actual - cantidad
-            if nuevo_stock < 0:
-                raise serializers.ValidationError(
-                    {'cantidad': 'El movimiento generaría stock negativo.'}
-                )
-            producto.stock_actual = nuevo_stock
-        else:
-            producto.stock_actual += cantidad
 
-        producto.save()
+# ----------------------
+# LOTES DE MOVIMIENTOS
+# ----------------------
+class MovimientoStockLoteSerializer(serializers.Serializer):
+    # El producto se valida en bloque en inventario.stock (una sola consulta)
+    producto = serializers.IntegerField(min_value=1)
+    tipo = serializers.ChoiceField(choices=MovimientoStock.TIPO_CHOICES)
+    cantidad = serializers.IntegerField(min_value=1)
+    motivo = serializers.CharField(max_length=255, allow_blank=True, required=False, default='')
+
 
-        movimiento = MovimientoStock.objects.create(**validated_data)
-        return movimiento
+# ----------------------
+# KPIs DEL DASHBOARD
+# ----------------------
+class KpisSerializer(serializers.Serializer):
+    productos = serializers.IntegerField()
+    valor_inventario = serializers.DecimalField(max_digits=20, decimal_places=2)
+    stock_bajo = serializers.IntegerField()
+    movimientos_hoy = serializers.IntegerField()
+    calculado_en = serializers.DateTimeField()
@@ -0,0 +1,180 @@
+from collections import Counter
+
+from django.conf import settings
+from django.db import transaction
+from django.db.models.signals import pre_save, post_save, post_delete
+from django.dispatch import receiver, Signal
+from rest_framework.authtoken.models import Token
+
+from .autenticacion import invalidar_tokens
+from .cache_referencias import incrementar_version
+from .condicional import marcar_modificado
+from .kpis import invalidar_kpis
+from .resumenes import acumular
+from .models import Categoria, Proveedor, Producto, MovimientoStock
+from .stock_bajo import ajustar_conteos, es_stock_bajo
+
+
+# Enviada tras confirmar cambios de stock hechos con operaciones masivas
+# (queryset.update / bulk_create) que no disparan post_save.
+# Argumentos: productos (ids afectados).
+stock_modificado = Signal()
+
+
+def notificar_stock_modificado(productos):
+    ids = list(productos)
+    transaction.on_commit(lambda: stock_modificado.send(sender=Producto, productos=ids))
+
+
+# ============================================================
+# CONTEOS DE STOCK BAJO (EDICIONES DIRECTAS DE PRODUCTO)
+# ============================================================
+# Los movimientos de stock ajustan los conteos en inventario.stock;
+# aquí se cubren altas, ediciones y bajas de productos.
+def _estado(instance):
+    return (
+        int(instance.categoria_id),
+        int(instance.stock_actual or 0),
+        int(instance.stock_minimo or 0),
+    )
+
+
+@receiver(pre_save, sender=Producto)
+def producto_estado_previo(sender, instance, raw=False, **kwargs):
+    instance._estado_previo = None
+    if instance.pk and not raw:
+        instance._estado_previo = Producto.objects.filter(pk=instance.pk).values_list(
+            'categoria_id', 'stock_actual', 'stock_minimo'
+        ).first()
+
+
+@receiver(post_save, sender=Producto)
+def producto_guardado(sender, instance, raw=False, **kwargs):
+    if raw:
+        return
+    cambios = Counter()
+    previo = getattr(instance, '_estado_previo', None)
+    if previo is not None:
+        categoria_id, stock, minimo = previo
+        cambios[categoria_id] -= es_stock_bajo(stock, minimo)
+    categoria_id, stock, minimo = _estado(instance)
+    cambios[categoria_id] += es_stock_bajo(stock, minimo)
+    ajustar_conteos(cambios)
+
+
+@receiver(post_delete, sender=Producto)
+def producto_eliminado(sender, instance, **kwargs):
+    categoria_id, stock, minimo = _estado(instance)
+    if es_stock_bajo(stock, minimo):
+        ajustar_conteos({categoria_id: -1})
+
+
+# ============================================================
+# RESUMEN DIARIO DE MOVIMIENTOS (BAJAS Y EDICIONES)
+# ============================================================
+# Las altas se acumulan en inventario.stock; aquí se descuentan los
+# movimientos borrados y se mueven los editados (PUT/PATCH de la API,
+# admin, shell), dentro de la misma transacción.
+@receiver(pre_save, sender=MovimientoStock)
+def movimiento_estado_previo(sender, instance, raw=False, **kwargs):
+    instance._previo = None
+    if instance.pk and not raw:
+        instance._previo = MovimientoStock.objects.filter(pk=instance.pk).only(
+            'producto_id', 'tipo', 'cantidad', 'creado_en'
+        ).first()
+
+
+@receiver(post_save, sender=MovimientoStock)
+def movimiento_editado(sender, instance, created=False, raw=False, **kwargs):
+    previo = getattr(instance, '_previo', None)
+    if created or raw or previo is None:
+        return
+    acumular([previo], signo=-1)
+    acumular([instance])
+
+
+@receiver(post_delete, sender=MovimientoStock)
+def movimiento_eliminado(sender, instance, origin=None, **kwargs):
+    # Al borrar el producto sus resúmenes se eliminan en cascada
+    if isinstance(origin, Producto) or getattr(origin, 'model', None) is Producto:
+        return
+    acumular([instance], signo=-1)
+
+
+# ============================================================
+# INVALIDACIÓN DE KPIs DEL DASHBOARD
+# ============================================================
+@receiver(post_save, sender=Producto)
+@receiver(post_delete, sender=Producto)
+@receiver(post_save, sender=MovimientoStock)
+@receiver(post_delete, sender=MovimientoStock)
+def kpis_datos_modificados(sender, **kwargs):
+    transaction.on_commit(invalidar_kpis)
+
+
+@receiver(stock_modificado)
+def kpis_stock_modificado(sender, **kwargs):
+    invalidar_kpis()
+
+
+# ============================================================
+# VERSIONES DE LA CACHE DE DATOS DE REFERENCIA
+# ============================================================
+@receiver(post_save, sender=Categoria)
+@receiver(post_delete, sender=Categoria)
+def categorias_modificadas(sender, **kwargs):
+    transaction.on_commit(lambda: incrementar_version('categorias'))
+
+
+@receiver(post_save, sender=Proveedor)
+@receiver(post_delete, sender=Proveedor)
+def proveedores_modificados(sender, **kwargs):
+    transaction.on_commit(lambda: incrementar_version('proveedores'))
+
+
+# ============================================================
+# VERSIONES EN BASE PARA ETAG / LAST-MODIFIED (inventario.condicional)
+# ============================================================
+# En la misma transacción que la escritura. Las altas de movimientos y los
+# cambios de stock (UPDATE con actualizado_en) ya los ven COUNT()/MAX() de
+# la lista: no pasan por aquí y no compiten por la fila de versión.
+@receiver(post_save, sender=Categoria)
+@receiver(post_delete, sender=Categoria)
+def categorias_version_datos(sender, **kwargs):
+    marcar_modificado('categorias')
+
+
+@receiver(post_save, sender=Proveedor)
+@receiver(post_delete, sender=Proveedor)
+def proveedores_version_datos(sender, **kwargs):
+    marcar_modificado('proveedores')
+
+
+@receiver(post_save, sender=Producto)
+@receiver(post_delete, sender=Producto)
+def productos_version_datos(sender, **kwargs):
+    marcar_modificado('productos')
+
+
+@receiver(post_save, sender=MovimientoStock)
+@receiver(post_delete, sender=MovimientoStock)
+def movimientos_version_datos(sender, created=False, origin=None, **kwargs):
+    # Editar no mueve creado_en ni MAX(pk); borrar no mueve ninguna marca.
+    # En el borrado en cascada de un producto basta la versión de productos
+    if created or isinstance(origin, Producto) or getattr(origin, 'model', None) is Producto:
+        return
+    marcar_modificado('movimientos')
+
+
+# ============================================================
+# CACHE DE TOKENS DE LA API (CachedTokenAuthentication)
+# ============================================================
+@receiver(post_delete, sender=Token)
+@receiver(post_save, sender=Token)
+@receiver(post_save, sender=settings.AUTH_USER_MODEL)
+@receiver(post_delete, sender=settings.AUTH_USER_MODEL)
+def credenciales_modificadas(sender, created=False, update_fields=None, **kwargs):
+    # Un token nuevo no invalida nada; el login solo toca last_login
+    if created or (update_fields is not None and set(update_fields) == {'last_login'}):
+        return
+    transaction.on_commit(invalidar_tokens)
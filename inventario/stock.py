@@ -0,0 +1,169 @@
+from collections import defaultdict
+
+from django.db import transaction
+from django.db.models import Case, F, IntegerField, Q, When
+from django.utils import timezone
+
+from .models import Producto, MovimientoStock
+from .resumenes import acumular
+from .signals import notificar_stock_modificado
+from .stock_bajo import registrar_transiciones
+
+
+# Productos por sentencia UPDATE (mantiene el SQL bajo el límite de variables de SQLite)
+PRODUCTOS_POR_UPDATE = 200
+
+
+# ----------------------
+# ERRORES
+# ----------------------
+class StockInsuficiente(Exception):
+    """Uno o más movimientos dejarían el stock en negativo.
+
+    ``errores`` mapea el índice del movimiento en el lote a su mensaje.
+    """
+
+    def __init__(self, errores):
+        self.errores = errores
+        super().__init__('Stock insuficiente.')
+
+
+def delta_movimiento(tipo, cantidad):
+    return cantidad if tipo == MovimientoStock.TIPO_ENTRADA else -cantidad
+
+
+# ----------------------
+# MOVIMIENTO INDIVIDUAL
+# ----------------------
+@transaction.atomic
+def registrar_movimiento(producto, tipo, cantidad, motivo=''):
+    """Registra un movimiento y ajusta el stock con un UPDATE condicional.
+
+    La resta se hace en la base (``stock_actual = stock_actual - n WHERE
+    stock_actual >= n``), así que movimientos concurrentes no pierden
+    actualizaciones. Lanza ``StockInsuficiente`` si no alcanza el stock.
+    """
+    delta = delta_movimiento(tipo, cantidad)
+    filtro = Producto.objects.filter(pk=producto.pk)
+    if delta < 0:
+        filtro = filtro.filter(stock_actual__gte=-delta)
+
+    if not filtro.update(stock_actual=F('stock_actual') + delta, actualizado_en=timezone.now()):
+        raise StockInsuficiente({0: 'Este movimiento dejaría el stock en negativo.'})
+
+    categoria_id, despues, minimo = Producto.objects.filter(pk=producto.pk).values_list(
+        'categoria_id', 'stock_actual', 'stock_minimo'
+    ).get()
+    registrar_transiciones([(categoria_id, despues - delta, despues, minimo)])
+    notificar_stock_modificado([producto.pk])
+
+    movimiento = MovimientoStock.objects.create(
+        producto=producto,
+        tipo=tipo,
+        cantidad=cantidad,
+        motivo=motivo,
+    )
+    acumular([movimiento])
+    return movimiento
+
+
+# ----------------------
+# LOTES DE MOVIMIENTOS
+# ----------------------
+@transaction.atomic
+def registrar_lote(items, parcial=False):
+    """Registra un lote de movimientos con actualizaciones de stock por conjunto.
+
+    ``items`` es una lista de dicts con ``producto`` (id), ``tipo``, ``cantidad``
+    y opcionalmente ``motivo``. Los movimientos se evalúan en orden contra el
+    stock actual de cada producto. Con ``parcial=False`` cualquier error anula
+    el lote completo; con ``parcial=True`` se aplican solo los válidos.
+
+    Devuelve ``(movimientos_creados, errores)``.
+    """
+    ids = {item['producto'] for item in items}
+    productos = Producto.objects.only('id', 'nombre', 'stock_actual').in_bulk(ids)
+
+    errores = {}
+    aceptados = []
+    stock = {pid: p.stock_actual for pid, p in productos.items()}
+    netos = defaultdict(int)
+
+    for indice, item in enumerate(items):
+        pid = item['producto']
+        if pid not in productos:
+            errores[indice] = 'El producto no existe.'
+            continue
+
+        delta = delta_movimiento(item['tipo'], item['cantidad'])
+        if stock[pid] + delta < 0:
+            errores[indice] = 'Este movimiento dejaría el stock en negativo.'
+            continue
+
+        stock[pid] += delta
+        netos[pid] += delta
+        aceptados.append(item)
+
+    if errores and not parcial:
+        raise StockInsuficiente(errores)
+
+    movimientos = MovimientoStock.objects.bulk_create(
+        [
+            MovimientoStock(
+                producto=productos[item['producto']],
+                tipo=item['tipo'],
+                cantidad=item['cantidad'],
+                motivo=item.get('motivo', ''),
+            )
+            for item in aceptados
+        ],
+        batch_size=500,
+    )
+
+    _aplicar_netos(netos, items)
+    acumular(movimientos)
+    notificar_stock_modificado(netos)
+    return movimientos, errores
+
+
+def _aplicar_netos(netos, items):
+    # Un UPDATE por bloque de productos; la guarda WHERE stock_actual >= -delta
+    # protege contra escrituras concurrentes entre la lectura y la escritura.
+    cambios = [(pid, delta) for pid, delta in netos.items() if delta]
+    ahora = timezone.now()
+
+    for inicio in range(0, len(cambios), PRODUCTOS_POR_UPDATE):
+        bloque = cambios[inicio:inicio + PRODUCTOS_POR_UPDATE]
+
+        guarda = Q()
+        for pid, delta in bloque:
+            if delta < 0:
+                guarda |= Q(id=pid, stock_actual__gte=-delta)
+            else:
+                guarda |= Q(id=pid)
+
+        actualizados = Producto.objects.filter(guarda).update(
+            stock_actual=Case(
+                *[When(id=pid, then=F('stock_actual') + delta) for pid, delta in bloque],
+                default=F('stock_actual'),
+                output_field=IntegerField(),
+            ),
+            actualizado_en=ahora,
+        )
+
+        if actualizados != len(bloque):
+            # Otro proceso consumió stock entre la lectura y el UPDATE
+            afectados = {pid for pid, delta in bloque if delta < 0}
+            raise StockInsuficiente({
+                indice: 'Stock modificado concurrentemente; reintente el lote.'
+                for indice, item in enumerate(items)
+                if item['producto'] in afectados
+            })
+
+        deltas = dict(bloque)
+        registrar_transiciones(
+            (categoria_id, stock - deltas[pid], stock, minimo)
+            for pid, categoria_id, stock, minimo in Producto.objects.filter(id__in=deltas).values_list(
+                'id', 'categoria_id', 'stock_actual', 'stock_minimo'
+            )
+        )
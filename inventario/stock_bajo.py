@@ -0,0 +1,68 @@
+from collections import Counter
+
+from django.db.models import Count, F
+
+from .models import Categoria, Producto, StockBajoCategoria
+
+
+def es_stock_bajo(stock_actual, stock_minimo):
+    return stock_actual <= stock_minimo
+
+
+def productos_stock_bajo(queryset=None):
+    # La condición coincide con la del índice parcial producto_stock_bajo_idx
+    queryset = Producto.objects.all() if queryset is None else queryset
+    return queryset.filter(stock_actual__lte=F('stock_minimo'))
+
+
+def productos_sin_stock_bajo(queryset=None):
+    # Comparación directa de columnas: un anti-join contra el índice parcial
+    # recorrería igual toda la tabla
+    queryset = Producto.objects.all() if queryset is None else queryset
+    return queryset.filter(stock_actual__gt=F('stock_minimo'))
+
+
+def recalcular_stock_bajo(categorias=None):
+    """Recalcula los conteos desde el índice parcial (todas o solo ``categorias``)."""
+    productos = productos_stock_bajo()
+    ids = Categoria.objects.values_list('id', flat=True)
+    if categorias is not None:
+        productos = productos.filter(categoria_id__in=categorias)
+        ids = ids.filter(id__in=categorias)
+
+    conteos = dict(
+        productos.order_by()
+        .values('categoria_id')
+        .annotate(total=Count('id'))
+        .values_list('categoria_id', 'total')
+    )
+    StockBajoCategoria.objects.bulk_create(
+        [StockBajoCategoria(categoria_id=cid, total=conteos.get(cid, 0)) for cid in ids],
+        update_conflicts=True,
+        unique_fields=['categoria'],
+        update_fields=['total'],
+        batch_size=500,
+    )
+
+
+def ajustar_conteos(cambios):
+    """Aplica deltas ``{categoria_id: +n/-n}`` a los conteos mantenidos.
+
+    Las categorías sin fila todavía se recalculan desde el índice.
+    """
+    faltantes = []
+    for categoria_id, delta in cambios.items():
+        if not delta:
+            continue
+        if not StockBajoCategoria.objects.filter(categoria_id=categoria_id).update(total=F('total') + delta):
+            faltantes.append(categoria_id)
+    if faltantes:
+        recalcular_stock_bajo(faltantes)
+
+
+def registrar_transiciones(filas):
+    """Ajusta los conteos según filas ``(categoria_id, stock_antes, stock_despues, minimo)``."""
+    cambios = Counter()
+    for categoria_id, antes, despues, minimo in filas:
+        cambios[categoria_id] += es_stock_bajo(despues, minimo) - es_stock_bajo(antes, minimo)
+    ajustar_conteos(cambios)
@@ -0,0 +1,63 @@
+from datetime import datetime, time, timedelta
+from decimal import Decimal
+
+from django.contrib.auth.models import User
+from django.core.cache import cache
+from django.utils import timezone
+from rest_framework.test import APITestCase, APITransactionTestCase
+
+from inventario.models import Categoria, Proveedor, Producto
+from inventario.stock import registrar_movimiento
+
+
+def crear_catalogo():
+    categoria = Categoria.objects.create(nombre='Herramientas')
+    proveedor = Proveedor.objects.create(nombre='Ferretería Central', email='ventas@ferreteria.cl')
+    return categoria, proveedor
+
+
+def crear_producto(categoria, proveedor, sku, stock=0, minimo=0, **extra):
+    return Producto.objects.create(
+        sku=sku,
+        nombre=extra.pop('nombre', f'Producto {sku}'),
+        categoria=categoria,
+        proveedor=proveedor,
+        precio=extra.pop('precio', Decimal('1000')),
+        stock_actual=stock,
+        stock_minimo=minimo,
+        **extra,
+    )
+
+
+def movimiento_hace(dias, producto, tipo, cantidad):
+    """Registra un movimiento y lo fecha al mediodía de hace ``dias`` días (hora local)."""
+    movimiento = registrar_movimiento(producto, tipo, cantidad)
+    fecha = timezone.localdate() - timedelta(days=dias)
+    movimiento.creado_en = timezone.make_aware(datetime.combine(fecha, time(12)))
+    # save(): inventario.signals mueve también el resumen diario a esa fecha
+    movimiento.save(update_fields=['creado_en'])
+    return movimiento
+
+
+class DatosInventarioMixin:
+    """Usuario staff autenticado, una categoría, un proveedor y dos productos."""
+
+    def setUp(self):
+        super().setUp()
+        # La cache (locmem) sobrevive entre tests; la base no
+        cache.clear()
+        self.usuario = User.objects.create_user('bodega', password='clave-segura', is_staff=True)
+        self.client.force_authenticate(self.usuario)
+        self.categoria, self.proveedor = crear_catalogo()
+        self.martillo = crear_producto(self.categoria, self.proveedor, 'MAR-01', stock=10, minimo=2, nombre='Martillo')
+        self.taladro = crear_producto(self.categoria, self.proveedor, 'TAL-01', stock=0, minimo=1, nombre='Taladro')
+
+
+class InventarioAPITestCase(DatosInventarioMixin, APITestCase):
+    pass
+
+
+class InventarioAPITransactionTestCase(DatosInventarioMixin, APITransactionTestCase):
+    # Sin la transacción envolvente de TestCase: los atomic() no agregan
+    # SAVEPOINT y las consultas contadas son las de producción
+    pass
@@ -0,0 +1,122 @@
+import io
+from datetime import timedelta
+
+from django.core.management import CommandError, call_command
+from django.utils import timezone
+
+from inventario.archivo import archivar_movimientos
+from inventario.historial import fin_del_dia, generar_snapshots, stock_en_fecha
+from inventario.models import MovimientoStock, MovimientoStockArchivo, ResumenDiarioMovimiento, SnapshotStock
+from inventario.resumenes import reconstruir_resumenes
+
+from .base import InventarioAPITestCase, movimiento_hace
+
+
+COLUMNAS = ('id', 'producto_id', 'tipo', 'cantidad', 'motivo', 'creado_en')
+
+
+class ArchivoMovimientosTests(InventarioAPITestCase):
+    def setUp(self):
+        super().setUp()
+        self.hoy = timezone.localdate()
+        # Dos el mismo instante (desempate por id en el keyset) y a ambos lados del corte
+        for dias, producto, tipo, cantidad in (
+            (10, self.taladro, 'IN', 20),
+            (9, self.martillo, 'OUT', 2),
+            (9, self.taladro, 'OUT', 5),
+            (8, self.martillo, 'IN', 4),
+            (6, self.taladro, 'OUT', 1),
+            (3, self.martillo, 'OUT', 3),
+            (1, self.taladro, 'IN', 2),
+            (0, self.martillo, 'IN', 1),
+        ):
+            movimiento_hace(dias, producto, tipo, cantidad)
+        # Se archiva hasta hace 6 días inclusive: cinco movimientos
+        self.corte = fin_del_dia(self.hoy - timedelta(days=6))
+
+    def archivar(self, **opciones):
+        with self.captureOnCommitCallbacks(execute=True):
+            return archivar_movimientos(self.corte, **opciones)
+
+    def paginas_historial(self, **params):
+        ids, url = [], '/api/movimientos/historial/'
+        respuesta = self.client.get(url, {'page_size': 2, **params})
+        while True:
+            self.assertEqual(respuesta.status_code, 200)
+            ids.extend((m['id'], m['creado_en']) for m in respuesta.data['results'])
+            if not respuesta.data['next']:
+                return ids
+            respuesta = self.client.get(respuesta.data['next'])
+
+    def lecturas(self):
+        """Todo lo que debe responder igual con o sin archivo."""
+        resumenes = sorted(ResumenDiarioMovimiento.objects.values_list(
+            'producto_id', 'fecha', 'cantidad_entrada', 'cantidad_salida', 'entradas', 'salidas'
+        ))
+        SnapshotStock.objects.all().delete()
+        generar_snapshots(hasta=self.hoy - timedelta(days=7))
+        generar_snapshots()
+        return {
+            'stock': [
+                stock_en_fecha(producto, self.hoy - timedelta(days=dias))[0]
+                for producto in (self.martillo, self.taladro) for dias in range(12)
+            ],
+            'stock_at': self.client.get(
+                f'/api/productos/{self.taladro.pk}/stock-at/', {'fecha': (self.hoy - timedelta(days=9)).isoformat()}
+            ).data['stock'],
+            'snapshots': sorted(SnapshotStock.objects.values_list('producto_id', 'fecha', 'stock')),
+            'historial': self.paginas_historial(),
+            'historial_producto': self.paginas_historial(producto=self.taladro.pk),
+            'resumenes': resumenes,
+        }
+
+    def test_mueve_filas_intactas_y_las_borra_de_la_tabla_caliente(self):
+        antes = {
+            fila[0]: fila for fila in
+            MovimientoStock.objects.filter(creado_en__lt=self.corte).values_list(*COLUMNAS)
+        }
+        self.assertEqual(len(antes), 5)
+
+        self.assertEqual(self.archivar(lote=2), 5)  # tres lotes
+        archivados = {fila[0]: fila for fila in MovimientoStockArchivo.objects.values_list(*COLUMNAS)}
+        self.assertEqual(archivados, antes)
+        self.assertFalse(MovimientoStock.objects.filter(id__in=antes).exists())
+        self.assertEqual(MovimientoStock.objects.count(), 3)
+        self.assertFalse(MovimientoStockArchivo.objects.filter(archivado_en__isnull=True).exists())
+
+        # Repetir no mueve nada más
+        self.assertEqual(self.archivar(), 0)
+
+    def test_lecturas_iguales_antes_y_despues_de_archivar(self):
+        antes = self.lecturas()
+        self.assertEqual(len(antes['historial']), 8)
+        self.archivar(lote=3)
+        self.assertEqual(MovimientoStockArchivo.objects.count(), 5)
+
+        despues = self.lecturas()
+        for clave in antes:
+            with self.subTest(lectura=clave):
+                self.assertEqual(despues[clave], antes[clave])
+
+        # Reconstruido desde caliente + archivo, el resumen no cambia
+        reconstruir_resumenes()
+        self.assertEqual(self.lecturas()['resumenes'], antes['resumenes'])
+
+    def test_lista_solo_tabla_caliente(self):
+        self.archivar()
+        self.assertEqual(len(self.client.get('/api/movimientos/').data['results']), 3)
+
+    def test_comando(self):
+        salida = io.StringIO()
+        antes_de = (self.hoy - timedelta(days=5)).isoformat()
+        call_command('archivar_movimientos', '--antes-de', antes_de, '--simular', stdout=salida)
+        self.assertIn('5 movimiento(s)', salida.getvalue())
+        self.assertFalse(MovimientoStockArchivo.objects.exists())
+
+        call_command('archivar_movimientos', '--antes-de', antes_de, '--lote', '2', stdout=salida)
+        self.assertEqual(MovimientoStockArchivo.objects.count(), 5)
+
+        for opciones in (('--antes-de', '2024-02-30'), ('--antes-de', 'ayer'), ('--lote', '0')):
+            with self.subTest(opciones=opciones):
+                with self.assertRaises(CommandError):
+                    call_command('archivar_movimientos', *opciones, stdout=salida)
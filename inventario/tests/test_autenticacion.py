@@ -0,0 +1,78 @@
+import time
+
+from django.contrib.auth.models import User
+from django.db import connection
+from django.test.utils import CaptureQueriesContext
+from rest_framework.authtoken.models import Token
+
+from inventario.autenticacion import invalidar_tokens, tokens_cacheados, usuario_de_token
+
+from .base import InventarioAPITestCase
+
+
+# SessionAuthentication va primero: DRF responde 403 (no 401) sin credenciales válidas
+RECHAZADO = 403
+
+
+class CacheTokensTests(InventarioAPITestCase):
+    def setUp(self):
+        super().setUp()
+        tokens_cacheados.vaciar()
+        self.client.force_authenticate(None)
+        self.token = Token.objects.create(user=self.usuario)
+        self.client.credentials(HTTP_AUTHORIZATION=f'Token {self.token.key}')
+
+    def consultas_de_autenticacion(self):
+        with CaptureQueriesContext(connection) as consultas:
+            self.assertEqual(self.client.get('/api/cache/estadisticas/').status_code, 200)
+        return [c['sql'] for c in consultas if 'authtoken_token' in c['sql']]
+
+    def test_segundo_request_sin_consulta(self):
+        self.assertEqual(len(self.consultas_de_autenticacion()), 1)
+        self.assertEqual(self.consultas_de_autenticacion(), [])
+
+    def test_desactivar_o_borrar_invalida(self):
+        self.consultas_de_autenticacion()
+        with self.captureOnCommitCallbacks(execute=True):
+            self.usuario.is_active = False
+            self.usuario.save()
+        self.assertEqual(self.client.get('/api/cache/estadisticas/').status_code, RECHAZADO)
+
+        self.usuario.is_active = True
+        self.usuario.save()
+        self.consultas_de_autenticacion()
+        with self.captureOnCommitCallbacks(execute=True):
+            self.token.delete()
+        self.assertEqual(self.client.get('/api/cache/estadisticas/').status_code, RECHAZADO)
+
+    def test_update_masivo_requiere_invalidar_a_mano(self):
+        self.consultas_de_autenticacion()
+        User.objects.filter(pk=self.usuario.pk).update(is_active=False)
+        # Sin señales la entrada sigue vigente hasta invalidar_tokens()
+        self.assertEqual(self.client.get('/api/cache/estadisticas/').status_code, 200)
+        invalidar_tokens()
+        self.assertEqual(self.client.get('/api/cache/estadisticas/').status_code, RECHAZADO)
+
+    def test_invalidacion_durante_la_consulta_no_deja_entrada_vigente(self):
+        llamadas = []
+
+        def buscar(clave):
+            llamadas.append(clave)
+            entrada = (self.usuario, self.token)
+            # Otro hilo revoca el token mientras esta consulta está en curso
+            invalidar_tokens()
+            return entrada
+
+        usuario_de_token(self.token.key, buscar)
+        usuario_de_token(self.token.key, buscar)
+        self.assertEqual(len(llamadas), 2)
+
+    def test_ttl_acotado_con_cache_local(self):
+        usuario_de_token(self.token.key, lambda clave: (self.usuario, self.token))
+        _, expira, _ = tokens_cacheados._datos[self.token.key]
+        self.assertLessEqual(expira - time.monotonic(), 5)
+
+    def test_vista_async_con_token(self):
+        self.assertEqual(self.client.get('/api/async/productos/').status_code, 200)
+        self.client.credentials(HTTP_AUTHORIZATION='Token no-existe')
+        self.assertEqual(self.client.get('/api/async/productos/').status_code, 401)
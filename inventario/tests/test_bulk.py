@@ -0,0 +1,68 @@
+from django.test import override_settings
+
+from inventario.models import MovimientoStock, Producto
+
+from .base import InventarioAPITestCase
+
+
+URL = '/api/movimientos/bulk/'
+
+
+class MovimientosBulkTests(InventarioAPITestCase):
+    def stock(self):
+        return dict(Producto.objects.values_list('sku', 'stock_actual'))
+
+    def test_lote_valido_201(self):
+        respuesta = self.client.post(URL, [
+            {'producto': self.martillo.pk, 'tipo': 'OUT', 'cantidad': 4},
+            {'producto': self.taladro.pk, 'tipo': 'IN', 'cantidad': 3, 'motivo': 'Compra'},
+        ], format='json')
+
+        self.assertEqual(respuesta.status_code, 201)
+        self.assertEqual(respuesta.data['creados'], 2)
+        self.assertEqual(self.stock(), {'MAR-01': 6, 'TAL-01': 3})
+
+    def test_todo_o_nada_400(self):
+        respuesta = self.client.post(URL, [
+            {'producto': self.martillo.pk, 'tipo': 'OUT', 'cantidad': 4},
+            {'producto': self.taladro.pk, 'tipo': 'OUT', 'cantidad': 1},
+            {'producto': self.martillo.pk, 'tipo': 'XX', 'cantidad': 1},
+        ], format='json')
+
+        self.assertEqual(respuesta.status_code, 400)
+        self.assertEqual(respuesta.data['creados'], 0)
+        # Los errores de formato cortan antes de tocar el stock
+        self.assertEqual([e['indice'] for e in respuesta.data['errores']], [2])
+        self.assertEqual(self.stock(), {'MAR-01': 10, 'TAL-01': 0})
+        self.assertFalse(MovimientoStock.objects.exists())
+
+    def test_stock_insuficiente_anula_el_lote(self):
+        respuesta = self.client.post(URL, [
+            {'producto': self.martillo.pk, 'tipo': 'OUT', 'cantidad': 4},
+            {'producto': self.taladro.pk, 'tipo': 'OUT', 'cantidad': 1},
+        ], format='json')
+
+        self.assertEqual(respuesta.status_code, 400)
+        self.assertEqual([e['indice'] for e in respuesta.data['errores']], [1])
+        self.assertEqual(self.stock(), {'MAR-01': 10, 'TAL-01': 0})
+
+    def test_parcial_207(self):
+        respuesta = self.client.post(URL + '?parcial=1', [
+            {'producto': self.martillo.pk, 'tipo': 'OUT', 'cantidad': 4},
+            {'producto': self.taladro.pk, 'tipo': 'OUT', 'cantidad': 1},
+            {'producto': 999999, 'tipo': 'IN', 'cantidad': 1},
+            {'producto': self.martillo.pk, 'tipo': 'OUT', 'cantidad': 0},
+        ], format='json')
+
+        self.assertEqual(respuesta.status_code, 207)
+        self.assertEqual(respuesta.data['creados'], 1)
+        self.assertEqual([e['indice'] for e in respuesta.data['errores']], [1, 2, 3])
+        self.assertEqual(self.stock(), {'MAR-01': 6, 'TAL-01': 0})
+
+    @override_settings(INVENTARIO_LOTE_MAXIMO=2)
+    def test_limites_del_lote(self):
+        item = {'producto': self.martillo.pk, 'tipo': 'IN', 'cantidad': 1}
+        self.assertEqual(self.client.post(URL, [item] * 3, format='json').status_code, 400)
+        self.assertEqual(self.client.post(URL, [], format='json').status_code, 400)
+        self.assertEqual(self.client.post(URL, item, format='json').status_code, 400)
+        self.assertFalse(MovimientoStock.objects.exists())
@@ -0,0 +1,48 @@
+from inventario.busqueda import buscar, expresion_match, filtrar
+from inventario.models import Producto, Proveedor
+
+from .base import InventarioAPITestCase, crear_producto
+
+
+class BusquedaTextoTests(InventarioAPITestCase):
+    def setUp(self):
+        super().setUp()
+        crear_producto(self.categoria, self.proveedor, 'LAP-AZ', nombre='Lápiz azul')
+        crear_producto(self.categoria, self.proveedor, 'LAP-RJ', nombre='Lápiz rojo')
+        crear_producto(self.categoria, self.proveedor, 'AZUL-01', nombre='Cuaderno')
+
+    def nombres(self, texto):
+        return sorted(filtrar(Producto.objects.all(), texto, ['nombre', 'sku']).values_list('nombre', flat=True))
+
+    def test_expresion_match(self):
+        self.assertEqual(expresion_match('lapiz az'), '"lapiz"* "az"*')
+        self.assertIsNone(expresion_match(' "*- '))
+
+    def test_prefijos_sin_tildes_y_todos_los_terminos(self):
+        self.assertEqual(self.nombres('lapiz'), ['Lápiz azul', 'Lápiz rojo'])
+        self.assertEqual(self.nombres('lapi azu'), ['Lápiz azul'])
+        # Comillas y operadores FTS5 del usuario no rompen la consulta
+        self.assertEqual(self.nombres('"rojo" OR'), [])
+
+    def test_indice_sigue_ediciones_y_bajas(self):
+        producto = Producto.objects.get(sku='LAP-RJ')
+        producto.nombre = 'Goma de borrar'
+        producto.save()
+        self.assertEqual(self.nombres('rojo'), [])
+        self.assertEqual(self.nombres('goma'), ['Goma de borrar'])
+
+        producto.delete()
+        self.assertEqual(self.nombres('goma'), [])
+
+    def test_ranking_prioriza_el_nombre(self):
+        resultados = buscar(Producto.objects.all(), 'azul', ['nombre', 'sku'])
+        self.assertEqual([p.sku for p in resultados], ['LAP-AZ', 'AZUL-01'])
+
+    def test_endpoints(self):
+        respuesta = self.client.get('/api/productos/', {'search': 'lapiz'})
+        self.assertEqual(respuesta.status_code, 200)
+        self.assertEqual(respuesta.data['count'], 2)
+
+        Proveedor.objects.create(nombre='Distribuidora Norte', email='norte@correo.cl')
+        respuesta = self.client.get('/api/proveedores/buscar/', {'q': 'norte'})
+        self.assertEqual([p['nombre'] for p in respuesta.data], ['Distribuidora Norte'])
@@ -0,0 +1,44 @@
+import tempfile
+
+from django.test import override_settings
+
+from inventario.cache_referencias import acotar_ttl, cache_compartida, estadisticas, version
+from inventario.models import Categoria
+
+from .base import InventarioAPITestCase
+
+
+class CacheReferenciasTests(InventarioAPITestCase):
+    def nombres(self):
+        respuesta = self.client.get('/api/categorias/')
+        self.assertEqual(respuesta.status_code, 200)
+        return [c['nombre'] for c in respuesta.data['results']]
+
+    def test_escritura_invalida_la_lista_cacheada(self):
+        self.assertEqual(self.nombres(), ['Herramientas'])
+        self.assertEqual(self.nombres(), ['Herramientas'])
+        self.assertEqual(estadisticas()['categorias']['aciertos'], 1)
+
+        antes = version('categorias')
+        with self.captureOnCommitCallbacks(execute=True):
+            respuesta = self.client.post('/api/categorias/', {'nombre': 'Electricidad'}, format='json')
+        self.assertEqual(respuesta.status_code, 201)
+        self.assertEqual(version('categorias'), antes + 1)
+        self.assertEqual(self.nombres(), ['Electricidad', 'Herramientas'])
+
+        with self.captureOnCommitCallbacks(execute=True):
+            Categoria.objects.filter(nombre='Electricidad').get().delete()
+        self.assertEqual(self.nombres(), ['Herramientas'])
+
+    @override_settings(INVENTARIO_CACHE_LOCAL_TTL=5)
+    def test_ttl_acotado_solo_con_cache_por_proceso(self):
+        self.assertFalse(cache_compartida())
+        self.assertEqual(acotar_ttl(3600), 5)
+        self.assertEqual(acotar_ttl(None), 5)
+
+        with tempfile.TemporaryDirectory() as directorio, override_settings(CACHES={'default': {
+            'BACKEND': 'django.core.cache.backends.filebased.FileBasedCache', 'LOCATION': directorio,
+        }}):
+            self.assertTrue(cache_compartida())
+            self.assertEqual(acotar_ttl(3600), 3600)
+            self.assertIsNone(acotar_ttl(None))
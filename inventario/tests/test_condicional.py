@@ -0,0 +1,97 @@
+import time
+from unittest import mock
+
+from django.core.cache import cache
+from django.db import connection
+from django.test.utils import CaptureQueriesContext
+
+from inventario.models import MovimientoStock
+from inventario.stock import registrar_movimiento
+
+from .base import InventarioAPITestCase
+
+
+class GetCondicionalTests(InventarioAPITestCase):
+    def setUp(self):
+        super().setUp()
+        with self.captureOnCommitCallbacks(execute=True):
+            self.movimiento = registrar_movimiento(self.martillo, 'OUT', 1)
+
+    def etag(self, url):
+        respuesta = self.client.get(url)
+        self.assertEqual(respuesta.status_code, 200)
+        return respuesta['ETag']
+
+    def test_lista_304_con_validadores_de_la_base(self):
+        respuesta = self.client.get('/api/movimientos/')
+        self.assertIn('Last-Modified', respuesta)
+
+        with CaptureQueriesContext(connection) as consultas:
+            no_modificada = self.client.get('/api/movimientos/', HTTP_IF_NONE_MATCH=respuesta['ETag'])
+        self.assertEqual(no_modificada.status_code, 304)
+        # Agregados del queryset filtrado y versiones: nada más
+        self.assertEqual(len(consultas), 2)
+        self.assertEqual(
+            self.client.get(
+                '/api/movimientos/', HTTP_IF_MODIFIED_SINCE=respuesta['Last-Modified']
+            ).status_code,
+            304,
+        )
+
+    def test_etag_de_la_lista_estable_sin_escrituras(self):
+        # La cache local vence y cada worker tiene la suya: el validador no
+        # puede depender de ella
+        for url in ('/api/movimientos/', '/api/productos/', '/api/categorias/'):
+            with self.subTest(url=url):
+                inicial = self.etag(url)
+                futuro = time.time() + 3600
+                with mock.patch('django.core.cache.backends.locmem.time.time', return_value=futuro):
+                    self.assertEqual(self.etag(url), inicial)
+                cache.clear()
+                self.assertEqual(self.etag(url), inicial)
+
+    def test_borrado_y_alta_cambian_el_etag_de_la_lista(self):
+        url = '/api/movimientos/'
+        inicial = self.etag(url)
+
+        with self.captureOnCommitCallbacks(execute=True):
+            otro = registrar_movimiento(self.martillo, 'IN', 5)
+        tras_alta = self.etag(url)
+        self.assertNotEqual(tras_alta, inicial)
+
+        # Borrar una fila que no es la última no mueve MAX(pk): lo detecta COUNT
+        with self.captureOnCommitCallbacks(execute=True):
+            MovimientoStock.objects.filter(pk=self.movimiento.pk).delete()
+        self.assertLess(self.movimiento.pk, otro.pk)
+        respuesta = self.client.get(url, HTTP_IF_NONE_MATCH=tras_alta)
+        self.assertEqual(respuesta.status_code, 200)
+
+    def test_edicion_sin_marca_cambia_el_etag_de_la_lista(self):
+        url = '/api/movimientos/'
+        inicial = self.etag(url)
+        # creado_en, MAX(pk) y COUNT siguen iguales: lo detecta la versión en base
+        self.movimiento.motivo = 'Corrección'
+        self.movimiento.save()
+        self.assertNotEqual(self.etag(url), inicial)
+
+    def test_datos_relacionados_cambian_lista_y_detalle(self):
+        lista, detalle = '/api/productos/', f'/api/productos/{self.martillo.pk}/'
+        etags = self.etag(lista), self.etag(detalle)
+
+        with self.captureOnCommitCallbacks(execute=True):
+            self.categoria.nombre = 'Herramientas manuales'
+            self.categoria.save()
+        self.assertNotEqual(self.etag(lista), etags[0])
+        self.assertNotEqual(self.etag(detalle), etags[1])
+        # La versión en base también mueve Last-Modified: un cliente que solo
+        # envía If-Modified-Since recibe el nuevo nombre
+        self.assertIn('Last-Modified', self.client.get(detalle))
+
+    def test_detalle_con_last_modified(self):
+        url = f'/api/categorias/{self.categoria.pk}/'
+        respuesta = self.client.get(url)
+        self.assertIn('Last-Modified', respuesta)
+        self.assertEqual(self.client.get(url, HTTP_IF_NONE_MATCH=respuesta['ETag']).status_code, 304)
+        self.assertEqual(
+            self.client.get(url, HTTP_IF_MODIFIED_SINCE=respuesta['Last-Modified']).status_code, 304
+        )
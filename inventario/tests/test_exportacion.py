@@ -0,0 +1,50 @@
+import csv
+import io
+import json
+
+from inventario.stock import registrar_movimiento
+
+from .base import InventarioAPITestCase
+
+
+class ExportacionTests(InventarioAPITestCase):
+    def contenido(self, respuesta):
+        self.assertEqual(respuesta.status_code, 200)
+        return b''.join(respuesta.streaming_content).decode()
+
+    def test_productos_csv_filtrado(self):
+        respuesta = self.client.get('/api/productos/exportar/', {'categoria': self.categoria.pk})
+        filas = list(csv.DictReader(io.StringIO(self.contenido(respuesta))))
+        self.assertEqual(sorted(f['sku'] for f in filas), ['MAR-01', 'TAL-01'])
+        self.assertEqual(filas[0]['categoria'], 'Herramientas')
+
+        respuesta = self.client.get('/api/productos/exportar/', {'categoria': self.categoria.pk + 1})
+        self.assertEqual(self.contenido(respuesta).count('\n'), 1)
+
+    def test_movimientos_ndjson(self):
+        registrar_movimiento(self.martillo, 'OUT', 2, 'Venta')
+        respuesta = self.client.get('/api/movimientos/exportar/', {'formato': 'ndjson', 'producto': self.martillo.pk})
+        registros = [json.loads(linea) for linea in self.contenido(respuesta).splitlines()]
+        self.assertEqual([(r['sku'], r['tipo'], r['cantidad']) for r in registros], [('MAR-01', 'OUT', 2)])
+
+    def test_parametros_invalidos_400(self):
+        for url, params in (
+            ('/api/productos/exportar/', {'categoria': 'abc'}),
+            ('/api/productos/exportar/', {'proveedor': '1.5'}),
+            ('/api/movimientos/exportar/', {'producto': 'abc'}),
+            ('/api/movimientos/exportar/', {'categoria': 'x'}),
+            ('/api/movimientos/exportar/', {'desde': '2024-13-01'}),
+            ('/api/productos/exportar/', {'formato': 'xml'}),
+        ):
+            with self.subTest(url=url, params=params):
+                respuesta = self.client.get(url, params)
+                self.assertEqual(respuesta.status_code, 400)
+                self.assertEqual(list(respuesta.json()), list(params))
+
+    def test_listados_html_con_filtro_invalido(self):
+        self.client.force_login(self.usuario)
+        for url in ('/inventario/productos/', '/inventario/movimientos/'):
+            with self.subTest(url=url):
+                respuesta = self.client.get(url, {'categoria': 'abc'})
+                self.assertEqual(respuesta.status_code, 200)
+                self.assertIn('categoria', [str(m) for m in respuesta.context['messages']][0])
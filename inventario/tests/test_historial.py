@@ -0,0 +1,114 @@
+import io
+from datetime import timedelta
+
+from django.core.management import CommandError, call_command
+from django.db.models import Max
+from django.utils import timezone
+
+from inventario.historial import generar_snapshots, stock_en_fecha
+from inventario.models import SnapshotStock
+from inventario.stock import registrar_movimiento
+
+from .base import InventarioAPITestCase, crear_producto, movimiento_hace
+
+
+class StockEnFechaTests(InventarioAPITestCase):
+    def test_stock_en_fecha(self):
+        registrar_movimiento(self.martillo, 'OUT', 4)
+        url = f'/api/productos/{self.martillo.pk}/stock-at/'
+
+        hoy = self.client.get(url, {'fecha': timezone.localdate().isoformat()})
+        self.assertEqual(hoy.status_code, 200)
+        self.assertEqual(hoy.data['stock'], 6)
+        ayer = self.client.get(url, {'fecha': (timezone.localdate() - timedelta(days=1)).isoformat()})
+        self.assertEqual(ayer.data['stock'], 10)
+
+    def test_fecha_invalida_400(self):
+        url = f'/api/productos/{self.martillo.pk}/stock-at/'
+        for fecha in ('', 'ayer', '2024-02-30'):
+            with self.subTest(fecha=fecha):
+                self.assertEqual(self.client.get(url, {'fecha': fecha}).status_code, 400)
+
+
+class HistorialMovimientosTests(InventarioAPITestCase):
+    def test_parametros_invalidos_400(self):
+        for params, campo in (
+            ({'producto': 'abc'}, 'producto'),
+            ({'desde': '2024-13-01'}, 'desde'),
+            ({'hasta': '2024-02-30'}, 'hasta'),
+        ):
+            with self.subTest(params=params):
+                respuesta = self.client.get('/api/movimientos/historial/', params)
+                self.assertEqual(respuesta.status_code, 400)
+                self.assertIn(campo, respuesta.data)
+
+    def test_incluye_movimientos_del_rango(self):
+        registrar_movimiento(self.martillo, 'OUT', 1)
+        hoy = timezone.localdate().isoformat()
+        respuesta = self.client.get(
+            '/api/movimientos/historial/', {'producto': self.martillo.pk, 'desde': hoy, 'hasta': hoy}
+        )
+        self.assertEqual(respuesta.status_code, 200)
+        self.assertEqual([m['cantidad'] for m in respuesta.data['results']], [1])
+
+
+class SnapshotsTests(InventarioAPITestCase):
+    # Martillo: 10 hasta hace 4 días, 8 desde hace 3, 13 desde ayer, 12 hoy
+    def setUp(self):
+        super().setUp()
+        self.hoy = timezone.localdate()
+        movimiento_hace(3, self.martillo, 'OUT', 2)
+        movimiento_hace(1, self.martillo, 'IN', 5)
+        registrar_movimiento(self.martillo, 'OUT', 1)
+
+    def dia(self, dias_atras):
+        return self.hoy - timedelta(days=dias_atras)
+
+    def snapshots(self, producto):
+        return list(SnapshotStock.objects.filter(producto=producto).order_by('fecha').values_list('fecha', 'stock'))
+
+    def test_primer_checkpoint_hacia_atras_y_luego_incremental(self):
+        self.assertEqual(generar_snapshots(hasta=self.dia(3)), [self.dia(3)])
+        self.assertEqual(generar_snapshots(), [self.dia(2), self.dia(1)])
+        self.assertEqual(generar_snapshots(), [])
+        self.assertEqual(
+            self.snapshots(self.martillo), [(self.dia(3), 8), (self.dia(2), 8), (self.dia(1), 13)]
+        )
+        self.assertEqual([s for _, s in self.snapshots(self.taladro)], [0, 0, 0])
+
+    def test_no_genera_dias_sin_cerrar(self):
+        for hasta in (self.hoy, self.hoy + timedelta(days=5)):
+            with self.subTest(hasta=hasta):
+                generar_snapshots(hasta=hasta)
+                self.assertEqual(SnapshotStock.objects.aggregate(m=Max('fecha'))['m'], self.dia(1))
+        # El movimiento de hoy entra en el snapshot de mañana, no en uno de hoy
+        self.assertEqual(self.snapshots(self.martillo), [(self.dia(1), 13)])
+
+    def test_producto_nuevo_tras_el_ultimo_snapshot(self):
+        generar_snapshots(hasta=self.dia(3))
+        nuevo = crear_producto(self.categoria, self.proveedor, 'NUE-01', stock=4)
+        generar_snapshots(hasta=self.dia(2))
+        self.assertEqual(self.snapshots(nuevo), [(self.dia(2), 4)])
+
+    def test_periodo_mensual_solo_fin_de_mes(self):
+        fechas = generar_snapshots(hasta=self.dia(40), periodo='mensual')
+        self.assertEqual(len(fechas), 1)
+        self.assertEqual((fechas[0] + timedelta(days=1)).day, 1)
+
+    def test_stock_en_fecha_desde_snapshots(self):
+        generar_snapshots(hasta=self.dia(3))
+        # Snapshot anterior más los movimientos posteriores reaplicados
+        self.assertEqual(stock_en_fecha(self.martillo, self.dia(3)), (8, self.dia(3), 0))
+        self.assertEqual(stock_en_fecha(self.martillo, self.dia(1)), (13, self.dia(3), 1))
+        self.assertEqual(stock_en_fecha(self.martillo, self.hoy), (12, self.dia(3), 2))
+        # Antes del primer snapshot: hacia atrás desde el posterior
+        self.assertEqual(stock_en_fecha(self.martillo, self.dia(4)), (10, self.dia(3), 1))
+
+        respuesta = self.client.get(f'/api/productos/{self.martillo.pk}/stock-at/', {'fecha': self.dia(1).isoformat()})
+        self.assertEqual((respuesta.data['stock'], respuesta.data['snapshot']), (13, self.dia(3)))
+
+    def test_comandos_rechazan_fechas_inexistentes(self):
+        for comando, opcion in (('generar_snapshots', '--hasta'), ('reconstruir_resumenes', '--desde')):
+            with self.subTest(comando=comando):
+                with self.assertRaisesMessage(CommandError, 'Fecha inválida'):
+                    call_command(comando, opcion, '2024-02-30', stdout=io.StringIO())
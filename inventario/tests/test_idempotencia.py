@@ -0,0 +1,115 @@
+from datetime import timedelta
+from unittest import mock
+
+from django.contrib.auth.models import User
+from django.db import DatabaseError
+from django.utils import timezone
+
+from inventario.idempotencia import limpiar_vencidas
+from inventario.models import ClaveIdempotencia, MovimientoStock
+
+from .base import InventarioAPITestCase
+
+
+class IdempotencyKeyTests(InventarioAPITestCase):
+    def post(self, datos, clave='escaner-1', url='/api/movimientos/'):
+        return self.client.post(url, datos, format='json', HTTP_IDEMPOTENCY_KEY=clave)
+
+    def movimiento(self, cantidad=1):
+        return {'producto': self.martillo.pk, 'tipo': 'OUT', 'cantidad': cantidad}
+
+    def test_repeticion_devuelve_la_respuesta_guardada(self):
+        primera = self.post(self.movimiento())
+        self.assertEqual(primera.status_code, 201)
+        self.assertNotIn('Idempotent-Replayed', primera)
+
+        repetida = self.post(self.movimiento())
+        self.assertEqual(repetida.status_code, 201)
+        self.assertEqual(repetida['Idempotent-Replayed'], 'true')
+        self.assertEqual(repetida.json(), primera.json())
+        self.assertEqual(MovimientoStock.objects.count(), 1)
+        self.martillo.refresh_from_db()
+        self.assertEqual(self.martillo.stock_actual, 9)
+
+    def test_bulk_repetido_se_aplica_una_vez(self):
+        lote = [self.movimiento(2), {'producto': self.taladro.pk, 'tipo': 'IN', 'cantidad': 3}]
+        for _ in range(3):
+            self.assertEqual(self.post(lote, url='/api/movimientos/bulk/').status_code, 201)
+        self.assertEqual(MovimientoStock.objects.count(), 2)
+
+    def test_errores_de_validacion_tambien_se_repiten(self):
+        # 4xx es la respuesta definitiva de esa solicitud
+        self.assertEqual(self.post(self.movimiento(50)).status_code, 400)
+        self.martillo.stock_actual = 100
+        self.martillo.save()
+        repetida = self.post(self.movimiento(50))
+        self.assertEqual((repetida.status_code, repetida['Idempotent-Replayed']), (400, 'true'))
+
+    def test_misma_clave_con_otro_cuerpo_422(self):
+        self.post(self.movimiento(1))
+        respuesta = self.post(self.movimiento(2))
+        self.assertEqual(respuesta.status_code, 422)
+        self.assertEqual(MovimientoStock.objects.count(), 1)
+
+    def test_en_curso_409_y_nunca_se_reemplaza(self):
+        self.post(self.movimiento())
+        # Simula la original sin terminar: su escritura pudo haberse confirmado
+        ClaveIdempotencia.objects.update(estado=None, cuerpo=b'')
+        self.assertEqual(self.post(self.movimiento()).status_code, 409)
+
+        ClaveIdempotencia.objects.update(creado_en=timezone.now() - timedelta(minutes=5))
+        self.assertEqual(self.post(self.movimiento()).status_code, 409)
+        self.assertEqual(MovimientoStock.objects.count(), 1)
+
+    def test_respuesta_en_la_misma_transaccion_que_la_escritura(self):
+        guardar = ClaveIdempotencia.save
+
+        def caida_al_guardar_respuesta(registro, *args, **kwargs):
+            if kwargs.get('update_fields'):
+                raise DatabaseError('conexión perdida')
+            return guardar(registro, *args, **kwargs)
+
+        with mock.patch.object(ClaveIdempotencia, 'save', caida_al_guardar_respuesta):
+            with self.assertRaises(DatabaseError):
+                self.post(self.movimiento())
+        # Ni movimiento ni clave: el reintento escribe una sola vez
+        self.assertFalse(MovimientoStock.objects.exists())
+        self.assertFalse(ClaveIdempotencia.objects.exists())
+        self.martillo.refresh_from_db()
+        self.assertEqual(self.martillo.stock_actual, 10)
+
+        self.assertEqual(self.post(self.movimiento()).status_code, 201)
+        self.assertEqual(self.post(self.movimiento())['Idempotent-Replayed'], 'true')
+        self.assertEqual(MovimientoStock.objects.count(), 1)
+
+    def test_vencida_se_reemplaza(self):
+        self.post(self.movimiento())
+        ClaveIdempotencia.objects.update(expira_en=timezone.now() - timedelta(seconds=1))
+        self.assertNotIn('Idempotent-Replayed', self.post(self.movimiento()))
+        self.assertEqual(MovimientoStock.objects.count(), 2)
+
+    def test_claves_por_usuario_y_sin_clave(self):
+        self.post(self.movimiento())
+        otro = User.objects.create_user('caja', is_staff=True)
+        self.client.force_authenticate(otro)
+        self.assertNotIn('Idempotent-Replayed', self.post(self.movimiento()))
+
+        self.client.post('/api/movimientos/', self.movimiento(), format='json')
+        self.assertEqual(MovimientoStock.objects.count(), 3)
+
+    def test_error_no_controlado_libera_la_clave(self):
+        with mock.patch('inventario.serializers.registrar_movimiento', side_effect=RuntimeError('caída')):
+            with self.assertRaises(RuntimeError):
+                self.post(self.movimiento())
+        self.assertFalse(ClaveIdempotencia.objects.exists())
+        self.assertEqual(self.post(self.movimiento()).status_code, 201)
+
+    def test_clave_demasiado_larga_400(self):
+        self.assertEqual(self.post(self.movimiento(), clave='x' * 256).status_code, 400)
+
+    def test_limpiar_vencidas(self):
+        self.post(self.movimiento(), clave='vieja')
+        self.post(self.movimiento(), clave='nueva')
+        ClaveIdempotencia.objects.filter(clave='vieja').update(expira_en=timezone.now() - timedelta(seconds=1))
+        self.assertEqual(limpiar_vencidas(lote=1), 1)
+        self.assertEqual(list(ClaveIdempotencia.objects.values_list('clave', flat=True)), ['nueva'])
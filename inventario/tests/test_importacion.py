@@ -0,0 +1,79 @@
+import io
+from unittest import mock
+
+from django.core.files.uploadedfile import SimpleUploadedFile
+from django.db import IntegrityError, OperationalError
+
+from inventario.importacion import importar_productos
+from inventario.models import Producto
+
+from .base import InventarioAPITestCase
+
+
+ENCABEZADO = 'sku,nombre,categoria,proveedor,precio,stock_actual\n'
+
+
+class ImportacionProductosTests(InventarioAPITestCase):
+    def importar(self, filas, **opciones):
+        return importar_productos(io.StringIO(ENCABEZADO + filas), **opciones)
+
+    def post(self, contenido, **datos):
+        archivo = SimpleUploadedFile('productos.csv', (ENCABEZADO + contenido).encode(), content_type='text/csv')
+        return self.client.post('/api/productos/importar/', {'archivo': archivo, **datos}, format='multipart')
+
+    def test_upsert_por_sku(self):
+        resultado = self.importar(
+            'MAR-01,Martillo carpintero,Herramientas,Ferretería Central,4990,99\n'
+            'NUE-01,Nuevo,Herramientas,Ferretería Central,100.50,7\n'
+        )
+        self.assertEqual((resultado.importadas, resultado.errores), (2, []))
+        martillo = Producto.objects.get(sku='MAR-01')
+        # En productos existentes el stock solo cambia con movimientos
+        self.assertEqual((martillo.nombre, martillo.stock_actual), ('Martillo carpintero', 10))
+        self.assertEqual(Producto.objects.get(sku='NUE-01').stock_actual, 7)
+
+    def test_valores_invalidos_son_errores_de_fila(self):
+        resultado = self.importar(
+            'A-1,Uno,Herramientas,Ferretería Central,NaN,1\n'
+            'A-2,Dos,Herramientas,Ferretería Central,Infinity,1\n'
+            'A-3,Tres,Herramientas,Ferretería Central,-1,1\n'
+            'A-4,Cuatro,Herramientas,Ferretería Central,1,99999999999\n'
+            'A-5,Cinco,Inexistente,Ferretería Central,1,1\n'
+            'A-6,Seis,Herramientas,Ferretería Central,1.5,1\n'
+        )
+        self.assertEqual(resultado.importadas, 1)
+        self.assertEqual([fila for fila, _ in resultado.errores], [1, 2, 3, 4, 5])
+
+    def test_endpoint_precio_nan_es_error_de_fila(self):
+        respuesta = self.post('A-1,Uno,Herramientas,Ferretería Central,nan,1\n')
+        self.assertEqual(respuesta.status_code, 200)
+        self.assertEqual(respuesta.data['errores'], [{'fila': 1, 'error': 'precio inválido.'}])
+
+    def test_error_de_base_en_un_lote_400_con_progreso(self):
+        filas = [f'B-{i},Producto {i},Herramientas,Ferretería Central,10,1\n' for i in range(4)]
+        filas.insert(1, 'B-9,X,Herramientas,Ferretería Central,abc,1\n')
+        guardar = mock.Mock(side_effect=[None, IntegrityError('UNIQUE constraint failed')])
+
+        with mock.patch('inventario.importacion._guardar', guardar):
+            respuesta = self.post(''.join(filas), lote=2)
+
+        # Primer lote (filas 1-3) confirmado; el segundo (filas 4-5) lo rechaza la base
+        self.assertEqual(respuesta.status_code, 400)
+        self.assertIn('UNIQUE constraint failed', respuesta.data['detail'])
+        self.assertEqual(respuesta.data['importadas'], 2)
+        self.assertEqual(respuesta.data['ultima_fila'], 3)
+        self.assertEqual(respuesta.data['errores'], [{'fila': 2, 'error': 'precio inválido.'}])
+
+    def test_error_operativo_no_es_error_del_cliente(self):
+        filas = ''.join(f'C-{i},Producto {i},Herramientas,Ferretería Central,10,1\n' for i in range(4))
+        guardar = mock.Mock(side_effect=[None, OperationalError('database is locked')])
+
+        with mock.patch('inventario.importacion._guardar', guardar):
+            with self.assertRaises(OperationalError):
+                self.post(filas, lote=2)
+
+    def test_columnas_faltantes(self):
+        archivo = SimpleUploadedFile('productos.csv', b'sku,nombre\nA,B\n', content_type='text/csv')
+        respuesta = self.client.post('/api/productos/importar/', {'archivo': archivo}, format='multipart')
+        self.assertEqual(respuesta.status_code, 400)
+        self.assertIn('Faltan columnas', respuesta.data['detail'])
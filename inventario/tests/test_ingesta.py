@@ -0,0 +1,88 @@
+import io
+from datetime import timedelta
+
+from django.contrib.auth.models import User
+from django.core.management import call_command
+from django.utils import timezone
+
+from inventario.ingesta import drenar, estado_cola, purgar_procesados
+from inventario.models import EventoMovimiento, MovimientoStock, ResumenDiarioMovimiento
+
+from .base import InventarioAPITestCase
+
+
+class IngestaTests(InventarioAPITestCase):
+    url = '/api/movimientos/ingesta/'
+
+    def encolar(self, datos):
+        respuesta = self.client.post(self.url, datos, format='json')
+        self.assertEqual(respuesta.status_code, 202)
+        return respuesta.data['eventos']
+
+    def estado(self, evento):
+        return self.client.get(f'{self.url}{evento}/').data
+
+    def test_encola_sin_tocar_stock(self):
+        eventos = self.encolar([{'producto': self.martillo.pk, 'tipo': 'OUT', 'cantidad': 3}] * 2)
+        self.assertEqual(len(eventos), 2)
+        self.martillo.refresh_from_db()
+        self.assertEqual(self.martillo.stock_actual, 10)
+        self.assertFalse(MovimientoStock.objects.exists())
+        self.assertEqual(self.estado(eventos[0])['estado'], 'pendiente')
+        self.assertEqual(self.client.get(f'{self.url}estado/').data['pendientes'], 2)
+
+    def test_un_solo_movimiento_fuera_de_lista(self):
+        eventos = self.encolar({'producto': self.taladro.pk, 'tipo': 'IN', 'cantidad': 1})
+        self.assertEqual(len(eventos), 1)
+
+    def test_formato_invalido_no_encola_nada(self):
+        respuesta = self.client.post(self.url, [
+            {'producto': self.martillo.pk, 'tipo': 'IN', 'cantidad': 1},
+            {'producto': self.martillo.pk, 'tipo': 'XX', 'cantidad': 0},
+        ], format='json')
+        self.assertEqual(respuesta.status_code, 400)
+        self.assertFalse(EventoMovimiento.objects.exists())
+        self.assertEqual(self.client.post(self.url, [], format='json').status_code, 400)
+
+    def test_drenar_aplica_en_orden_y_rechaza_sin_stock(self):
+        eventos = self.encolar([
+            {'producto': self.martillo.pk, 'tipo': 'OUT', 'cantidad': 8},
+            {'producto': self.martillo.pk, 'tipo': 'OUT', 'cantidad': 5},   # quedaría en -3
+            {'producto': self.martillo.pk, 'tipo': 'IN', 'cantidad': 4},
+            {'producto': 999999, 'tipo': 'IN', 'cantidad': 1},               # no existe
+        ])
+        self.assertEqual(drenar(tamano=3), (4, 2))
+
+        estados = [self.estado(e) for e in eventos]
+        self.assertEqual(
+            [e['estado'] for e in estados], ['aplicado', 'rechazado', 'aplicado', 'rechazado']
+        )
+        self.assertTrue(all(e['error'] for e in estados if e['estado'] == 'rechazado'))
+        self.assertEqual(
+            sorted(MovimientoStock.objects.values_list('id', flat=True)),
+            sorted(e['movimiento'] for e in estados if e['movimiento']),
+        )
+        self.martillo.refresh_from_db()
+        self.assertEqual(self.martillo.stock_actual, 6)
+        self.assertEqual(estado_cola(), {'pendientes': 0, 'mas_antiguo': None, 'retraso_segundos': 0.0})
+        # Los aplicados también entran en el resumen diario
+        self.assertEqual(
+            ResumenDiarioMovimiento.objects.get(producto=self.martillo).cantidad_salida, 8
+        )
+
+    def test_evento_de_otro_usuario_404_salvo_staff(self):
+        evento = self.encolar({'producto': self.martillo.pk, 'tipo': 'IN', 'cantidad': 1})[0]
+        self.client.force_authenticate(User.objects.create_user('caja'))
+        self.assertEqual(self.client.get(f'{self.url}{evento}/').status_code, 404)
+        self.client.force_authenticate(self.usuario)
+        self.assertEqual(self.client.get(f'{self.url}{evento}/').status_code, 200)
+
+    def test_comando_vacia_la_cola_y_purga(self):
+        self.encolar([{'producto': self.martillo.pk, 'tipo': 'IN', 'cantidad': 1}] * 3)
+        salida = io.StringIO()
+        call_command('procesar_ingesta', '--una-vez', '--lote', '2', stdout=salida)
+        self.assertIn('3 evento(s) en 2 lote(s)', salida.getvalue())
+        self.assertEqual(MovimientoStock.objects.count(), 3)
+
+        EventoMovimiento.objects.update(procesado_en=timezone.now() - timedelta(hours=100))
+        self.assertEqual(purgar_procesados(horas=72, lote=2), 3)
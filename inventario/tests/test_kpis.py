@@ -0,0 +1,33 @@
+from decimal import Decimal
+
+from django.db import connection
+from django.test.utils import CaptureQueriesContext
+
+from inventario.kpis import calcular_kpis
+from inventario.models import StockBajoCategoria
+from inventario.stock import registrar_movimiento
+
+from .base import InventarioAPITestCase
+
+
+class KpisTests(InventarioAPITestCase):
+    def test_valores(self):
+        registrar_movimiento(self.martillo, 'OUT', 3)
+        datos = calcular_kpis()
+        self.assertEqual(datos['productos'], 2)
+        self.assertEqual(datos['valor_inventario'], Decimal('7000.00'))
+        self.assertEqual(datos['stock_bajo'], 1)
+        self.assertEqual(datos['movimientos_hoy'], 1)
+
+    def test_escritura_invalida_la_cache(self):
+        self.assertEqual(self.client.get('/api/kpis/').data['stock_bajo'], 1)
+        with self.captureOnCommitCallbacks(execute=True):
+            registrar_movimiento(self.martillo, 'OUT', 9)
+        self.assertEqual(self.client.get('/api/kpis/').data['stock_bajo'], 2)
+
+    def test_stock_bajo_sale_de_los_conteos_mantenidos(self):
+        with CaptureQueriesContext(connection) as consultas:
+            datos = calcular_kpis()
+        self.assertEqual(len(consultas), 1)
+        self.assertIn('inventario_stockbajocategoria', consultas[0]['sql'])
+        self.assertEqual(datos['stock_bajo'], sum(StockBajoCategoria.objects.values_list('total', flat=True)))
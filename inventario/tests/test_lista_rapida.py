@@ -0,0 +1,66 @@
+from decimal import Decimal
+
+from rest_framework.renderers import JSONRenderer
+
+from inventario.lista_rapida import serializar_rapido
+from inventario.models import Proveedor
+from inventario.serializers import ProveedorSerializer
+from inventario.stock import registrar_movimiento
+
+from .base import InventarioAPITestCase, crear_producto
+
+
+class ListaRapidaTests(InventarioAPITestCase):
+    """El camino ``values()`` debe producir exactamente el JSON del serializer."""
+
+    def setUp(self):
+        super().setUp()
+        otro = Proveedor.objects.create(nombre='Distribuidora Ñandú', email=None)
+        crear_producto(
+            self.categoria, otro, 'DEC-01', stock=3, minimo=5,
+            nombre='Tornillo «inox» 3/8"', precio=Decimal('0.05'), descripcion='', activo=False,
+        )
+        crear_producto(self.categoria, otro, 'DEC-02', precio=Decimal('12345678.90'), descripcion='Línea 1\nLínea 2')
+        registrar_movimiento(self.martillo, 'OUT', 2, motivo='Venta mostrador')
+        registrar_movimiento(self.taladro, 'IN', 7)
+
+    def assertMismoJSON(self, url):
+        # rapido=1 es el camino por defecto; así los enlaces next/previous solo
+        # difieren en ese valor
+        separador = '&' if '?' in url else '?'
+        rapido = self.client.get(f'{url}{separador}rapido=1')
+        normal = self.client.get(f'{url}{separador}rapido=0')
+        self.assertEqual(rapido.status_code, 200)
+        self.assertEqual(normal.status_code, 200)
+        self.assertEqual(rapido.content, normal.content.replace(b'rapido=0', b'rapido=1'))
+        return rapido.json()
+
+    def test_productos(self):
+        datos = self.assertMismoJSON('/api/productos/')
+        self.assertEqual(len(datos['results']), 4)
+        for url in ('/api/productos/?ordering=-precio', f'/api/productos/?proveedor={self.proveedor.pk}'):
+            with self.subTest(url=url):
+                self.assertMismoJSON(url)
+
+    def test_movimientos(self):
+        datos = self.assertMismoJSON('/api/movimientos/')
+        self.assertEqual({m['producto_nombre'] for m in datos['results']}, {'Martillo', 'Taladro'})
+        self.assertMismoJSON('/api/movimientos/?page_size=1')
+
+    def test_nulos(self):
+        proveedores = Proveedor.objects.order_by('id')
+        self.assertEqual(
+            JSONRenderer().render(serializar_rapido(ProveedorSerializer, proveedores)),
+            JSONRenderer().render(ProveedorSerializer(proveedores, many=True).data),
+        )
+
+    def test_vistas_async_con_el_mismo_formato(self):
+        self.client.force_login(self.usuario)
+        for sincrona, asincrona in (
+            ('/api/productos/?rapido=0', '/api/async/productos/'),
+            ('/api/movimientos/?rapido=0', '/api/async/movimientos/'),
+        ):
+            with self.subTest(url=asincrona):
+                self.assertEqual(
+                    self.client.get(asincrona).json()['results'], self.client.get(sincrona).json()['results']
+                )
@@ -0,0 +1,57 @@
+from unittest import mock
+
+from django.test import override_settings
+
+from inventario import metricas as modulo
+
+from .base import InventarioAPITestCase
+
+
+EXTERNA = {'REMOTE_ADDR': '203.0.113.7'}
+
+
+@override_settings(INVENTARIO_METRICAS_TOKEN='secreto', INVENTARIO_METRICAS_IPS=['127.0.0.1', '::1'])
+class AccesoMetricasTests(InventarioAPITestCase):
+    def test_anonimo_desde_fuera_403(self):
+        self.assertEqual(self.client.get('/metrics', **EXTERNA).status_code, 403)
+        self.assertEqual(
+            self.client.get('/metrics', HTTP_AUTHORIZATION='Bearer otro', **EXTERNA).status_code, 403
+        )
+
+    def test_token_ip_o_staff(self):
+        respuesta = self.client.get('/metrics', HTTP_AUTHORIZATION='Bearer secreto', **EXTERNA)
+        self.assertEqual(respuesta.status_code, 200)
+        self.assertIn(b'inventario_http_solicitudes_total', respuesta.content)
+
+        self.assertEqual(self.client.get('/metrics').status_code, 200)  # 127.0.0.1
+
+        self.client.force_login(self.usuario)
+        self.assertEqual(self.client.get('/metrics', **EXTERNA).status_code, 200)
+
+    def test_usuario_sin_staff_403(self):
+        self.usuario.is_staff = False
+        self.usuario.save()
+        self.client.force_login(self.usuario)
+        self.assertEqual(self.client.get('/metrics', **EXTERNA).status_code, 403)
+
+
+@override_settings(INVENTARIO_METRICAS_DIR=None)
+class AvisoVariosWorkersTests(InventarioAPITestCase):
+    def observar(self, metricas):
+        metricas.observar('ruta', 'GET', 200, 0.01, 1, 0.001, 10)
+
+    def test_avisa_una_vez_con_varios_workers(self):
+        metricas = modulo.Metricas()
+        with mock.patch.dict('os.environ', {'WEB_CONCURRENCY': '4'}):
+            with self.assertLogs('inventario.metricas', 'WARNING') as registros:
+                self.observar(metricas)
+                metricas.pid = None  # como tras un fork
+                self.observar(metricas)
+        self.assertEqual(len(registros.records), 1)
+        self.assertIn('INVENTARIO_METRICAS_DIR', registros.output[0])
+
+    def test_sin_aviso_con_un_proceso(self):
+        metricas = modulo.Metricas()
+        with mock.patch.object(modulo, '_varios_procesos', return_value=False):
+            with self.assertNoLogs('inventario.metricas', 'WARNING'):
+                self.observar(metricas)
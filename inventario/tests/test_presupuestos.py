@@ -0,0 +1,178 @@
+from unittest import mock
+
+from django.core.files.uploadedfile import SimpleUploadedFile
+from django.test import modify_settings, override_settings
+from django.utils import timezone
+
+from inventario.consultas import PresupuestoExcedido, presupuesto_consultas
+from inventario.ingesta import encolar
+from inventario.models import Categoria, Producto, Proveedor
+from inventario.pronostico import calcular_reorden
+from inventario.stock import registrar_movimiento
+from inventario.views import CategoriaViewSet
+
+from .base import InventarioAPITransactionTestCase, crear_producto
+
+
+CONSULTAS_MIDDLEWARE = 'inventario.consultas.ConsultasMiddleware'
+
+
+@override_settings(INVENTARIO_CONSULTAS_ESTRICTO=True)
+@modify_settings(MIDDLEWARE={'append': CONSULTAS_MIDDLEWARE})
+class PresupuestoConsultasTests(InventarioAPITransactionTestCase):
+    """Cada acción de la API dentro del presupuesto que declara su vista.
+
+    Con INVENTARIO_CONSULTAS_ESTRICTO, ConsultasMiddleware lanza
+    ``PresupuestoExcedido`` y el cliente de test la propaga. Se autentica por
+    sesión, que suma sus consultas (sesión y usuario) a las de la vista.
+    """
+
+    def setUp(self):
+        super().setUp()
+        self.client.force_authenticate(None)
+        self.client.force_login(self.usuario)
+        # Varias categorías y proveedores: un N+1 en los listados se notaría
+        for i in range(12):
+            producto = crear_producto(
+                Categoria.objects.create(nombre=f'Categoría {i}'),
+                Proveedor.objects.create(nombre=f'Proveedor {i}'),
+                f'N-{i:02}', stock=20, minimo=5,
+            )
+            registrar_movimiento(producto, 'OUT', i + 1)
+        self.movimiento = registrar_movimiento(self.martillo, 'IN', 5)
+        self.evento = encolar([{'producto': self.martillo.pk, 'tipo': 'IN', 'cantidad': 1}], self.usuario)[0]
+        calcular_reorden()
+
+    def pedir(self, metodo, url, datos=None, **extra):
+        respuesta = getattr(self.client, metodo)(url, datos, **extra)
+        self.assertLess(respuesta.status_code, 500, url)
+        return respuesta
+
+    def recorrer(self, solicitudes):
+        for metodo, url, *datos in solicitudes:
+            with self.subTest(metodo=metodo, url=url):
+                respuesta = self.pedir(metodo, url, *datos, format='json')
+                if not respuesta.streaming:
+                    self.assertIn('X-Consultas', respuesta)
+
+    def test_categorias(self):
+        c = self.categoria.pk
+        vacia = Categoria.objects.create(nombre='Vacía')
+        self.recorrer([
+            ('get', '/api/categorias/'),
+            ('get', f'/api/categorias/{c}/'),
+            ('get', '/api/categorias/stock-bajo/'),
+            ('post', '/api/categorias/', {'nombre': 'Nueva'}),
+            ('patch', f'/api/categorias/{c}/', {'descripcion': 'Manuales'}),
+            ('put', f'/api/categorias/{c}/', {'nombre': 'Herramientas'}),
+            ('delete', f'/api/categorias/{vacia.pk}/'),
+        ])
+
+    def test_proveedores(self):
+        p = self.proveedor.pk
+        vacio = Proveedor.objects.create(nombre='Sin productos')
+        self.recorrer([
+            ('get', '/api/proveedores/'),
+            ('get', '/api/proveedores/?search=proveedor'),
+            ('get', '/api/proveedores/buscar/?q=proveedor'),
+            ('get', f'/api/proveedores/{p}/'),
+            ('post', '/api/proveedores/', {'nombre': 'Otro', 'email': 'otro@correo.cl'}),
+            ('patch', f'/api/proveedores/{p}/', {'telefono': '555'}),
+            ('delete', f'/api/proveedores/{vacio.pk}/'),
+        ])
+
+    def test_productos(self):
+        m = self.martillo.pk
+        hoy = timezone.localdate().isoformat()
+        self.recorrer([
+            ('get', '/api/productos/'),
+            ('get', '/api/productos/?stock_bajo=true&ordering=-precio'),
+            ('get', f'/api/productos/?categoria={self.categoria.pk}&search=martillo'),
+            ('get', '/api/productos/stock-bajo/'),
+            ('get', '/api/productos/reorden/'),
+            ('get', '/api/productos/buscar/?q=producto'),
+            ('get', '/api/productos/exportar/?formato=ndjson'),
+            ('get', f'/api/productos/{m}/'),
+            ('get', f'/api/productos/{m}/stock-at/?fecha={hoy}'),
+            ('post', '/api/productos/', {
+                'sku': 'NUE-01', 'nombre': 'Nuevo', 'categoria': self.categoria.pk,
+                'proveedor': self.proveedor.pk, 'precio': '10.00',
+            }),
+            ('patch', f'/api/productos/{m}/', {'precio': '1500.00'}),
+            ('delete', f'/api/productos/{self.taladro.pk}/'),
+            # Con movimientos, resúmenes y pronóstico que borrar en cascada
+            ('delete', f'/api/productos/{Producto.objects.get(sku="N-03").pk}/'),
+        ])
+
+        archivo = SimpleUploadedFile(
+            'productos.csv', b'sku,nombre,categoria,proveedor,precio\nIMP-1,Importado,Herramientas,Ferreter\xc3\xada Central,5\n'
+        )
+        self.pedir('post', '/api/productos/importar/', {'archivo': archivo}, format='multipart')
+
+    def test_movimientos(self):
+        m = self.martillo.pk
+        self.recorrer([
+            ('get', '/api/movimientos/'),
+            ('get', f'/api/movimientos/?producto={m}&page_size=5'),
+            ('get', '/api/movimientos/historial/'),
+            ('get', '/api/movimientos/exportar/'),
+            ('get', f'/api/movimientos/{self.movimiento.pk}/'),
+            ('post', '/api/movimientos/', {'producto': m, 'tipo': 'OUT', 'cantidad': 1}),
+            ('post', '/api/movimientos/bulk/', [
+                {'producto': p, 'tipo': 'IN', 'cantidad': 1} for p in range(m, m + 14)
+            ]),
+            ('post', '/api/movimientos/ingesta/', [{'producto': m, 'tipo': 'IN', 'cantidad': 1}] * 20),
+            ('get', '/api/movimientos/ingesta/estado/'),
+            ('get', f'/api/movimientos/ingesta/{self.evento}/'),
+            ('delete', f'/api/movimientos/{self.movimiento.pk}/'),
+        ])
+
+    def test_idempotency_key_dentro_del_presupuesto(self):
+        for url, datos in (
+            ('/api/movimientos/', {'producto': self.martillo.pk, 'tipo': 'IN', 'cantidad': 1}),
+            ('/api/movimientos/bulk/', [{'producto': self.martillo.pk, 'tipo': 'IN', 'cantidad': 1}] * 3),
+        ):
+            for _ in range(2):  # original y repetición
+                with self.subTest(url=url):
+                    self.pedir('post', url, datos, format='json', HTTP_IDEMPOTENCY_KEY=f'clave-{url}')
+
+    def test_vistas_sueltas_y_async(self):
+        self.recorrer([
+            ('get', '/api/kpis/'),
+            ('get', '/api/reportes/movimientos/?agrupacion=semana'),
+            ('get', '/api/cache/estadisticas/'),
+            ('get', '/api/async/productos/?stock_bajo=false'),
+            ('get', f'/api/async/productos/{self.martillo.pk}/'),
+            ('get', f'/api/async/productos/{self.martillo.pk}/stock/'),
+            ('get', '/api/async/movimientos/'),
+        ])
+
+    def test_listados_sin_n_mas_1(self):
+        # El número de consultas no depende de las filas de la página
+        for url in ('/api/productos/', '/api/movimientos/', '/api/proveedores/'):
+            with self.subTest(url=url):
+                pocas = int(self.pedir('get', url + '?page_size=2&page=1')['X-Consultas'])
+                muchas = int(self.pedir('get', url + '?page_size=14&page=1')['X-Consultas'])
+                self.assertEqual(pocas, muchas)
+
+    def test_modo_estricto_falla_al_exceder(self):
+        with mock.patch.object(CategoriaViewSet, 'presupuesto_consultas', 1):
+            with self.assertRaises(PresupuestoExcedido):
+                self.client.get('/api/categorias/')
+
+        with self.assertRaises(PresupuestoExcedido):
+            with presupuesto_consultas(0, 'test'):
+                Categoria.objects.count()
+
+
+@modify_settings(MIDDLEWARE={'append': CONSULTAS_MIDDLEWARE})
+class CabecerasConsultasTests(InventarioAPITransactionTestCase):
+    def test_sin_cabeceras_fuera_de_debug_y_modo_estricto(self):
+        # El runner de tests fuerza DEBUG=False
+        respuesta = self.client.get('/api/categorias/')
+        self.assertEqual(respuesta.status_code, 200)
+        self.assertNotIn('X-Consultas', respuesta)
+        self.assertNotIn('X-Consultas-Ms', respuesta)
+
+        with override_settings(DEBUG=True):
+            self.assertIn('X-Consultas', self.client.get('/api/categorias/'))
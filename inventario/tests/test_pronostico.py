@@ -0,0 +1,113 @@
+from datetime import date, timedelta
+
+import numpy as np
+
+from inventario.models import PronosticoReorden, Proveedor, ResumenDiarioMovimiento
+from inventario.pronostico import calcular_reorden, consumo_diario
+
+from .base import InventarioAPITestCase, crear_producto
+
+
+HOY = date(2024, 6, 30)
+# historia 10 días (20-29 de junio), media móvil de los últimos 4
+PARAMETROS = {'historia': 10, 'ventana': 4, 'alfa': 0.5, 'plazo': 2, 'cobertura': 3}
+DESDE = HOY - timedelta(days=PARAMETROS['historia'])
+
+
+def salidas(producto, dia, cantidad, entradas=0):
+    """Fila de resumen ``dia`` días después de DESDE."""
+    ResumenDiarioMovimiento.objects.create(
+        producto=producto, fecha=DESDE + timedelta(days=dia),
+        cantidad_salida=cantidad, salidas=1 if cantidad else 0,
+        cantidad_entrada=entradas, entradas=1 if entradas else 0,
+    )
+
+
+class PronosticoReordenTests(InventarioAPITestCase):
+    def setUp(self):
+        super().setUp()
+        self.otro_proveedor = Proveedor.objects.create(nombre='Aceros del Sur')
+        self.tornillo = crear_producto(self.categoria, self.otro_proveedor, 'TOR-01', stock=5, minimo=2)
+        # Ayer 4, anteayer 2, y 6 hace ocho días (fuera de la ventana de 4)
+        for producto in (self.martillo, self.tornillo):
+            salidas(producto, 9, 4)
+            salidas(producto, 8, 2)
+            salidas(producto, 2, 6)
+        # Fuera del rango (hoy no está cerrado; el día anterior a DESDE es
+        # historia vieja) y filas solo de entradas: no cuentan
+        ResumenDiarioMovimiento.objects.create(producto=self.tornillo, fecha=HOY, cantidad_salida=50, salidas=1)
+        ResumenDiarioMovimiento.objects.create(
+            producto=self.tornillo, fecha=DESDE - timedelta(days=1), cantidad_salida=50, salidas=1
+        )
+        salidas(self.taladro, 9, 0, entradas=30)
+
+    def test_media_movil_y_suavizado(self):
+        ids = np.array(sorted([self.martillo.pk, self.taladro.pk, self.tornillo.pk]))
+        promedio, suavizado = consumo_diario(ids, DESDE, PARAMETROS['historia'], PARAMETROS['ventana'], PARAMETROS['alfa'])
+
+        esperado = 0.5 * 4 + 0.5 * 0.5 * 2 + 0.5 * 0.5 ** 7 * 6  # alfa * (1 - alfa) ** antigüedad
+        por_id = dict(zip(ids.tolist(), zip(promedio.tolist(), suavizado.tolist())))
+        self.assertEqual(por_id[self.martillo.pk][0], 1.5)  # (4 + 2) / 4
+        self.assertAlmostEqual(por_id[self.martillo.pk][1], esperado)
+        self.assertAlmostEqual(por_id[self.tornillo.pk][1], esperado)
+        self.assertEqual(por_id[self.taladro.pk], (0.0, 0.0))
+
+    def test_filas_de_productos_fuera_de_ids_se_ignoran(self):
+        # Producto borrado entre la lectura de ids y la del resumen
+        ids = np.array([self.martillo.pk])
+        promedio, suavizado = consumo_diario(ids, DESDE, 10, 4, 0.5)
+        self.assertEqual(promedio.tolist(), [1.5])
+        self.assertAlmostEqual(suavizado[0], 2.5234375)
+
+    def test_punto_de_reorden_quiebre_y_cantidad_sugerida(self):
+        self.assertEqual(calcular_reorden(hoy=HOY, **PARAMETROS), (3, 2))
+        suavizado = 2.5234375
+
+        # Martillo: stock 10 > punto ceil(2.52 * 2) + 2 = 8, no se reordena
+        martillo = PronosticoReorden.objects.get(producto=self.martillo)
+        self.assertEqual((martillo.punto_reorden, martillo.cantidad_sugerida, martillo.reordenar), (8, 0, False))
+        self.assertEqual(martillo.dias_para_quiebre, round(10 / suavizado, 2))
+
+        # Tornillo: stock 5 <= 8; objetivo ceil(2.52 * (2 + 3)) + 2 = 15
+        tornillo = PronosticoReorden.objects.get(producto=self.tornillo)
+        self.assertEqual((tornillo.punto_reorden, tornillo.cantidad_sugerida, tornillo.reordenar), (8, 10, True))
+        self.assertEqual(tornillo.dias_para_quiebre, round(5 / suavizado, 2))
+
+        # Taladro: sin consumo, sin quiebre previsto; solo el mínimo
+        taladro = PronosticoReorden.objects.get(producto=self.taladro)
+        self.assertIsNone(taladro.dias_para_quiebre)
+        self.assertEqual((taladro.punto_reorden, taladro.cantidad_sugerida), (1, 1))
+
+    def test_upsert_recalcula(self):
+        calcular_reorden(hoy=HOY, **PARAMETROS)
+        self.tornillo.stock_actual = 40
+        self.tornillo.save()
+        self.assertEqual(calcular_reorden(hoy=HOY, **PARAMETROS), (3, 1))  # solo el taladro
+        self.assertEqual(PronosticoReorden.objects.count(), 3)
+        tornillo = PronosticoReorden.objects.get(producto=self.tornillo)
+        self.assertEqual((tornillo.cantidad_sugerida, tornillo.reordenar), (0, False))
+
+        # La ventana avanza con hoy: tres días después solo queda el del 29 de junio
+        calcular_reorden(hoy=HOY + timedelta(days=2), **PARAMETROS)
+        self.assertEqual(PronosticoReorden.objects.get(producto=self.martillo).consumo_promedio, 1.5)
+        calcular_reorden(hoy=HOY + timedelta(days=3), **PARAMETROS)
+        self.assertEqual(PronosticoReorden.objects.get(producto=self.martillo).consumo_promedio, 1.0)
+
+    def test_endpoint_agrupa_por_proveedor(self):
+        calcular_reorden(hoy=HOY, **PARAMETROS)
+
+        grupos = self.client.get('/api/productos/reorden/').data
+        # Solo los que hay que reordenar, ordenados por nombre de proveedor
+        self.assertEqual(
+            [(g['proveedor']['nombre'], [p['sku'] for p in g['productos']], g['cantidad_sugerida']) for g in grupos],
+            [('Aceros del Sur', ['TOR-01'], 10), ('Ferretería Central', ['TAL-01'], 1)],
+        )
+
+        grupos = self.client.get('/api/productos/reorden/', {'todos': '1'}).data
+        central = next(g for g in grupos if g['proveedor']['id'] == self.proveedor.pk)
+        # Primero el que se queda sin stock antes; sin quiebre previsto, al final
+        self.assertEqual([p['sku'] for p in central['productos']], ['MAR-01', 'TAL-01'])
+
+        grupos = self.client.get('/api/productos/reorden/', {'proveedor': self.otro_proveedor.pk, 'todos': 'true'}).data
+        self.assertEqual([g['proveedor']['id'] for g in grupos], [self.otro_proveedor.pk])
+        self.assertEqual(self.client.get('/api/productos/reorden/', {'proveedor': 'x'}).status_code, 400)
@@ -0,0 +1,67 @@
+from datetime import timedelta
+
+from django.utils import timezone
+
+from inventario.models import ResumenDiarioMovimiento
+from inventario.resumenes import reconstruir_resumenes
+from inventario.stock import registrar_lote, registrar_movimiento
+
+from .base import InventarioAPITestCase
+
+
+def _filas():
+    return sorted(ResumenDiarioMovimiento.objects.values_list(
+        'producto_id', 'fecha', 'cantidad_entrada', 'cantidad_salida', 'entradas', 'salidas'
+    ))
+
+
+class ResumenDiarioTests(InventarioAPITestCase):
+    def assertIgualAReconstruido(self):
+        mantenido = _filas()
+        reconstruir_resumenes()
+        self.assertEqual(mantenido, _filas())
+        return mantenido
+
+    def test_altas_bajas_y_ediciones_coinciden_con_la_reconstruccion(self):
+        primero = registrar_movimiento(self.martillo, 'OUT', 3)
+        registrar_movimiento(self.martillo, 'IN', 5)
+        registrar_lote([
+            {'producto': self.taladro.pk, 'tipo': 'IN', 'cantidad': 4},
+            {'producto': self.martillo.pk, 'tipo': 'OUT', 'cantidad': 1},
+        ])
+        self.assertIgualAReconstruido()
+
+        # Edición fuera de la API (admin): cambia tipo, cantidad y día
+        primero.tipo, primero.cantidad = 'IN', 7
+        primero.creado_en -= timedelta(days=2)
+        primero.save()
+        filas = self.assertIgualAReconstruido()
+        self.assertIn(
+            (self.martillo.pk, timezone.localdate() - timedelta(days=2), 7, 0, 1, 0), filas
+        )
+
+        self.client.delete(f'/api/movimientos/{primero.pk}/')
+        self.assertIgualAReconstruido()
+
+    def test_put_y_patch_mueven_el_resumen(self):
+        movimiento = registrar_movimiento(self.martillo, 'IN', 2)
+        registrar_movimiento(self.taladro, 'IN', 3)
+        url = f'/api/movimientos/{movimiento.pk}/'
+
+        respuesta = self.client.put(
+            url, {'producto': self.taladro.pk, 'tipo': 'IN', 'cantidad': 5}, format='json'
+        )
+        self.assertEqual(respuesta.status_code, 200)
+        filas = self.assertIgualAReconstruido()
+        self.assertEqual([f[0] for f in filas], [self.taladro.pk])
+        self.assertEqual(filas[0][2:], (8, 0, 2, 0))
+
+        respuesta = self.client.patch(url, {'tipo': 'OUT', 'cantidad': 1}, format='json')
+        self.assertEqual(respuesta.status_code, 200)
+        filas = self.assertIgualAReconstruido()
+        self.assertEqual(filas[0][2:], (3, 1, 1, 1))
+
+    def test_reporte_fecha_inexistente_400(self):
+        respuesta = self.client.get('/api/reportes/movimientos/?desde=2024-02-30')
+        self.assertEqual(respuesta.status_code, 400)
+        self.assertIn('desde', respuesta.data)
@@ -0,0 +1,169 @@
+import threading
+from collections import Counter
+
+from django.db import connection
+from django.db.models import Sum
+from django.test import TestCase, TransactionTestCase
+
+from inventario.models import MovimientoStock, Producto
+from inventario.stock import StockInsuficiente, registrar_lote, registrar_movimiento
+
+from .base import crear_catalogo, crear_producto
+
+
+ENTRADA, SALIDA = MovimientoStock.TIPO_ENTRADA, MovimientoStock.TIPO_SALIDA
+
+
+def neto_libro(producto):
+    """Entradas menos salidas registradas para ``producto``."""
+    sumas = dict(
+        MovimientoStock.objects.filter(producto=producto)
+        .values('tipo').annotate(total=Sum('cantidad')).values_list('tipo', 'total')
+    )
+    return sumas.get(ENTRADA, 0) - sumas.get(SALIDA, 0)
+
+
+# ----------------------
+# GUARDAS DE STOCK
+# ----------------------
+class GuardasStockTests(TestCase):
+    def setUp(self):
+        categoria, proveedor = crear_catalogo()
+        self.producto = crear_producto(categoria, proveedor, 'MAR-01', stock=5)
+        self.otro = crear_producto(categoria, proveedor, 'TAL-01', stock=1)
+
+    def test_salida_sin_stock_no_modifica_nada(self):
+        with self.assertRaises(StockInsuficiente):
+            registrar_movimiento(self.producto, SALIDA, 6)
+        self.producto.refresh_from_db()
+        self.assertEqual(self.producto.stock_actual, 5)
+        self.assertFalse(MovimientoStock.objects.exists())
+
+    def test_entrada_y_salida_ajustan_stock(self):
+        registrar_movimiento(self.producto, ENTRADA, 3)
+        registrar_movimiento(self.producto, SALIDA, 8)
+        self.producto.refresh_from_db()
+        self.assertEqual(self.producto.stock_actual, 0)
+        self.assertEqual(MovimientoStock.objects.count(), 2)
+
+    def test_lote_todo_o_nada(self):
+        with self.assertRaises(StockInsuficiente) as ctx:
+            registrar_lote([
+                {'producto': self.producto.pk, 'tipo': SALIDA, 'cantidad': 5},
+                {'producto': self.otro.pk, 'tipo': SALIDA, 'cantidad': 2},
+            ])
+        self.assertEqual(list(ctx.exception.errores), [1])
+        self.assertEqual(
+            dict(Producto.objects.values_list('sku', 'stock_actual')), {'MAR-01': 5, 'TAL-01': 1}
+        )
+        self.assertFalse(MovimientoStock.objects.exists())
+
+    def test_lote_evalua_en_orden(self):
+        # La entrada previa del mismo lote habilita la salida posterior
+        movimientos, errores = registrar_lote([
+            {'producto': self.otro.pk, 'tipo': ENTRADA, 'cantidad': 4},
+            {'producto': self.otro.pk, 'tipo': SALIDA, 'cantidad': 5},
+        ])
+        self.assertEqual((len(movimientos), errores), (2, {}))
+        self.otro.refresh_from_db()
+        self.assertEqual(self.otro.stock_actual, 0)
+
+    def test_lote_parcial_aplica_los_validos(self):
+        movimientos, errores = registrar_lote([
+            {'producto': self.producto.pk, 'tipo': SALIDA, 'cantidad': 2},
+            {'producto': self.otro.pk, 'tipo': SALIDA, 'cantidad': 2},
+            {'producto': 999999, 'tipo': ENTRADA, 'cantidad': 1},
+        ], parcial=True)
+        self.assertEqual(len(movimientos), 1)
+        self.assertEqual(sorted(errores), [1, 2])
+        self.assertEqual(
+            dict(Producto.objects.values_list('sku', 'stock_actual')), {'MAR-01': 3, 'TAL-01': 1}
+        )
+
+
+# ----------------------
+# CONCURRENCIA (UNA CONEXIÓN POR HILO, BASE EN DISCO)
+# ----------------------
+class ConcurrenciaStockTests(TransactionTestCase):
+    HILOS = 16
+
+    def setUp(self):
+        categoria, proveedor = crear_catalogo()
+        self.productos = [
+            crear_producto(categoria, proveedor, f'CON-{i}', stock=40) for i in range(3)
+        ]
+        self.iniciales = {p.pk: p.stock_actual for p in self.productos}
+
+    def _en_paralelo(self, trabajo, repeticiones):
+        """Corre ``trabajo(hilo, i)`` desde ``HILOS`` hilos; devuelve el conteo de resultados."""
+        resultados = Counter()
+        inesperados = []
+        barrera = threading.Barrier(self.HILOS)
+        candado = threading.Lock()
+
+        def hilo(numero):
+            try:
+                barrera.wait()
+                for i in range(repeticiones):
+                    try:
+                        trabajo(numero, i)
+                        resultado = 'aplicado'
+                    except StockInsuficiente:
+                        resultado = 'rechazado'
+                    with candado:
+                        resultados[resultado] += 1
+            except Exception as exc:  # se reporta desde el hilo principal
+                inesperados.append(exc)
+            finally:
+                connection.close()
+
+        hilos = [threading.Thread(target=hilo, args=(n,)) for n in range(self.HILOS)]
+        for h in hilos:
+            h.start()
+        for h in hilos:
+            h.join()
+        self.assertEqual(inesperados, [])
+        return resultados
+
+    def _verificar_libro(self):
+        for producto in Producto.objects.filter(pk__in=self.iniciales):
+            self.assertGreaterEqual(producto.stock_actual, 0)
+            self.assertEqual(producto.stock_actual, self.iniciales[producto.pk] + neto_libro(producto))
+
+    def test_salidas_concurrentes_sin_perdidas(self):
+        producto = self.productos[0]
+        # 16 hilos x 5 salidas de 1 sobre stock 40: exactamente 40 ganan
+        resultados = self._en_paralelo(lambda hilo, i: registrar_movimiento(producto, SALIDA, 1), 5)
+
+        self.assertEqual(resultados, {'aplicado': 40, 'rechazado': 40})
+        producto.refresh_from_db()
+        self.assertEqual(producto.stock_actual, 0)
+        self._verificar_libro()
+
+    def test_movimientos_mixtos(self):
+        def trabajo(hilo, i):
+            producto = self.productos[(hilo + i) % len(self.productos)]
+            tipo = ENTRADA if (hilo + i) % 4 == 0 else SALIDA
+            registrar_movimiento(producto, tipo, 1 + hilo % 3)
+
+        resultados = self._en_paralelo(trabajo, 8)
+
+        self.assertEqual(sum(resultados.values()), self.HILOS * 8)
+        self.assertEqual(MovimientoStock.objects.count(), resultados['aplicado'])
+        self.assertGreater(resultados['rechazado'], 0)
+        self._verificar_libro()
+
+    def test_lotes_concurrentes_todo_o_nada(self):
+        ids = [p.pk for p in self.productos]
+        tamano = len(ids)
+
+        def trabajo(hilo, i):
+            registrar_lote([{'producto': pid, 'tipo': SALIDA, 'cantidad': 2} for pid in ids])
+
+        resultados = self._en_paralelo(trabajo, 2)
+
+        # Cada lote saca 2 de cada producto: caben 20 lotes y el resto se rechaza entero
+        self.assertEqual(resultados, {'aplicado': 20, 'rechazado': 12})
+        self.assertEqual(MovimientoStock.objects.count(), 20 * tamano)
+        self.assertEqual(set(Producto.objects.filter(pk__in=ids).values_list('stock_actual', flat=True)), {0})
+        self._verificar_libro()
@@ -0,0 +1,34 @@
+from inventario.models import StockBajoCategoria
+from inventario.stock import registrar_movimiento
+
+from .base import InventarioAPITestCase
+
+
+class StockBajoTests(InventarioAPITestCase):
+    def skus(self, url, **params):
+        respuesta = self.client.get(url, params)
+        self.assertEqual(respuesta.status_code, 200)
+        return sorted(p['sku'] for p in respuesta.json()['results'])
+
+    def test_filtro_en_ambos_sentidos(self):
+        # Las vistas async autentican por sesión o token, no por force_authenticate
+        self.client.force_login(self.usuario)
+        for url in ('/api/productos/', '/api/async/productos/'):
+            with self.subTest(url=url):
+                self.assertEqual(self.skus(url, stock_bajo='true'), ['TAL-01'])
+                self.assertEqual(self.skus(url, stock_bajo='false'), ['MAR-01'])
+                self.assertEqual(self.skus(url), ['MAR-01', 'TAL-01'])
+
+    def test_conteos_mantenidos_por_categoria(self):
+        def conteo():
+            return StockBajoCategoria.objects.get(categoria=self.categoria).total
+
+        self.assertEqual(conteo(), 1)
+
+        registrar_movimiento(self.martillo, 'OUT', 8)
+        self.assertEqual(conteo(), 2)
+        registrar_movimiento(self.taladro, 'IN', 5)
+        self.assertEqual(conteo(), 1)
+
+        respuesta = self.client.get('/api/categorias/stock-bajo/')
+        self.assertEqual(respuesta.data['total'], 1)
@@ -0,0 +1,35 @@
+from inventario.stock import registrar_movimiento
+
+from .base import InventarioAPITestCase
+
+
+class VistasAsyncTests(InventarioAPITestCase):
+    def setUp(self):
+        super().setUp()
+        # Las vistas async autentican por sesión o token, no por force_authenticate
+        self.client.force_login(self.usuario)
+        registrar_movimiento(self.martillo, 'OUT', 1)
+
+    def test_ids_no_numericos_400(self):
+        for url, campo in (
+            ('/api/async/productos/?categoria=abc', 'categoria'),
+            ('/api/async/productos/?proveedor=1x', 'proveedor'),
+            ('/api/async/movimientos/?producto=abc', 'producto'),
+        ):
+            with self.subTest(url=url):
+                respuesta = self.client.get(url)
+                self.assertEqual(respuesta.status_code, 400)
+                self.assertEqual(respuesta.json(), {campo: 'Debe ser un id numérico.'})
+
+    def test_filtros_por_id(self):
+        respuesta = self.client.get(f'/api/async/productos/?categoria={self.categoria.pk}&ordering=nombre')
+        self.assertEqual([p['sku'] for p in respuesta.json()['results']], ['MAR-01', 'TAL-01'])
+
+        respuesta = self.client.get(f'/api/async/movimientos/?producto={self.taladro.pk}')
+        self.assertEqual(respuesta.json()['results'], [])
+        respuesta = self.client.get(f'/api/async/movimientos/?producto={self.martillo.pk}')
+        self.assertEqual(len(respuesta.json()['results']), 1)
+
+    def test_sin_credenciales_401(self):
+        self.client.logout()
+        self.assertEqual(self.client.get('/api/async/productos/').status_code, 401)
@@ -1,19 +1,57 @@
-from rest_framework import viewsets, permissions
+import io
+from datetime import timedelta
+
+from rest_framework import viewsets, permissions, status
+from rest_framework.decorators import action
+from rest_framework.response import Response
+from rest_framework.views import APIView
+from rest_framework.exceptions import ValidationError as ErrorParametros
 from rest_framework.filters import SearchFilter, OrderingFilter
 from django_filters.rest_framework import DjangoFilterBackend
 
+from django.conf import settings
+from django.db.models import F
+from django.utils import timezone
+from django.utils.dateparse import parse_date
+from django.http import HttpResponse, HttpResponseForbidden
 from django.shortcuts import render, redirect, get_object_or_404
 from django.contrib.auth.decorators import login_required
 from django.contrib.auth import logout
 from django.contrib import messages
 
-from .models import Categoria, Proveedor, Producto, MovimientoStock
+from .models import Categoria, Proveedor, Producto, MovimientoStock, StockBajoCategoria, EventoMovimiento
 from .serializers import (
     CategoriaSerializer,
     ProveedorSerializer,
     ProductoSerializer,
     MovimientoStockSerializer,
+    MovimientoStockLoteSerializer,
+    KpisSerializer,
 )
+from .busqueda import BusquedaTextoFilter, buscar, filtrar as filtrar_texto
+from .cache_referencias import CacheVersionadoMixin, estadisticas, opciones_formulario
+from .condicional import ConditionalGetMixin
+from .exportacion import (
+    COLUMNAS_PRODUCTOS,
+    COLUMNAS_MOVIMIENTOS,
+    productos_filtrados,
+    movimientos_filtrados,
+    respuesta_exportacion,
+)
+from .filtros import ProductoFilter
+from .historial import fin_del_dia, movimientos_entre, stock_en_fecha
+from .idempotencia import IdempotenciaMixin
+from .kpis import obtener_kpis
+from .lista_rapida import ListaRapidaMixin, plan_para
+from .metricas import acceso_permitido, exposicion
+from .listados import ordenar, paginar, paginar_keyset, parametros
+from .importacion import importar_productos, ErrorImportacion
+from .ingesta import encolar, estado_cola
+from .paginacion import MovimientoKeysetPagination
+from .pronostico import reorden_por_proveedor
+from .resumenes import AGRUPACIONES, serie
+from .stock import registrar_lote, registrar_movimiento, StockInsuficiente
+from .stock_bajo import productos_stock_bajo
 
 # ============================================================
 # PERMISO PERSONALIZADO API
@@ -25,43 +63,407 @@ class IsStaffOrReadOnly(permissions.BasePermission):
         return request.user.is_staff
 
 
+# ============================================================
+# BÚSQUEDA RANKEADA (FTS)
+# ============================================================
+class BusquedaRankeadaMixin:
+    # GET /api/<recurso>/buscar/?q=texto&limite=20
+    @action(detail=False, methods=['get'], url_path='buscar')
+    def buscar(self, request):
+        try:
+            limite = min(int(request.query_params.get('limite', 20)), 100)
+        except ValueError:
+            limite = 20
+        resultados = buscar(
+            self.get_queryset(),
+            request.query_params.get('q', ''),
+            self.search_fields,
+            limite=max(limite, 1),
+        )
+        return Response(self.get_serializer(resultados, many=True).data)
+
+
 # ============================================================
 # API REST (VIEWSETS)
 # ============================================================
-class CategoriaViewSet(viewsets.ModelViewSet):
+class CategoriaViewSet(IdempotenciaMixin, ConditionalGetMixin, CacheVersionadoMixin, viewsets.ModelViewSet):
     queryset = Categoria.objects.all()
+    recurso_cache = 'categorias'
+    recurso_version = 'categorias'
+    # destroy: borra también el conteo mantenido de stock bajo
+    presupuesto_consultas = {'*': 6, 'destroy': 8}
     serializer_class = CategoriaSerializer
     permission_classes = [IsStaffOrReadOnly]
     filter_backends = [SearchFilter, OrderingFilter]
     search_fields = ['nombre']
     ordering_fields = ['nombre']
 
+    # GET /api/categorias/stock-bajo/ -> conteos mantenidos (sin recorrer productos)
+    @action(detail=False, methods=['get'], url_path='stock-bajo')
+    def stock_bajo(self, request):
+        conteos = list(
+            StockBajoCategoria.objects.filter(total__gt=0)
+            .order_by('categoria__nombre')
+            .values('categoria', nombre=F('categoria__nombre'), cantidad=F('total'))
+        )
+        return Response({
+            'total': sum(c['cantidad'] for c in conteos),
+            'categorias': conteos,
+        })
 
-class ProveedorViewSet(viewsets.ModelViewSet):
+
+class ProveedorViewSet(IdempotenciaMixin, ConditionalGetMixin, CacheVersionadoMixin, BusquedaRankeadaMixin, viewsets.ModelViewSet):
     queryset = Proveedor.objects.all()
+    recurso_cache = 'proveedores'
+    recurso_version = 'proveedores'
+    # destroy: comprobación de PROTECT y versión en base (inventario.condicional)
+    presupuesto_consultas = {'*': 6, 'destroy': 7}
     serializer_class = ProveedorSerializer
     permission_classes = [IsStaffOrReadOnly]
-    filter_backends = [SearchFilter, OrderingFilter]
+    filter_backends = [BusquedaTextoFilter, OrderingFilter]
     search_fields = ['nombre', 'email']
     ordering_fields = ['nombre']
 
     
 
 
-class ProductoViewSet(viewsets.ModelViewSet):
-    queryset = Producto.objects.all()
+class ProductoViewSet(IdempotenciaMixin, ConditionalGetMixin, ListaRapidaMixin, BusquedaRankeadaMixin, viewsets.ModelViewSet):
+    queryset = Producto.objects.select_related('categoria', 'proveedor')
     serializer_class = ProductoSerializer
+    # importar: las consultas crecen con el número de lotes del CSV;
+    # destroy: un DELETE por cada tabla que cuelga del producto
+    presupuesto_consultas = {'*': 10, 'destroy': 14, 'importar': None}
     permission_classes = [permissions.IsAuthenticated]
-    filter_backends = [DjangoFilterBackend, SearchFilter, OrderingFilter]
-    filterset_fields = ['categoria', 'proveedor']
+    recurso_version = 'productos'
+    recursos_relacionados = ('categorias', 'proveedores')
+    filter_backends = [DjangoFilterBackend, BusquedaTextoFilter, OrderingFilter]
+    filterset_class = ProductoFilter
     search_fields = ['nombre', 'sku']
     ordering_fields = ['nombre', 'precio', 'stock_actual']
 
+    # GET /api/productos/stock-bajo/ (acepta los mismos filtros que el listado)
+    @action(detail=False, methods=['get'], url_path='stock-bajo')
+    def stock_bajo(self, request):
+        queryset = productos_stock_bajo(self.filter_queryset(self.get_queryset()))
+        pagina = self.paginate_queryset(queryset)
+        if pagina is not None:
+            return self.get_paginated_response(self.get_serializer(pagina, many=True).data)
+        return Response(self.get_serializer(queryset, many=True).data)
+
+    # GET /api/productos/reorden/?proveedor=&todos=1
+    # Último resultado de `calcular_reorden`, agrupado por proveedor
+    @action(detail=False, methods=['get'], url_path='reorden')
+    def reorden(self, request):
+        proveedor = request.query_params.get('proveedor')
+        if proveedor and not proveedor.isdigit():
+            return Response({'proveedor': 'Debe ser un id numérico.'}, status=status.HTTP_400_BAD_REQUEST)
+        return Response(reorden_por_proveedor(
+            proveedor=int(proveedor) if proveedor else None,
+            todos=request.query_params.get('todos') in ('1', 'true'),
+        ))
+
+    # GET /api/productos/exportar/?formato=csv|ndjson&categoria=&proveedor=&activo=
+    @action(detail=False, methods=['get'], url_path='exportar')
+    def exportar(self, request):
+        return respuesta_exportacion(
+            productos_filtrados(request.query_params),
+            COLUMNAS_PRODUCTOS,
+            request.query_params.get('formato', 'csv'),
+            'productos',
+        )
 
-class MovimientoStockViewSet(viewsets.ModelViewSet):
+    # GET /api/productos/{id}/stock-at/?fecha=AAAA-MM-DD
+    @action(detail=True, methods=['get'], url_path='stock-at')
+    def stock_at(self, request, pk=None):
+        try:
+            fecha = parse_date(request.query_params.get('fecha', ''))
+        except ValueError:  # bien formada pero inexistente (2024-02-30)
+            fecha = None
+        if fecha is None:
+            return Response(
+                {'fecha': 'Parámetro obligatorio, formato AAAA-MM-DD.'},
+                status=status.HTTP_400_BAD_REQUEST
+            )
+
+        producto = self.get_object()
+        stock, snapshot, reaplicados = stock_en_fecha(producto, fecha)
+        return Response({
+            'producto': producto.id,
+            'fecha': fecha,
+            'stock': stock,
+            'snapshot': snapshot,
+            'movimientos_reaplicados': reaplicados,
+        })
+
+    # POST /api/productos/importar/ (multipart: archivo=<csv>, lote=, desde_fila=, crear_faltantes=)
+    @action(detail=False, methods=['post'], url_path='importar', permission_classes=[IsStaffOrReadOnly])
+    def importar(self, request):
+        archivo = request.FILES.get('archivo')
+        if archivo is None:
+            return Response({'archivo': 'Debe adjuntar un CSV.'}, status=status.HTTP_400_BAD_REQUEST)
+
+        try:
+            resultado = importar_productos(
+                io.TextIOWrapper(archivo.file, encoding='utf-8-sig', newline=''),
+                tamano_lote=min(int(request.data.get('lote', 1000)), 5000),
+                desde_fila=int(request.data.get('desde_fila', 0)),
+                crear_faltantes=request.data.get('crear_faltantes') in ('1', 'true'),
+            )
+        except (ValueError, ErrorImportacion) as exc:
+            datos = {'detail': str(exc)}
+            if getattr(exc, 'resultado', None) is not None:
+                # Lotes ya confirmados y errores por fila, para reanudar con desde_fila
+                datos.update(exc.resultado.como_dict())
+            return Response(datos, status=status.HTTP_400_BAD_REQUEST)
+
+        return Response(resultado.como_dict())
+
+
+class MovimientoStockViewSet(IdempotenciaMixin, ConditionalGetMixin, ListaRapidaMixin, viewsets.ModelViewSet):
     queryset = MovimientoStock.objects.select_related('producto')
     serializer_class = MovimientoStockSerializer
+    # bulk: un UPDATE + relectura por bloque de 200 productos;
+    # Idempotency-Key suma hasta 6: reserva y guardado de la respuesta, y los
+    # atomic de la escritura pasan a ser savepoints de la transacción de la clave
+    presupuesto_consultas = {'*': 8, 'create': 14, 'bulk': 28}
+    # Idempotency-Key: los escáneres reintentan tras un timeout
+    acciones_idempotentes = ('create', 'bulk', 'ingesta')
     permission_classes = [permissions.IsAuthenticated]
+    campo_modificacion = 'creado_en'
+    recurso_version = 'movimientos'
+    recursos_relacionados = ('productos',)
+    pagination_class = MovimientoKeysetPagination
+
+    # GET /api/movimientos/exportar/?formato=csv|ndjson&desde=&hasta=&categoria=&producto=&tipo=
+    @action(detail=False, methods=['get'], url_path='exportar')
+    def exportar(self, request):
+        return respuesta_exportacion(
+            movimientos_filtrados(request.query_params),
+            COLUMNAS_MOVIMIENTOS,
+            request.query_params.get('formato', 'csv'),
+            'movimientos',
+            orden=('creado_en', 'id'),
+        )
+
+    # GET /api/movimientos/historial/?producto=&desde=&hasta=&cursor=&page_size=
+    # A diferencia de la lista, incluye los movimientos archivados
+    @action(detail=False, methods=['get'], url_path='historial')
+    def historial(self, request):
+        params = request.query_params
+        filtros, errores = {}, {}
+        if params.get('producto'):
+            if not params['producto'].isdigit():
+                errores['producto'] = 'Debe ser un id numérico.'
+            filtros['producto_id'] = params['producto']
+
+        rango = {}
+        for nombre in ('desde', 'hasta'):
+            if params.get(nombre):
+                try:
+                    fecha = parse_date(params[nombre])
+                except ValueError:  # bien formada pero inexistente (2024-02-30)
+                    fecha = None
+                if fecha is None:
+                    errores[nombre] = 'Formato AAAA-MM-DD.'
+                    continue
+                # desde: inicio del día; hasta: día incluido completo
+                rango[nombre] = fin_del_dia(fecha - timedelta(days=1) if nombre == 'desde' else fecha)
+        if errores:
+            return Response(errores, status=status.HTTP_400_BAD_REQUEST)
+
+        plan = plan_para(MovimientoStockSerializer)
+        querysets = [plan.valores(qs) for qs in movimientos_entre(rango.get('desde'), rango.get('hasta'), **filtros)]
+        filas = self.paginate_queryset(querysets)
+        return self.get_paginated_response(plan.representar(filas))
+
+    # POST /api/movimientos/bulk/          -> todo o nada
+    # POST /api/movimientos/bulk/?parcial=1 -> aplica los válidos y reporta el resto
+    @action(detail=False, methods=['post'], url_path='bulk')
+    def bulk(self, request):
+        if not isinstance(request.data, list) or not request.data:
+            return Response(
+                {'detail': 'Se espera una lista no vacía de movimientos.'},
+                status=status.HTTP_400_BAD_REQUEST
+            )
+
+        maximo = getattr(settings, 'INVENTARIO_LOTE_MAXIMO', 1000)
+        if len(request.data) > maximo:
+            return Response(
+                {'detail': f'El lote supera el máximo de {maximo} movimientos.'},
+                status=status.HTTP_400_BAD_REQUEST
+            )
+
+        parcial = request.query_params.get('parcial') in ('1', 'true')
+
+        # Validación de formato por ítem (sin consultas a la base)
+        validos, errores = [], {}
+        for indice, datos in enumerate(request.data):
+            item = MovimientoStockLoteSerializer(data=datos)
+            if item.is_valid():
+                validos.append((indice, item.validated_data))
+            else:
+                errores[indice] = item.errors
+
+        if errores and not parcial:
+            return self._respuesta_errores(errores)
+
+        indices = [i for i, _ in validos]
+
+        try:
+            movimientos, errores_stock = registrar_lote([item for _, item in validos], parcial=parcial)
+        except StockInsuficiente as exc:
+            errores.update({indices[i]: [mensaje] for i, mensaje in exc.errores.items()})
+            return self._respuesta_errores(errores)
+
+        errores.update({indices[i]: [mensaje] for i, mensaje in errores_stock.items()})
+
+        datos = {
+            'creados': len(movimientos),
+            'movimientos': MovimientoStockSerializer(movimientos, many=True).data,
+        }
+        if errores:
+            datos['errores'] = self._lista_errores(errores)
+            return Response(datos, status=status.HTTP_207_MULTI_STATUS)
+        return Response(datos, status=status.HTTP_201_CREATED)
+
+    # POST /api/movimientos/ingesta/ (un movimiento o una lista) -> 202
+    # Solo valida el formato y encola; `procesar_ingesta` aplica el stock
+    @action(detail=False, methods=['post'], url_path='ingesta')
+    def ingesta(self, request):
+        datos = request.data if isinstance(request.data, list) else [request.data]
+        maximo = getattr(settings, 'INVENTARIO_LOTE_MAXIMO', 1000)
+        if not datos or len(datos) > maximo:
+            return Response(
+                {'detail': f'Se espera entre 1 y {maximo} movimientos.'},
+                status=status.HTTP_400_BAD_REQUEST
+            )
+
+        validos, errores = [], {}
+        for indice, item in enumerate(datos):
+            serializer = MovimientoStockLoteSerializer(data=item)
+            if serializer.is_valid():
+                validos.append(serializer.validated_data)
+            else:
+                errores[indice] = serializer.errors
+        if errores:
+            return self._respuesta_errores(errores)
+
+        eventos = encolar(validos, usuario=request.user)
+        return Response({'encolados': len(eventos), 'eventos': eventos}, status=status.HTTP_202_ACCEPTED)
+
+    # GET /api/movimientos/ingesta/estado/ -> pendientes y retraso de la cola
+    @action(detail=False, methods=['get'], url_path='ingesta/estado')
+    def ingesta_estado(self, request):
+        return Response(estado_cola())
+
+    # GET /api/movimientos/ingesta/{evento}/ -> pendiente | aplicado | rechazado
+    @action(detail=False, methods=['get'], url_path=r'ingesta/(?P<evento>[0-9]+)')
+    def ingesta_evento(self, request, evento=None):
+        eventos = EventoMovimiento.objects.all()
+        if not request.user.is_staff:
+            eventos = eventos.filter(usuario=request.user)
+        evento = get_object_or_404(eventos, pk=evento)
+        return Response({
+            'id': evento.id,
+            'estado': evento.estado,
+            'error': evento.error or None,
+            'movimiento': evento.movimiento_id,
+            'producto': evento.producto_id,
+            'tipo': evento.tipo,
+            'cantidad': evento.cantidad,
+            'recibido_en': evento.recibido_en,
+            'procesado_en': evento.procesado_en,
+        })
+
+    @staticmethod
+    def _lista_errores(errores):
+        return [{'indice': i, 'errores': errores[i]} for i in sorted(errores)]
+
+    def _respuesta_errores(self, errores):
+        return Response(
+            {'creados': 0, 'errores': self._lista_errores(errores)},
+            status=status.HTTP_400_BAD_REQUEST
+        )
+
+
+# ============================================================
+# KPIs DEL DASHBOARD (API)
+# ============================================================
+class KpisView(APIView):
+    permission_classes = [permissions.IsAuthenticated]
+    presupuesto_consultas = 4
+
+    def get(self, request):
+        return Response(KpisSerializer(obtener_kpis()).data)
+
+
+# ============================================================
+# REPORTE DE MOVIMIENTOS POR PERIODO (API)
+# ============================================================
+# GET /api/reportes/movimientos/?agrupacion=dia|semana|mes&desde=&hasta=&producto=&categoria=&proveedor=
+# Lee solo el resumen diario: el costo depende de los días del rango, no
+# del tamaño de la tabla de movimientos
+class ReporteMovimientosView(APIView):
+    permission_classes = [permissions.IsAuthenticated]
+    presupuesto_consultas = 3
+    filtros = {'producto': 'producto_id', 'categoria': 'producto__categoria_id', 'proveedor': 'producto__proveedor_id'}
+
+    def get(self, request):
+        params = request.query_params
+        errores = {}
+        agrupacion = params.get('agrupacion', 'dia')
+        if agrupacion not in AGRUPACIONES:
+            errores['agrupacion'] = f'Valores válidos: {", ".join(AGRUPACIONES)}.'
+
+        fechas = {}
+        for nombre in ('desde', 'hasta'):
+            try:
+                fechas[nombre] = parse_date(params[nombre]) if params.get(nombre) else None
+            except ValueError:  # bien formada pero inexistente (2024-02-30)
+                fechas[nombre] = None
+            if params.get(nombre) and fechas[nombre] is None:
+                errores[nombre] = 'Formato AAAA-MM-DD.'
+        hasta = fechas['hasta'] or timezone.localdate()
+        desde = fechas['desde'] or hasta - timedelta(days=29)
+
+        filtros = {}
+        for parametro, campo in self.filtros.items():
+            if params.get(parametro):
+                if not params[parametro].isdigit():
+                    errores[parametro] = 'Debe ser un id numérico.'
+                filtros[campo] = params[parametro]
+        if errores:
+            return Response(errores, status=status.HTTP_400_BAD_REQUEST)
+
+        periodos = serie(desde, hasta, agrupacion, **filtros)
+        for periodo in periodos:
+            periodo['neto'] = periodo['cantidad_entrada'] - periodo['cantidad_salida']
+        return Response({
+            'agrupacion': agrupacion,
+            'desde': desde,
+            'hasta': hasta,
+            'periodos': periodos,
+        })
+
+
+# ============================================================
+# ESTADÍSTICAS DE LA CACHE DE REFERENCIAS (API)
+# ============================================================
+class CacheEstadisticasView(APIView):
+    permission_classes = [permissions.IsAuthenticated]
+    presupuesto_consultas = 2
+
+    def get(self, request):
+        return Response(estadisticas())
+
+
+# ============================================================
+# MÉTRICAS (FORMATO DE TEXTO PROMETHEUS)
+# ============================================================
+def metricas_view(request):
+    if not acceso_permitido(request):
+        return HttpResponseForbidden('Acceso a métricas no permitido.')
+    return HttpResponse(exposicion(), content_type='text/plain; version=0.0.4; charset=utf-8')
 
 
 # ============================================================
@@ -78,7 +480,7 @@ def logout_view(request):
 # ============================================================
 @login_required
 def inicio_view(request):
-    return render(request, 'inicio.html')
+    return render(request, 'inicio.html', {'kpis': obtener_kpis()})
 
 
 # ============================================================
@@ -87,7 +489,16 @@ def inicio_view(request):
 @login_required
 def categorias_list(request):
     categorias = Categoria.objects.all()
-    return render(request, 'categorias/list.html', {'categorias': categorias})
+    if request.GET.get('q'):
+        categorias = categorias.filter(nombre__icontains=request.GET['q'])
+    categorias, orden = ordenar(categorias, request, {'nombre', 'creado_en'}, 'nombre')
+    pagina = paginar(request, categorias)
+    return render(request, 'categorias/list.html', {
+        'categorias': pagina,
+        'pagina': pagina,
+        'orden': orden,
+        'parametros': parametros(request),
+    })
 
 
 @login_required
@@ -123,8 +534,15 @@ def categorias_eliminar(request, id):
 # ============================================================
 @login_required
 def proveedores_list(request):
-    proveedores = Proveedor.objects.all()
-    return render(request, 'proveedores/list.html', {'proveedores': proveedores})
+    proveedores = filtrar_texto(Proveedor.objects.all(), request.GET.get('q'), ['nombre', 'email'])
+    proveedores, orden = ordenar(proveedores, request, {'nombre', 'email'}, 'nombre')
+    pagina = paginar(request, proveedores)
+    return render(request, 'proveedores/list.html', {
+        'proveedores': pagina,
+        'pagina': pagina,
+        'orden': orden,
+        'parametros': parametros(request),
+    })
 
 
 @login_required
@@ -162,14 +580,36 @@ def proveedores_eliminar(request, id):
 # ============================================================
 @login_required
 def productos_list(request):
-    productos = Producto.objects.select_related('categoria', 'proveedor')
-    return render(request, 'productos/list.html', {'productos': productos})
+    # Filtros: q (FTS), categoria, proveedor, activo, stock_bajo=1
+    try:
+        productos = productos_filtrados(request.GET)
+    except ErrorParametros as exc:
+        messages.error(request, f'Filtros inválidos: {", ".join(exc.detail)}.')
+        productos = Producto.objects.all()
+    productos = filtrar_texto(productos, request.GET.get('q'), ['nombre', 'sku'])
+    if request.GET.get('stock_bajo') == '1':
+        productos = productos_stock_bajo(productos)
+    productos, orden = ordenar(
+        productos.select_related('categoria', 'proveedor'),
+        request,
+        {'nombre', 'sku', 'precio', 'stock_actual'},
+        'nombre',
+    )
+    pagina = paginar(request, productos)
+    categorias, proveedores = opciones_formulario()
+    return render(request, 'productos/list.html', {
+        'productos': pagina,
+        'pagina': pagina,
+        'orden': orden,
+        'parametros': parametros(request),
+        'categorias': categorias,
+        'proveedores': proveedores,
+    })
 
 
 @login_required
 def productos_crear(request):
-    categorias = Categoria.objects.all()
-    proveedores = Proveedor.objects.all()
+    categorias, proveedores = opciones_formulario()
 
     if request.method == 'POST':
         Producto.objects.create(
@@ -192,8 +632,7 @@ def productos_crear(request):
 @login_required
 def productos_editar(request, id):
     producto = get_object_or_404(Producto, id=id)
-    categorias = Categoria.objects.all()
-    proveedores = Proveedor.objects.all()
+    categorias, proveedores = opciones_formulario()
 
     if request.method == 'POST':
         producto.nombre = request.POST.get('nombre')
@@ -224,8 +663,20 @@ def productos_eliminar(request, id):
 # ============================================================
 @login_required
 def movimientos_list(request):
-    movimientos = MovimientoStock.objects.select_related('producto')
-    return render(request, 'movimientos/list.html', {'movimientos': movimientos})
+    # Filtros: producto, tipo, categoria, desde, hasta; paginación keyset (creado_en, id)
+    try:
+        movimientos = movimientos_filtrados(request.GET)
+    except ErrorParametros as exc:
+        messages.error(request, f'Filtros inválidos: {", ".join(exc.detail)}.')
+        movimientos = MovimientoStock.objects.all()
+
+    filas, siguiente, anterior = paginar_keyset(request, movimientos.select_related('producto'))
+    return render(request, 'movimientos/list.html', {
+        'movimientos': filas,
+        'siguiente': siguiente,
+        'anterior': anterior,
+        'parametros': parametros(request),
+    })
 
 
 @login_required
@@ -233,24 +684,23 @@ def movimientos_crear(request):
     productos = Producto.objects.all()
 
     if request.method == 'POST':
-        producto = Producto.objects.get(id=request.POST.get('producto'))
+        producto = get_object_or_404(Producto, id=request.POST.get('producto'))
         tipo = request.POST.get('tipo')
         cantidad = int(request.POST.get('cantidad'))
 
-        if tipo == 'SALIDA' and cantidad > producto.stock_actual:
+        if tipo not in (MovimientoStock.TIPO_ENTRADA, MovimientoStock.TIPO_SALIDA) or cantidad <= 0:
             return render(request, 'movimientos/crear.html', {
                 'productos': productos,
-                'error': 'Stock insuficiente'
+                'error': 'Movimiento inválido'
             })
 
-        MovimientoStock.objects.create(
-            producto=producto,
-            tipo=tipo,
-            cantidad=cantidad
-        )
-
-        producto.stock_actual += cantidad if tipo == 'ENTRADA' else -cantidad
-        producto.save()
+        try:
+            registrar_movimiento(producto, tipo, cantidad)
+        except StockInsuficiente:
+            return render(request, 'movimientos/crear.html', {
+                'productos': productos,
+                'error': 'Stock insuficiente'
+            })
 
         return redirect('movimientos_list')
 
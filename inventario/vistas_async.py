@@ -0,0 +1,172 @@
+from functools import wraps
+
+from django.conf import settings
+from django.http import JsonResponse
+from rest_framework.utils.urls import remove_query_param, replace_query_param
+
+from .autenticacion import ausuario_de_token
+from .busqueda import filtrar as filtrar_texto
+from .lista_rapida import plan_para
+from .models import Producto, MovimientoStock
+from .paginacion import apagina_keyset
+from .serializers import ProductoSerializer, MovimientoStockSerializer
+from .stock_bajo import es_stock_bajo, productos_sin_stock_bajo, productos_stock_bajo
+
+
+# Vistas de solo lectura nativas ASGI (ORM async, sin DRF). Las respuestas
+# tienen el mismo formato que los viewsets equivalentes.
+ORDEN_PRODUCTOS = {'nombre', 'precio', 'stock_actual'}
+VERDADEROS = ('1', 'true', 'True')
+
+
+def _error(detalle, status):
+    return JsonResponse({'detail': detalle}, status=status)
+
+
+async def _usuario(request):
+    # Token (cabecera Authorization) o sesión, como los viewsets
+    tipo, _, clave = request.headers.get('Authorization', '').partition(' ')
+    if tipo.lower() == 'token':
+        return await ausuario_de_token(clave.strip())
+    usuario = await request.auser()
+    return usuario if usuario.is_authenticated else None
+
+
+def api_async(presupuesto=None):
+    """GET autenticado; ``presupuesto`` lo usa ``ConsultasMiddleware``."""
+    def decorador(vista):
+        @wraps(vista)
+        async def envoltura(request, *args, **kwargs):
+            if request.method not in ('GET', 'HEAD'):
+                return _error(f'Método "{request.method}" no permitido.', 405)
+            request.user = await _usuario(request)
+            if request.user is None:
+                return _error('Las credenciales de autenticación no se proveyeron.', 401)
+            return await vista(request, *args, **kwargs)
+
+        envoltura.presupuesto_consultas = presupuesto
+        return envoltura
+    return decorador
+
+
+def _entero(valor):
+    try:
+        return int(valor)
+    except (TypeError, ValueError):
+        return None
+
+
+def _filtros_id(params, *campos):
+    """``{campo_id: valor}`` de los parámetros presentes y errores de los no numéricos."""
+    filtros, errores = {}, {}
+    for campo in campos:
+        if params.get(campo):
+            valor = _entero(params[campo])
+            if valor is None:
+                errores[campo] = 'Debe ser un id numérico.'
+            filtros[f'{campo}_id'] = valor
+    return filtros, errores
+
+
+# ----------------------
+# PRODUCTOS
+# ----------------------
+def _productos_filtrados(params, filtros):
+    queryset = Producto.objects.filter(**filtros)
+    if params.get('stock_bajo') in VERDADEROS:
+        queryset = productos_stock_bajo(queryset)
+    elif params.get('stock_bajo') in ('0', 'false', 'False'):
+        queryset = productos_sin_stock_bajo(queryset)
+    queryset = filtrar_texto(queryset, params.get('search', ''), ['nombre', 'sku'])
+
+    orden = params.get('ordering', '')
+    if orden.lstrip('-') in ORDEN_PRODUCTOS:
+        queryset = queryset.order_by(orden)
+    return queryset
+
+
+@api_async(presupuesto=4)
+async def productos_lista(request):
+    # GET /api/async/productos/?page=&categoria=&proveedor=&stock_bajo=&search=&ordering=
+    tamano = settings.REST_FRAMEWORK.get('PAGE_SIZE', 10)
+    filtros, errores = _filtros_id(request.GET, 'categoria', 'proveedor')
+    if errores:
+        return JsonResponse(errores, status=400)
+    queryset = _productos_filtrados(request.GET, filtros)
+    total = await queryset.acount()
+
+    pagina = _entero(request.GET.get('page', 1))
+    paginas = max(1, -(-total // tamano))
+    if pagina is None or not 1 <= pagina <= paginas:
+        return _error('Página inválida.', 404)
+
+    plan = plan_para(ProductoSerializer)
+    inicio = (pagina - 1) * tamano
+    filas = [fila async for fila in plan.valores(queryset)[inicio:inicio + tamano]]
+
+    url = request.build_absolute_uri()
+    anterior = None
+    if pagina > 1:
+        anterior = remove_query_param(url, 'page') if pagina == 2 else replace_query_param(url, 'page', pagina - 1)
+    return JsonResponse({
+        'count': total,
+        'next': replace_query_param(url, 'page', pagina + 1) if pagina < paginas else None,
+        'previous': anterior,
+        'results': plan.representar(filas),
+    })
+
+
+@api_async(presupuesto=3)
+async def productos_detalle(request, pk):
+    # GET /api/async/productos/{id}/
+    plan = plan_para(ProductoSerializer)
+    filas = [fila async for fila in plan.valores(Producto.objects.filter(pk=pk))]
+    if not filas:
+        return _error('No encontrado.', 404)
+    return JsonResponse(plan.representar(filas)[0])
+
+
+@api_async(presupuesto=3)
+async def productos_stock(request, pk):
+    # GET /api/async/productos/{id}/stock/
+    try:
+        producto = await Producto.objects.values('id', 'sku', 'stock_actual', 'stock_minimo').aget(pk=pk)
+    except Producto.DoesNotExist:
+        return _error('No encontrado.', 404)
+    return JsonResponse({
+        'producto': producto['id'],
+        'sku': producto['sku'],
+        'stock_actual': producto['stock_actual'],
+        'stock_minimo': producto['stock_minimo'],
+        'stock_bajo': es_stock_bajo(producto['stock_actual'], producto['stock_minimo']),
+    })
+
+
+# ----------------------
+# MOVIMIENTOS
+# ----------------------
+@api_async(presupuesto=3)
+async def movimientos_lista(request):
+    # GET /api/async/movimientos/?cursor=&page_size=&producto=
+    tamano = _entero(request.GET.get('page_size')) or getattr(settings, 'INVENTARIO_MOVIMIENTOS_PAGE_SIZE', 50)
+    tamano = max(1, min(tamano, getattr(settings, 'INVENTARIO_MOVIMIENTOS_MAX_PAGE_SIZE', 500)))
+
+    filtros, errores = _filtros_id(request.GET, 'producto')
+    if errores:
+        return JsonResponse(errores, status=400)
+    queryset = MovimientoStock.objects.filter(**filtros)
+
+    plan = plan_para(MovimientoStockSerializer)
+    try:
+        filas, siguiente, anterior = await apagina_keyset(
+            plan.valores(queryset), request.GET.get('cursor'), tamano
+        )
+    except ValueError:
+        return _error('Cursor inválido.', 404)
+
+    url = request.build_absolute_uri()
+    return JsonResponse({
+        'next': replace_query_param(url, 'cursor', siguiente) if siguiente else None,
+        'previous': replace_query_param(url, 'cursor', anterior) if anterior else None,
+        'results': plan.representar(filas),
+    })